@@ -61,6 +61,7 @@ class OrganizationEventsStatsEndpoint(OrganizationEventsV2EndpointBase):
                 rollup=rollup,
                 reference_event=reference_event,
                 referrer="api.organization-event-stats",
+                use_cache=True,
             )
 
         return Response(
@@ -14,7 +14,7 @@ from sentry.api.base import Endpoint
 from sentry.api.permissions import RelayPermission
 from sentry.api.authentication import RelayAuthentication
 from sentry.relay import config, projectconfig_cache
-from sentry.models import Project, ProjectKey, Organization, OrganizationOption
+from sentry.models import Project, Organization
 from sentry.utils import metrics
 
 logger = logging.getLogger(__name__)
@@ -55,8 +55,6 @@ class RelayProjectConfigsEndpoint(Endpoint):
                 projects = {}
 
         with Hub.current.start_span(op="relay_fetch_orgs"):
-            # Preload all organizations and their options to prevent repeated
-            # database access when computing the project configuration.
             org_ids = set(project.organization_id for project in six.itervalues(projects))
             if org_ids:
                 with metrics.timer("relay_project_configs.fetching_orgs.duration"):
@@ -64,14 +62,6 @@ class RelayProjectConfigsEndpoint(Endpoint):
                     orgs = {o.id: o for o in orgs if request.relay.has_org_access(o)}
             else:
                 orgs = {}
-            org_options = {
-                i: OrganizationOption.objects.get_all_values(i) for i in six.iterkeys(orgs)
-            }
-
-        with Hub.current.start_span(op="relay_fetch_keys"):
-            project_keys = {}
-            for key in ProjectKey.objects.filter(project_id__in=project_ids):
-                project_keys.setdefault(key.project_id, []).append(key)
 
         metrics.timing("relay_project_configs.projects_requested", len(project_ids))
         metrics.timing("relay_project_configs.projects_fetched", len(projects))
@@ -81,27 +71,21 @@ class RelayProjectConfigsEndpoint(Endpoint):
         for project_id in project_ids:
             configs[six.text_type(project_id)] = {"disabled": True}
 
-            project = projects.get(int(project_id))
-            if project is None:
-                continue
-
-            organization = orgs.get(project.organization_id)
-            if organization is None:
-                continue
-
-            # Try to prevent organization from being fetched again in quotas.
-            project.organization = organization
-            project._organization_cache = organization
-
-            with Hub.current.start_span(op="get_config"):
-                with metrics.timer("relay_project_configs.get_config.duration"):
-                    project_config = config.get_project_config(
-                        project,
-                        org_options=org_options.get(organization.id) or {},
-                        full_config=full_config_requested,
-                        project_keys=project_keys.get(project.id) or [],
-                    )
-
+        # Organizations, their options, project options and keys of all
+        # projects are preloaded together to prevent repeated database access
+        # when computing the project configurations.
+        with Hub.current.start_span(op="get_config"):
+            with metrics.timer("relay_project_configs.get_config.duration"):
+                project_configs = config.get_project_configs(
+                    [
+                        project
+                        for project in six.itervalues(projects)
+                        if project.organization_id in orgs
+                    ],
+                    full_config=full_config_requested,
+                )
+
+        for project_id, project_config in six.iteritems(project_configs):
             configs[six.text_type(project_id)] = project_config.to_dict()
 
         if full_config_requested:
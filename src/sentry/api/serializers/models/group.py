@@ -563,9 +563,9 @@ class StreamGroupSerializer(GroupSerializer, GroupStatsMixin):
         try:
             environment = self.environment_func()
         except Environment.DoesNotExist:
-            stats = {key: tsdb.make_series(0, **query_params) for key in group_ids}
+            stats = {key: tsdb.make_series_array(**query_params) for key in group_ids}
         else:
-            stats = tsdb.get_range(
+            stats = tsdb.get_range_arrays(
                 model=tsdb.models.group,
                 keys=group_ids,
                 environment_ids=environment and [environment.id],
@@ -580,7 +580,7 @@ class StreamGroupSerializer(GroupSerializer, GroupStatsMixin):
         if self.stats_period:
             stats = self.get_stats(item_list, user)
             for item in item_list:
-                attrs[item].update({"stats": stats[item.id]})
+                attrs[item].update({"stats": stats[item.id].to_points()})
 
         return attrs
 
@@ -677,7 +677,7 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
         self.matching_event_id = matching_event_id
 
     def query_tsdb(self, group_ids, query_params):
-        return snuba_tsdb.get_range(
+        return snuba_tsdb.get_range_arrays(
             model=snuba_tsdb.models.group,
             keys=group_ids,
             environment_ids=self.environment_ids,
@@ -690,7 +690,7 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
         if self.stats_period:
             stats = self.get_stats(item_list, user)
             for item in item_list:
-                attrs[item].update({"stats": stats[item.id]})
+                attrs[item].update({"stats": stats[item.id].to_points()})
 
         return attrs
 
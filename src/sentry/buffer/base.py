@@ -1,12 +1,15 @@
 from __future__ import absolute_import
 
+import itertools
 import logging
 import six
 
+from django.db import connections, router
 from django.db.models import F
 
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
+from sentry.utils import metrics
 from sentry.utils.services import Service
 
 
@@ -32,7 +35,7 @@ class Buffer(Service):
     keep up with the updates.
     """
 
-    __all__ = ("incr", "process", "process_pending", "validate")
+    __all__ = ("incr", "process", "process_batch", "process_pending", "validate")
 
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
@@ -86,3 +89,173 @@ class Buffer(Service):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, incrs):
+        """
+        Processes several increments, each given as a ``(model, columns,
+        filters, extra, signal_only)`` tuple.
+
+        Increments of the same model touching the same columns are applied to
+        existing rows with a single ``UPDATE ... FROM (VALUES ...)``
+        statement.  Increments that cannot be expressed that way, or whose
+        row does not exist yet, are handed to ``process`` one by one.
+        """
+        batches = {}
+        for incr in incrs:
+            batch_key = _get_batch_key(*incr)
+            if batch_key is None:
+                self.process(*incr)
+            else:
+                batches.setdefault(batch_key, []).append(incr)
+
+        for batch_key, batch in six.iteritems(batches):
+            updated = _batch_update(batch_key, batch)
+
+            for model, columns, filters, extra, signal_only in batch:
+                if _get_filter_values(model, filters) not in updated:
+                    self.process(model, columns, filters, extra, signal_only)
+                    continue
+
+                buffer_incr_complete.send_robust(
+                    model=model,
+                    columns=columns,
+                    filters=filters,
+                    extra=extra,
+                    created=False,
+                    sender=model,
+                )
+
+
+def _has_score(model, columns, extra):
+    from sentry.models import Group
+
+    # See `Buffer.process`, the score of a group is derived from the updated
+    # `times_seen` and `last_seen` columns.
+    return model is Group and "times_seen" in columns and "last_seen" in (extra or {})
+
+
+def _get_batch_key(model, columns, filters, extra, signal_only):
+    """
+    Returns the key under which an increment can be batched with others, or
+    ``None`` if it has to be processed on its own.
+    """
+    from django.db.models import Model
+
+    if signal_only:
+        return None
+
+    extra = extra or {}
+    extra_columns = [
+        column for column in extra if not (column == "score" and _has_score(model, columns, extra))
+    ]
+    for value in itertools.chain(six.itervalues(filters), (extra[c] for c in extra_columns)):
+        if isinstance(value, Model) or hasattr(value, "resolve_expression"):
+            return None
+
+    return (
+        model,
+        tuple(sorted(filters)),
+        tuple(sorted(columns)),
+        tuple(sorted(extra_columns)),
+        _has_score(model, columns, extra),
+    )
+
+
+def _get_field(model, name):
+    if name == "pk":
+        return model._meta.pk
+    return model._meta.get_field(name)
+
+
+def _get_cast_type(field, connection):
+    # Auto fields report ``serial`` types, which can't be used in casts. Cast
+    # to the type that columns referencing them use instead (this also covers
+    # BoundedBigAutoField, see FlexibleForeignKey).
+    if hasattr(field, "get_related_db_type"):
+        return field.get_related_db_type(connection)
+    return field.rel_db_type(connection)
+
+
+def _get_filter_values(model, filters):
+    return tuple(_get_field(model, name).to_python(filters[name]) for name in sorted(filters))
+
+
+def _batch_update(batch_key, batch):
+    """
+    Applies a batch of increments to existing rows and returns the filter
+    values of all rows that were updated.
+    """
+    model, filter_names, incr_columns, extra_columns, has_score = batch_key
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    names = filter_names + incr_columns + extra_columns
+    fields = [_get_field(model, name) for name in names]
+    aliases = ["c%d" % i for i in range(len(names))]
+
+    def value_ref(name):
+        i = names.index(name)
+        return "v.%s::%s" % (aliases[i], _get_cast_type(fields[i], connection))
+
+    assignments = []
+    for name in incr_columns:
+        column = qn(_get_field(model, name).column)
+        assignments.append("%s = t.%s + %s" % (column, column, value_ref(name)))
+    for name in extra_columns:
+        assignments.append("%s = %s" % (qn(_get_field(model, name).column), value_ref(name)))
+    if has_score:
+        assignments.append(
+            "%s = log(t.%s + %s) * 600 + extract(epoch from %s)"
+            % (
+                qn("score"),
+                qn("times_seen"),
+                value_ref("times_seen"),
+                value_ref("last_seen"),
+            )
+        )
+
+    conditions = [
+        "t.%s = %s" % (qn(_get_field(model, name).column), value_ref(name)) for name in filter_names
+    ]
+
+    params = []
+    rows = []
+    for _, columns, filters, extra, _ in batch:
+        values = []
+        for name, field in zip(names, fields):
+            if name in filters:
+                value = filters[name]
+            elif name in columns:
+                value = columns[name]
+            else:
+                value = extra[name]
+            values.append(field.get_db_prep_save(value, connection))
+        params.extend(values)
+        rows.append("(%s)" % ", ".join(["%s"] * len(values)))
+
+    sql = "UPDATE %s AS t SET %s FROM (VALUES %s) AS v (%s) WHERE %s RETURNING %s" % (
+        qn(model._meta.db_table),
+        ", ".join(assignments),
+        ", ".join(rows),
+        ", ".join(aliases),
+        " AND ".join(conditions),
+        ", ".join("t.%s" % qn(_get_field(model, name).column) for name in filter_names),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        updated = cursor.fetchall()
+
+    metrics.incr(
+        "buffer.batch-update.rows",
+        amount=len(updated),
+        skip_internal=True,
+        tags={"model": model.__name__},
+    )
+
+    filter_fields = [_get_field(model, name) for name in filter_names]
+    return set(
+        tuple(field.to_python(value) for field, value in zip(filter_fields, row)) for row in updated
+    )
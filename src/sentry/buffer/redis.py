@@ -7,7 +7,7 @@ from time import time
 from binascii import crc32
 
 from datetime import datetime
-from django.db import models
+from django.db import models, router as db_router, transaction
 from django.utils import timezone
 from django.utils.encoding import force_bytes
 
@@ -15,14 +15,17 @@ from sentry.buffer import Buffer
 from sentry.exceptions import InvalidConfiguration
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
+from sentry.utils.coalescing import CoalescingBuffer
 from sentry.utils.compat import pickle
 from sentry.utils.hashlib import md5_text
 from sentry.utils.imports import import_string
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
 
 _local_buffers = None
 _local_buffers_lock = threading.Lock()
 
+incr_script = load_script("buffer/incr.lua")
+
 
 class PendingBuffer(object):
     def __init__(self, size):
@@ -55,13 +58,36 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(
+        self,
+        pending_partitions=1,
+        incr_batch_size=2,
+        incr_coalesce_window=0,
+        incr_coalesce_max_keys=1000,
+        **options
+    ):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
 
+        # Increments to the same (model, filters) pair are merged in process
+        # for up to ``incr_coalesce_window`` seconds, or until
+        # ``incr_coalesce_max_keys`` distinct pairs are pending, before they
+        # are written to Redis. A window of 0 writes every increment directly.
+        self.incr_coalesce_window = incr_coalesce_window
+        self.incr_coalesce_max_keys = incr_coalesce_max_keys
+        assert self.incr_coalesce_window >= 0
+        assert self.incr_coalesce_max_keys > 0
+        self._pending_incrs = (
+            CoalescingBuffer(
+                self._flush_pending_incrs, incr_coalesce_window, incr_coalesce_max_keys
+            )
+            if incr_coalesce_window
+            else None
+        )
+
     def validate(self):
         try:
             with self.cluster.all() as client:
@@ -118,12 +144,14 @@ class RedisBuffer(Buffer):
         return result
 
     def _dump_value(self, value):
-        if isinstance(value, six.string_types):
+        if isinstance(value, bool):
+            raise TypeError(type(value))
+        elif isinstance(value, six.string_types):
             type_ = "s"
         elif isinstance(value, datetime):
             type_ = "d"
             value = value.strftime("%s.%f")
-        elif isinstance(value, int):
+        elif isinstance(value, six.integer_types):
             type_ = "i"
         elif isinstance(value, float):
             type_ = "f"
@@ -150,6 +178,22 @@ class RedisBuffer(Buffer):
         else:
             raise TypeError("invalid type: {}".format(type_))
 
+    def _encode_filters(self, filters):
+        try:
+            return json.dumps(self._dump_values(filters))
+        except TypeError:
+            # Filters may contain values that cannot be represented in JSON
+            # (e.g. model instances), so those are pickled instead.
+            return pickle.dumps(filters)
+
+    def _encode_extra_value(self, value):
+        try:
+            return json.dumps(self._dump_value(value))
+        except TypeError:
+            # Group tries to serialize 'score' (and the group metadata), so we
+            # need to fall back to pickle for anything that is not a primitive.
+            return pickle.dumps(value)
+
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
         Increment the key by doing the following:
@@ -159,41 +203,11 @@ class RedisBuffer(Buffer):
             - Perform a set (last write wins) on extra
             - Perform a set on signal_only (only if True)
         - Add hashmap key to pending flushes
-        """
 
-        # TODO(dcramer): longer term we'd rather not have to serialize values
-        # here (unless it's to JSON)
+        If a coalescing window is configured, increments to the same key are
+        merged in process first and written by ``flush_incrs``.
+        """
         key = self._make_key(model, filters)
-        pending_key = self._make_pending_key_from_key(key)
-        # We can't use conn.map() due to wanting to support multiple pending
-        # keys (one per Redis partition)
-        conn = self.cluster.get_local_client_for_key(key)
-
-        pipe = conn.pipeline()
-        pipe.hsetnx(key, "m", "%s.%s" % (model.__module__, model.__name__))
-        # TODO(dcramer): once this goes live in production, we can kill the pickle path
-        # (this is to ensure a zero downtime deploy where we can transition event processing)
-        pipe.hsetnx(key, "f", pickle.dumps(filters))
-        # pipe.hsetnx(key, 'f', json.dumps(self._dump_values(filters)))
-        for column, amount in six.iteritems(columns):
-            pipe.hincrby(key, "i+" + column, amount)
-
-        if extra:
-            # Group tries to serialize 'score', so we'd need some kind of processing
-            # hook here
-            # e.g. "update score if last_seen or times_seen is changed"
-            for column, value in six.iteritems(extra):
-                # TODO(dcramer): once this goes live in production, we can kill the pickle path
-                # (this is to ensure a zero downtime deploy where we can transition event processing)
-                pipe.hset(key, "e+" + column, pickle.dumps(value))
-                # pipe.hset(key, 'e+' + column, json.dumps(self._dump_value(value)))
-
-        if signal_only is True:
-            pipe.hset(key, "s", "1")
-
-        pipe.expire(key, self.key_expire)
-        pipe.zadd(pending_key, time(), key)
-        pipe.execute()
 
         metrics.incr(
             "buffer.incr",
@@ -201,6 +215,79 @@ class RedisBuffer(Buffer):
             tags={"module": model.__module__, "model": model.__name__},
         )
 
+        if self._pending_incrs is None:
+            pending = self._make_pending_incr(model, filters)
+            self._merge_incr(pending, columns, extra, signal_only)
+            self._write_incrs({key: pending})
+            return
+
+        with self._pending_incrs.pending() as pending_incrs:
+            pending = pending_incrs.get(key)
+            if pending is None:
+                pending = pending_incrs[key] = self._make_pending_incr(model, filters)
+            self._merge_incr(pending, columns, extra, signal_only)
+
+    def _make_pending_incr(self, model, filters):
+        return {
+            "model": model,
+            "filters": filters,
+            "columns": {},
+            "extra": {},
+            "signal_only": False,
+        }
+
+    def _merge_incr(self, pending, columns, extra, signal_only):
+        for column, amount in six.iteritems(columns):
+            pending["columns"][column] = pending["columns"].get(column, 0) + amount
+        if extra:
+            pending["extra"].update(extra)
+        if signal_only is True:
+            pending["signal_only"] = True
+
+    def flush_incrs(self):
+        """
+        Writes all increments merged within the current coalescing window to
+        Redis.
+        """
+        if self._pending_incrs is not None:
+            self._pending_incrs.flush()
+
+    def _flush_pending_incrs(self, pending_incrs):
+        metrics.timing("buffer.coalesced-keys", len(pending_incrs))
+        self._write_incrs(pending_incrs)
+
+    def _write_incrs(self, pending_incrs):
+        """
+        Writes merged increments with one script invocation per Redis host.
+        """
+        router = self.cluster.get_router()
+        keys_by_host = {}
+        for key in pending_incrs:
+            keys_by_host.setdefault(router.get_host_for_key(key), []).append(key)
+
+        now = time()
+        for host, keys in six.iteritems(keys_by_host):
+            script_keys = []
+            script_args = [self.key_expire, now]
+            for key in keys:
+                pending = pending_incrs[key]
+                script_keys.extend([key, self._make_pending_key_from_key(key)])
+                script_args.extend(
+                    [
+                        "%s.%s" % (pending["model"].__module__, pending["model"].__name__),
+                        self._encode_filters(pending["filters"]),
+                        "1" if pending["signal_only"] else "0",
+                        len(pending["columns"]),
+                    ]
+                )
+                for column, amount in six.iteritems(pending["columns"]):
+                    script_args.extend([column, amount])
+                script_args.append(len(pending["extra"]))
+                for column, value in six.iteritems(pending["extra"]):
+                    script_args.extend([column, self._encode_extra_value(value)])
+
+            incr_script(self.cluster.get_local_client(host), script_keys, script_args)
+
     def process_pending(self, partition=None):
         if partition is None and self.pending_partitions > 1:
             # If we're using partitions, this one task fans out into
@@ -219,17 +306,22 @@ class RedisBuffer(Buffer):
             return
 
         pending_buffer = PendingBuffer(self.incr_batch_size)
+        metric_tags = {"partition": "none" if partition is None else partition}
 
         try:
             keycount = 0
+            oldest = None
             with self.cluster.all() as conn:
-                results = conn.zrange(pending_key, 0, -1)
+                results = conn.zrange(pending_key, 0, -1, withscores=True)
 
             with self.cluster.all() as conn:
-                for host_id, keys in six.iteritems(results.value):
-                    if not keys:
+                for host_id, items in six.iteritems(results.value):
+                    if not items:
                         continue
+                    keys = [key for key, _ in items]
                     keycount += len(keys)
+                    host_oldest = min(score for _, score in items)
+                    oldest = host_oldest if oldest is None else min(oldest, host_oldest)
                     for key in keys:
                         pending_buffer.append(key)
                         if pending_buffer.full():
@@ -240,7 +332,11 @@ class RedisBuffer(Buffer):
             if not pending_buffer.empty():
                 process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
 
-            metrics.timing("buffer.pending-size", keycount)
+            metrics.timing("buffer.pending-size", keycount, tags=metric_tags)
+            if oldest is not None:
+                # The age of the oldest pending key approximates how far
+                # behind flushing this partition is.
+                metrics.timing("buffer.pending-age", time() - oldest, tags=metric_tags)
         finally:
             client.delete(lock_key)
 
@@ -249,10 +345,138 @@ class RedisBuffer(Buffer):
         assert not (key is not None and batch_keys is not None)
 
         if key is not None:
-            batch_keys = [key]
-
-        for key in batch_keys:
             self._process_single_incr(key)
+        else:
+            self._process_batch_incrs(batch_keys)
+
+    def _load_incr(self, values):
+        """
+        Decodes the hash of a buffered key into the arguments of
+        ``Buffer.process``.
+        """
+        model = import_string(values.pop("m"))
+        if values["f"].startswith("{"):
+            filters = self._load_values(json.loads(values.pop("f")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in six.iteritems(values):
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith("["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
+    def _process_batch_incrs(self, keys):
+        """
+        Reads and removes the hashes of all keys with one transaction per
+        Redis host and applies them through ``Buffer.process_batch``.
+
+        Like ``_process_single_incr``, every key is locked while it is being
+        processed. Increments are applied in one database transaction per
+        database, and written back to Redis if that transaction fails.
+        """
+        lock_keys = {}
+        with self.cluster.map() as client:
+            for key in keys:
+                lock_key = self._make_lock_key(key)
+                lock_keys[key] = (lock_key, client.set(lock_key, "1", nx=True, ex=10))
+
+        locked_keys = []
+        for key in keys:
+            lock_key, acquired = lock_keys[key]
+            if acquired.value:
+                locked_keys.append(key)
+            else:
+                metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
+
+        try:
+            self.__process_locked_batch_incrs(locked_keys)
+        finally:
+            with self.cluster.map() as client:
+                for key in locked_keys:
+                    client.delete(lock_keys[key][0])
+
+    def __process_locked_batch_incrs(self, keys):
+        router = self.cluster.get_router()
+        keys_by_host = {}
+        for key in keys:
+            keys_by_host.setdefault(router.get_host_for_key(key), []).append(key)
+
+        # Increments and the hashes they were read from, by database
+        incrs_by_db = {}
+        with metrics.timer("buffer.process-batch.read"):
+            for host, host_keys in six.iteritems(keys_by_host):
+                pipe = self.cluster.get_local_client(host).pipeline()
+                for key in host_keys:
+                    pipe.hgetall(key)
+                    pipe.zrem(self._make_pending_key_from_key(key), key)
+                    pipe.delete(key)
+                results = pipe.execute()
+
+                for key, values in zip(host_keys, results[::3]):
+                    if not values:
+                        metrics.incr(
+                            "buffer.revoked", tags={"reason": "empty"}, skip_internal=False
+                        )
+                        self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                        continue
+                    incr = self._load_incr(dict(values))
+                    incrs, hashes = incrs_by_db.setdefault(
+                        db_router.db_for_write(incr[0]), ([], {})
+                    )
+                    incrs.append(incr)
+                    hashes[key] = values
+
+        error = None
+        with metrics.timer("buffer.process-batch.write"):
+            for using, (incrs, hashes) in six.iteritems(incrs_by_db):
+                try:
+                    with transaction.atomic(using=using):
+                        self.process_batch(incrs)
+                except Exception as e:
+                    self.logger.exception("buffer.process-batch.failed")
+                    self._restore_incrs(hashes)
+                    error = error or e
+
+        if error is not None:
+            raise error
+
+    def _restore_incrs(self, hashes):
+        """
+        Writes hashes that were read by ``_process_batch_incrs`` back to
+        Redis. Counters are added to anything buffered in the meantime, while
+        newer values of all other fields are kept.
+        """
+        router = self.cluster.get_router()
+        keys_by_host = {}
+        for key in hashes:
+            keys_by_host.setdefault(router.get_host_for_key(key), []).append(key)
+
+        now = time()
+        for host, keys in six.iteritems(keys_by_host):
+            pipe = self.cluster.get_local_client(host).pipeline()
+            for key in keys:
+                for field, value in six.iteritems(hashes[key]):
+                    if field.startswith("i+"):
+                        pipe.hincrby(key, field, int(value))
+                    else:
+                        pipe.hsetnx(key, field, value)
+                pipe.expire(key, self.key_expire)
+                pipe.zadd(self._make_pending_key_from_key(key), now, key)
+            pipe.execute()
 
     def _process_single_incr(self, key):
         client = self.cluster.get_routing_client()
@@ -279,28 +503,6 @@ class RedisBuffer(Buffer):
                 self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            model = import_string(values.pop("m"))
-            if values["f"].startswith("{"):
-                filters = self._load_values(json.loads(values.pop("f")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in six.iteritems(values):
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith("["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super(RedisBuffer, self).process(model, incr_values, filters, extra_values, signal_only)
+            super(RedisBuffer, self).process(*self._load_incr(values))
         finally:
             client.delete(lock_key)
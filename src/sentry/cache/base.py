@@ -19,6 +19,20 @@ class BaseCache(local):
     def set(self, key, value, timeout, version=None, raw=False):
         raise NotImplementedError
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        for key, value in items:
+            self.set(key, value, timeout, version=version, raw=raw)
+
+    def add(self, key, value, timeout, version=None, raw=False):
+        """
+        Sets the key only if it does not exist yet. Returns `True` if the
+        value was stored.
+        """
+        if self.get(key, version=version, raw=raw) is not None:
+            return False
+        self.set(key, value, timeout, version=version, raw=raw)
+        return True
+
     def delete(self, key, version=None):
         raise NotImplementedError
 
@@ -9,6 +9,12 @@ class DjangoCache(BaseCache):
     def set(self, key, value, timeout, version=None, raw=False):
         cache.set(key, value, timeout, version=version or self.version)
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        cache.set_many(dict(items), timeout, version=version or self.version)
+
+    def add(self, key, value, timeout, version=None, raw=False):
+        return cache.add(key, value, timeout, version=version or self.version)
+
     def delete(self, key, version=None):
         cache.delete(key, version=version or self.version)
 
@@ -18,15 +18,33 @@ class CommonRedisCache(BaseCache):
         self.client = client
         BaseCache.__init__(self, **options)
 
-    def set(self, key, value, timeout, version=None, raw=False):
+    def _prepare(self, key, value, version=None, raw=False):
         key = self.make_key(key, version=version)
         v = json.dumps(value) if not raw else value
         if len(v) > self.max_size:
             raise ValueTooLarge("Cache key too large: %r %r" % (key, len(v)))
+        return key, v
+
+    def _set(self, client, key, v, timeout):
         if timeout:
-            self.client.setex(key, int(timeout), v)
+            client.setex(key, int(timeout), v)
         else:
-            self.client.set(key, v)
+            client.set(key, v)
+
+    def set(self, key, value, timeout, version=None, raw=False):
+        key, v = self._prepare(key, value, version=version, raw=raw)
+        self._set(self.client, key, v, timeout)
+
+    def set_many(self, items, timeout, version=None, raw=False):
+        values = [self._prepare(key, value, version=version, raw=raw) for key, value in items]
+        pipe = self.client.pipeline(transaction=False)
+        for key, v in values:
+            self._set(pipe, key, v, timeout)
+        pipe.execute()
+
+    def add(self, key, value, timeout, version=None, raw=False):
+        key, v = self._prepare(key, value, version=version, raw=raw)
+        return bool(self.client.set(key, v, ex=int(timeout) if timeout else None, nx=True))
 
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
@@ -46,6 +64,14 @@ class RbCache(CommonRedisCache):
         client = cluster.get_routing_client()
         CommonRedisCache.__init__(self, client, **options)
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        # The routing client does not support pipelines, but it can send
+        # commands to all hosts concurrently.
+        values = [self._prepare(key, value, version=version, raw=raw) for key, value in items]
+        with self.client.map() as client:
+            for key, v in values:
+                self._set(client, key, v, timeout)
+
 
 # Confusing legacy name for RbCache.  We don't actually have a pure redis cache
 RedisCache = RbCache
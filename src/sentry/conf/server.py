@@ -1060,6 +1060,10 @@ SENTRY_ALLOW_ORIGIN = None
 # Enable scraping of javascript context for source code
 SENTRY_SCRAPE_JAVASCRIPT_CONTEXT = True
 
+# Share the grouping components of recently grouped events between processes
+# through the default cache in addition to the process local cache.
+SENTRY_GROUPING_SHARED_VARIANT_CACHE = False
+
 # Buffer backend
 SENTRY_BUFFER = "sentry.buffer.Buffer"
 SENTRY_BUFFER_OPTIONS = {}
@@ -1070,6 +1074,12 @@ SENTRY_BUFFER_OPTIONS = {}
 SENTRY_CACHE = None
 SENTRY_CACHE_OPTIONS = {}
 
+# Seconds to keep model instances fetched with ``get_from_cache`` and
+# ``get_many_from_cache`` in a process-local tier in front of the cache.
+# Saves and deletes only invalidate this tier in the process they happen in,
+# so keep this short. 0 disables the tier.
+SENTRY_MODEL_CACHE_LOCAL_TTL = 0
+
 # Attachment blob cache backend
 SENTRY_ATTACHMENTS = "sentry.attachments.default.DefaultAttachmentCache"
 SENTRY_ATTACHMENTS_OPTIONS = {}
@@ -1115,6 +1125,10 @@ SENTRY_DEFAULT_MAX_EVENTS_PER_MINUTE = "90%"
 # Snuba configuration
 SENTRY_SNUBA = os.environ.get("SNUBA", "http://127.0.0.1:1218")
 
+# Seconds that Snuba queries sent with ``use_cache`` are quantized to and
+# cached for. Must divide an hour evenly, 0 disables the cache.
+SENTRY_SNUBA_CACHE_DURATION = 60
+
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS = {}
@@ -1910,9 +1924,15 @@ SYMBOLICATOR_PROCESS_EVENT_WARN_TIMEOUT = 120
 
 # Block process_event for this many seconds to wait for a response from
 # symbolicator. If too low, too many events up in the sleep queue. If too high,
-# process_event might backlog and affect events from other platforms.
+# process_event might backlog and affect events from other platforms. Setting
+# this to 0 submits tasks without blocking and leaves all waiting to the sleep
+# queue.
 SYMBOLICATOR_POLL_TIMEOUT = 4
 
+# Send identical stacktrace symbolication requests of different events to
+# symbolicator only once and share the response between them.
+SYMBOLICATOR_COALESCE_REQUESTS = False
+
 SENTRY_REQUEST_METRIC_ALLOWED_PATHS = (
     "sentry.web.api",
     "sentry.web.frontend",
@@ -5,6 +5,7 @@ import six
 import threading
 import weakref
 
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from django.conf import settings
@@ -17,12 +18,13 @@ from django.utils.encoding import smart_text
 from celery.signals import task_postrun
 
 from sentry.utils.cache import cache
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.hashlib import md5_text
 
 from .query import create_or_update
-from sentry.utils.compat import zip
+from sentry.utils.compat import pickle, zip
 
-__all__ = ("BaseManager", "OptionManager")
+__all__ = ("BaseManager", "OptionManager", "bulk_get_from_cache")
 
 logger = logging.getLogger("sentry")
 
@@ -31,6 +33,13 @@ _local_cache = threading.local()
 _local_cache_generation = 0
 _local_cache_enabled = False
 
+#: Process-local tier in front of the shared model cache, enabled with
+#: ``SENTRY_MODEL_CACHE_LOCAL_TTL``. Entries are pickled so that every caller
+#: gets its own instance. Keys include a per-model generation that is bumped
+#: whenever an instance of the model is saved or deleted in this process.
+_process_cache = LRUCache(10000)
+_process_cache_generations = {}
+
 
 def __prep_value(model, key, value):
     if isinstance(value, Model):
@@ -156,7 +165,7 @@ class BaseManager(Manager):
             return
 
         post_init.connect(self.__post_init, sender=sender, weak=False)
-        post_save.connect(self.__post_save, sender=sender, weak=False)
+        post_save.connect(self.__post_save_signal, sender=sender, weak=False)
         post_delete.connect(self.__post_delete, sender=sender, weak=False)
 
     def __cache_state(self, instance):
@@ -174,6 +183,10 @@ class BaseManager(Manager):
         """
         self.__cache_state(instance)
 
+    def __post_save_signal(self, instance, **kwargs):
+        self.__invalidate_process_cache()
+        self.__post_save(instance)
+
     def __post_save(self, instance, **kwargs):
         """
         Pushes changes to an instance into the cache, and removes invalid (changed)
@@ -223,10 +236,44 @@ class BaseManager(Manager):
 
         self.__cache_state(instance)
 
+    def __post_save_many(self, instances):
+        """
+        Pushes several instances into the cache with a single write. Unlike
+        ``__post_save``, this does not remove invalid lookup values, so it
+        must only be used for instances that were just loaded from the
+        database.
+        """
+        pk_name = self.model._meta.pk.name
+        values = {}
+        for instance in instances:
+            for key in self.cache_fields:
+                if key in ("pk", pk_name):
+                    continue
+                value = self.__value_for_field(instance, key)
+                values[self.__get_lookup_cache_key(**{key: value})] = instance.pk
+            values[self.__get_lookup_cache_key(**{pk_name: instance.pk})] = instance
+
+        # Ensure we don't serialize the database into the cache
+        dbs = [instance._state.db for instance in instances]
+        for instance in instances:
+            instance._state.db = None
+        try:
+            cache.set_many(values, timeout=self.cache_ttl, version=self.cache_version)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+        finally:
+            for instance, db in zip(instances, dbs):
+                instance._state.db = db
+
+        for instance in instances:
+            self.__cache_state(instance)
+
     def __post_delete(self, instance, **kwargs):
         """
         Drops instance from all cache storages.
         """
+        self.__invalidate_process_cache()
+
         pk_name = instance._meta.pk.name
         for key in self.cache_fields:
             if key in ("pk", pk_name):
@@ -244,6 +291,46 @@ class BaseManager(Manager):
     def __get_lookup_cache_key(self, **kwargs):
         return make_key(self.model, "modelcache", kwargs)
 
+    def __get_process_cache_key(self, cache_key):
+        return (cache_key, self.cache_version, _process_cache_generations.get(self.model, 0))
+
+    def __get_from_process_cache(self, cache_keys):
+        """
+        Returns a dictionary of cache keys to fresh instances for all keys
+        found in the process-local tier.
+        """
+        if not settings.SENTRY_MODEL_CACHE_LOCAL_TTL:
+            return {}
+
+        keys = {self.__get_process_cache_key(cache_key): cache_key for cache_key in cache_keys}
+        results = {}
+        for key, value in six.iteritems(_process_cache.get_many(keys)):
+            instance = pickle.loads(value)
+            instance._state.db = router.db_for_read(self.model)
+            results[keys[key]] = instance
+        return results
+
+    def __set_process_cache(self, items):
+        """
+        Stores ``(cache_key, instance)`` pairs in the process-local tier.
+        """
+        ttl = settings.SENTRY_MODEL_CACHE_LOCAL_TTL
+        if not ttl:
+            return
+
+        for cache_key, instance in items:
+            # Ensure we don't serialize the database into the cache
+            db = instance._state.db
+            instance._state.db = None
+            try:
+                value = pickle.dumps(instance, pickle.HIGHEST_PROTOCOL)
+            finally:
+                instance._state.db = db
+            _process_cache.set(self.__get_process_cache_key(cache_key), value, ttl=ttl)
+
+    def __invalidate_process_cache(self):
+        _process_cache_generations[self.model] = _process_cache_generations.get(self.model, 0) + 1
+
     def __value_for_field(self, instance, key):
         """
         Return the cacheable value for a field.
@@ -291,11 +378,18 @@ class BaseManager(Manager):
                 if result is not None:
                     return result
 
+            result = self.__get_from_process_cache([cache_key]).get(cache_key)
+            if result is not None:
+                if local_cache is not None:
+                    local_cache[cache_key] = result
+                return result
+
             retval = cache.get(cache_key, version=self.cache_version)
             if retval is None:
                 result = self.get(**kwargs)
                 # Ensure we're pushing it into the cache
                 self.__post_save(instance=result)
+                self.__set_process_cache([(cache_key, result)])
                 if local_cache is not None:
                     local_cache[cache_key] = result
                 return result
@@ -304,6 +398,7 @@ class BaseManager(Manager):
             # key
             if key != pk_name:
                 result = self.get_from_cache(**{pk_name: retval})
+                self.__set_process_cache([(cache_key, result)])
                 if local_cache is not None:
                     local_cache[cache_key] = result
                 return result
@@ -321,6 +416,7 @@ class BaseManager(Manager):
                 return self.get(**kwargs)
 
             retval._state.db = router.db_for_read(self.model, **kwargs)
+            self.__set_process_cache([(cache_key, retval)])
 
             return retval
         else:
@@ -371,7 +467,28 @@ class BaseManager(Manager):
         if not cache_lookup_cache_keys:
             return final_results
 
+        process_results = self.__get_from_process_cache(cache_lookup_cache_keys)
+        if process_results:
+            remaining_cache_keys = []
+            remaining_values = []
+            for cache_key, value in zip(cache_lookup_cache_keys, cache_lookup_values):
+                result = process_results.get(cache_key)
+                if result is None:
+                    remaining_cache_keys.append(cache_key)
+                    remaining_values.append(value)
+                    continue
+
+                final_results.append(result)
+                if local_cache is not None:
+                    local_cache[cache_key] = result
+            cache_lookup_cache_keys = remaining_cache_keys
+            cache_lookup_values = remaining_values
+
+            if not cache_lookup_cache_keys:
+                return final_results
+
         cache_results = cache.get_many(cache_lookup_cache_keys, version=self.cache_version)
+        process_writes = []
 
         db_lookup_cache_keys = []
         db_lookup_values = []
@@ -409,17 +526,20 @@ class BaseManager(Manager):
                 continue
 
             final_results.append(cache_result)
+            process_writes.append((cache_key, cache_result))
 
         if nested_lookup_values:
             nested_results = self.get_many_from_cache(nested_lookup_values, key=pk_name)
             final_results.extend(nested_results)
-            if local_cache is not None:
-                for nested_result in nested_results:
-                    value = getattr(nested_result, key)
-                    cache_key = self.__get_lookup_cache_key(**{key: value})
+            for nested_result in nested_results:
+                value = getattr(nested_result, key)
+                cache_key = self.__get_lookup_cache_key(**{key: value})
+                process_writes.append((cache_key, nested_result))
+                if local_cache is not None:
                     local_cache[cache_key] = nested_result
 
         if not db_lookup_values:
+            self.__set_process_cache(process_writes)
             return final_results
 
         cache_writes = []
@@ -432,14 +552,15 @@ class BaseManager(Manager):
 
             # Ensure we're pushing it into the cache
             cache_writes.append(db_result)
+            process_writes.append((cache_key, db_result))
             if local_cache is not None:
                 local_cache[cache_key] = db_result
 
             final_results.append(db_result)
 
-        # XXX: Should use set_many here, but __post_save code is too complex
-        for instance in cache_writes:
-            self.__post_save(instance=instance)
+        if cache_writes:
+            self.__post_save_many(cache_writes)
+        self.__set_process_cache(process_writes)
 
         return final_results
 
@@ -489,3 +610,25 @@ class OptionManager(BaseManager):
     def _make_key(self, instance_id):
         assert instance_id
         return u"%s:%s" % (self.model._meta.db_table, instance_id)
+
+
+def bulk_get_from_cache(lookups):
+    """
+    Resolves primary key lookups for several models at once, like
+    ``get_many_from_cache``. ``lookups`` is an iterable of ``(model, pk)``
+    tuples. Lookups are deduplicated and grouped by model, so that each model
+    is resolved with one ``cache.get_many`` and at most one query for the
+    misses.
+
+    Returns a dictionary of ``(model, pk)`` to instances. Instances that do
+    not exist are missing from the result.
+    """
+    pks_by_model = OrderedDict()
+    for model, pk in lookups:
+        pks_by_model.setdefault(model, OrderedDict())[pk] = True
+
+    results = {}
+    for model, pks in six.iteritems(pks_by_model):
+        for instance in model.objects.get_many_from_cache(list(pks)):
+            results[(model, instance.pk)] = instance
+    return results
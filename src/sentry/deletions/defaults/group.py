@@ -103,6 +103,15 @@ class GroupDeletionTask(ModelDeletionTask):
 
         return relations
 
+    def delete_instance_bulk(self, instance_list):
+        from sentry.models import GroupHash
+
+        # Hashes of the groups are gone by now, but may still be cached.
+        for project_id in set(instance.project_id for instance in instance_list):
+            GroupHash.invalidate_cache(project_id)
+
+        return super(GroupDeletionTask, self).delete_instance_bulk(instance_list)
+
     def delete_instance(self, instance):
         from sentry.similarity import features
 
@@ -55,7 +55,16 @@ class Backend(Service):
     be transitioned to "waiting" instead.)
     """
 
-    __all__ = ("add", "delete", "digest", "enabled", "maintenance", "schedule", "validate")
+    __all__ = (
+        "add",
+        "add_many",
+        "delete",
+        "digest",
+        "enabled",
+        "maintenance",
+        "schedule",
+        "validate",
+    )
 
     def __init__(self, **options):
         # The ``minimum_delay`` option defines the default minimum amount of
@@ -123,6 +132,19 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    def add_many(self, records, increment_delay=None, maximum_delay=None):
+        """
+        Add several records to their timelines at once.
+
+        ``records`` is a sequence of ``(key, record)`` tuples. The return value
+        is a list that indicates for every record whether or not its timeline
+        is ready for immediate digestion, like the return value of ``add``.
+        """
+        return [
+            self.add(key, record, increment_delay=increment_delay, maximum_delay=maximum_delay)
+            for key, record in records
+        ]
+
     def digest(self, key, minimum_delay=None):
         """
         Extract records from a timeline for processing.
@@ -4,6 +4,7 @@ import logging
 import six
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from redis.client import ResponseError
 
@@ -14,6 +15,7 @@ from sentry.utils.locking.manager import LockManager
 from sentry.utils.redis import check_cluster_versions, get_cluster_from_options, load_script
 from sentry.utils.versioning import Version
 from sentry.utils.compat import map
+from sentry.utils.compat import zip
 
 logger = logging.getLogger("sentry.digests")
 
@@ -94,6 +96,9 @@ class RedisBackend(Backend):
     def _get_connection(self, key):
         return self.cluster.get_local_client_for_key(u"{}:t:{}".format(self.namespace, key))
 
+    def _get_host_for_key(self, key):
+        return self.cluster.get_router().get_host_for_key(u"{}:t:{}".format(self.namespace, key))
+
     def _get_timeline_lock(self, key, duration):
         lock_key = u"{}:t:{}".format(self.namespace, key)
         return self.locks.get(lock_key, duration=duration, routing_key=lock_key)
@@ -131,6 +136,60 @@ class RedisBackend(Backend):
             )
         )
 
+    def add_many(self, records, increment_delay=None, maximum_delay=None, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+
+        if increment_delay is None:
+            increment_delay = self.increment_delay
+
+        if maximum_delay is None:
+            maximum_delay = self.maximum_delay
+
+        records = list(records)
+
+        # Timelines are scheduled on the host they are stored on, so all
+        # records for the same host are added with a single script call.
+        hosts = {}
+        for index, (key, record) in enumerate(records):
+            hosts.setdefault(self._get_host_for_key(key), []).append(index)
+
+        results = [False] * len(records)
+        for host, indexes in six.iteritems(hosts):
+            keys = []
+            arguments = [
+                "ADD_MANY",
+                self.namespace,
+                self.ttl,
+                timestamp,
+                increment_delay,
+                maximum_delay,
+                self.capacity if self.capacity else -1,
+                self.truncation_chance,
+            ]
+            for index in indexes:
+                key, record = records[index]
+                keys.append(key)
+                arguments.extend(
+                    [key, record.key, self.codec.encode(record.value), record.timestamp]
+                )
+
+            response = script(self.cluster.get_local_client(host), keys, arguments)
+            for index, ready in zip(indexes, response):
+                results[index] = bool(ready)
+
+        return results
+
+    def __run_partitions(self, function, deadline, timestamp):
+        # Partitions are independent of each other, so they are processed
+        # concurrently to keep latency flat as the number of hosts grows.
+        hosts = list(self.cluster.hosts)
+        with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+            futures = [
+                (host, executor.submit(function, host, deadline, timestamp)) for host in hosts
+            ]
+        return futures
+
     def __schedule_partition(self, host, deadline, timestamp):
         return script(
             self.cluster.get_local_client(host),
@@ -142,9 +201,9 @@ class RedisBackend(Backend):
         if timestamp is None:
             timestamp = time.time()
 
-        for host in self.cluster.hosts:
+        for host, future in self.__run_partitions(self.__schedule_partition, deadline, timestamp):
             try:
-                for key, timestamp in self.__schedule_partition(host, deadline, timestamp):
+                for key, timestamp in future.result():
                     yield ScheduleEntry(key, float(timestamp))
             except Exception as error:
                 logger.error(
@@ -165,9 +224,11 @@ class RedisBackend(Backend):
         if timestamp is None:
             timestamp = time.time()
 
-        for host in self.cluster.hosts:
+        for host, future in self.__run_partitions(
+            self.__maintenance_partition, deadline, timestamp
+        ):
             try:
-                self.__maintenance_partition(host, deadline, timestamp)
+                future.result()
             except Exception as error:
                 logger.error(
                     "Failed to perform maintenance on digest partition %r due to error: %r",
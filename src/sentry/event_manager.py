@@ -81,6 +81,7 @@ from sentry.utils.data_filters import (
     is_valid_error_message,
     FilterStatKeys,
 )
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.dates import to_timestamp, to_datetime
 from sentry.utils.outcomes import Outcome, track_outcome
 from sentry.utils.safe import safe_execute, trim, get_path, setdefault_path
@@ -95,6 +96,9 @@ SECURITY_REPORT_INTERFACES = ("csp", "hpkp", "expectct", "expectstaple")
 # Timeout for cached group crash report counts
 CRASH_REPORT_TIMEOUT = 24 * 3600  # one day
 
+# Process-local cache of hash to group assignments, see `_find_hashes_many`.
+_group_hash_cache = LRUCache(max_entries=10000, ttl=300)
+
 
 def pop_tag(data, key):
     data["tags"] = [kv for kv in data["tags"] if kv is None or kv[0] != key]
@@ -468,201 +472,17 @@ class EventManager(object):
                 id=project.organization_id
             )
 
-        job = {"data": self._data, "project_id": project_id, "raw": raw, "start_time": start_time}
-        jobs = [job]
-
-        _pull_out_data(jobs, projects)
-        _get_or_create_release_many(jobs, projects)
-        _get_event_user_many(jobs, projects)
-
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            grouping_config = load_grouping_config(
-                get_grouping_config_dict_for_event_data(job["data"], project)
-            )
-
-        with metrics.timer("event_manager.normalize_stacktraces_for_grouping"):
-            normalize_stacktraces_for_grouping(job["data"], grouping_config)
-
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
-
-        with metrics.timer("event_manager.apply_server_fingerprinting"):
-            # The active grouping config was put into the event in the
-            # normalize step before.  We now also make sure that the
-            # fingerprint was set to `'{{ default }}' just in case someone
-            # removed it from the payload.  The call to get_hashes will then
-            # look at `grouping_config` to pick the right parameters.
-            job["data"]["fingerprint"] = job["data"].get("fingerprint") or ["{{ default }}"]
-            apply_server_fingerprinting(job["data"], get_fingerprinting_config_for_project(project))
-
-        with metrics.timer("event_manager.event.get_hashes"):
-            # Here we try to use the grouping config that was requested in the
-            # event.  If that config has since been deleted (because it was an
-            # experimental grouping config) we fall back to the default.
-            try:
-                hashes = job["event"].get_hashes()
-            except GroupingConfigNotFound:
-                job["data"]["grouping_config"] = get_grouping_config_dict_for_project(project)
-                hashes = job["event"].get_hashes()
-
-        job["data"]["hashes"] = hashes
-
-        _materialize_metadata_many(jobs)
-
-        # The group gets the same metadata as the event when it's flushed but
-        # additionally the `last_received` key is set.  This key is used by
-        # _save_aggregate.
-        group_metadata = dict(job["materialized_metadata"])
-        group_metadata["last_received"] = job["received_timestamp"]
-        kwargs = {
-            "platform": job["platform"],
-            "message": job["event"].search_message,
-            "culprit": job["culprit"],
-            "logger": job["logger_name"],
-            "level": LOG_LEVELS_MAP.get(job["level"]),
-            "last_seen": job["event"].datetime,
-            "first_seen": job["event"].datetime,
-            "active_at": job["event"].datetime,
-            "data": group_metadata,
+        job = {
+            "data": self._data,
+            "project_id": project_id,
+            "raw": raw,
+            "start_time": start_time,
+            "cache_key": cache_key,
         }
+        save_error_events([job], projects)
 
-        if job["release"]:
-            kwargs["first_release"] = job["release"]
-
-        try:
-            job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
-                event=job["event"], hashes=hashes, release=job["release"], **kwargs
-            )
-        except HashDiscarded:
-            project_key = None
-            if job["key_id"] is not None:
-                try:
-                    project_key = ProjectKey.objects.get_from_cache(id=job["key_id"])
-                except ProjectKey.DoesNotExist:
-                    pass
-
-            quotas.refund(project, key=project_key, timestamp=start_time)
-
-            track_outcome(
-                org_id=project.organization_id,
-                project_id=project_id,
-                key_id=job["key_id"],
-                outcome=Outcome.FILTERED,
-                reason=FilterStatKeys.DISCARDED_HASH,
-                timestamp=to_datetime(job["start_time"]),
-                event_id=job["event"].event_id,
-                category=job["category"],
-            )
-
-            metrics.incr(
-                "events.discarded",
-                skip_internal=True,
-                tags={"organization_id": project.organization_id, "platform": job["platform"]},
-            )
-            raise
-
-        job["event"].group = job["group"]
-
-        # store a reference to the group id to guarantee validation of isolation
-        # XXX(markus): No clue what this does
-        job["event"].data.bind_ref(job["event"])
-
-        _get_or_create_environment_many(jobs, projects)
-
-        if job["group"]:
-            group_environment, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
-                group_id=job["group"].id,
-                environment_id=job["environment"].id,
-                defaults={"first_release": job["release"] or None},
-            )
-        else:
-            job["is_new_group_environment"] = False
-
-        _get_or_create_release_associated_models(jobs, projects)
-
-        if job["release"] and job["group"]:
-            job["grouprelease"] = GroupRelease.get_or_create(
-                group=job["group"],
-                release=job["release"],
-                environment=job["environment"],
-                datetime=job["event"].datetime,
-            )
-
-        _tsdb_record_all_metrics(jobs)
-
-        if job["group"]:
-            UserReport.objects.filter(project=project, event_id=job["event"].event_id).update(
-                group=job["group"], environment=job["environment"]
-            )
-
-        _materialize_event_metrics(jobs)
-
-        # Load attachments first, but persist them at the very last after
-        # posting to eventstream to make sure all counters and eventstream are
-        # incremented for sure.
-        attachments = []
-        for attachment in get_attachments(cache_key, job["event"]):
-            try:
-                attachment_data = attachment.data
-            except MissingAttachmentChunks:
-                logger.exception("Missing chunks for cache_key=%s", cache_key)
-            else:
-                key = "bytes.stored.%s" % (attachment.type,)
-                job["event_metrics"][key] = (job["event_metrics"].get(key) or 0) + len(
-                    attachment_data
-                )
-                attachments.append(attachment)
-
-        _nodestore_save_many(jobs)
-
-        if job["release"]:
-            if job["is_new"]:
-                buffer.incr(
-                    ReleaseProject,
-                    {"new_groups": 1},
-                    {"release_id": job["release"].id, "project_id": project.id},
-                )
-            if job["is_new_group_environment"]:
-                buffer.incr(
-                    ReleaseProjectEnvironment,
-                    {"new_issues_count": 1},
-                    {
-                        "project_id": project.id,
-                        "release_id": job["release"].id,
-                        "environment_id": job["environment"].id,
-                    },
-                )
-
-        if not raw:
-            if not project.first_event:
-                project.update(first_event=job["event"].datetime)
-                first_event_received.send_robust(
-                    project=project, event=job["event"], sender=Project
-                )
-
-        _eventstream_insert_many(jobs)
-
-        # Do this last to ensure signals get emitted even if connection to the
-        # file store breaks temporarily.
-        save_attachments(attachments, job["event"])
-
-        metric_tags = {"from_relay": "_relay_processed" in job["data"]}
-
-        metrics.timing(
-            "events.latency",
-            job["received_timestamp"] - job["recorded_timestamp"],
-            tags=metric_tags,
-        )
-        metrics.timing("events.size.data.post_save", job["event"].size, tags=metric_tags)
-        metrics.incr(
-            "events.post_save.normalize.errors",
-            amount=len(job["data"].get("errors") or ()),
-            tags=metric_tags,
-        )
-
-        _track_outcome_accepted_many(jobs)
+        if job.get("hash_discarded") is not None:
+            raise job["hash_discarded"]
 
         self._data = job["event"].data.data
         return job["event"]
@@ -774,6 +594,22 @@ def _get_event_user_many(jobs, projects):
         job["user"] = user
 
 
+@metrics.wraps("save_event.normalize_stacktraces_for_grouping_many")
+def _normalize_stacktraces_for_grouping_many(jobs, projects):
+    for job in jobs:
+        project = projects[job["project_id"]]
+
+        with metrics.timer("event_manager.load_grouping_config"):
+            # At this point we want to normalize the in_app values in case the
+            # clients did not set this appropriately so far.
+            grouping_config = load_grouping_config(
+                get_grouping_config_dict_for_event_data(job["data"], project)
+            )
+
+        with metrics.timer("event_manager.normalize_stacktraces_for_grouping"):
+            normalize_stacktraces_for_grouping(job["data"], grouping_config)
+
+
 @metrics.wraps("save_event.derive_plugin_tags_many")
 def _derive_plugin_tags_many(jobs, projects):
     # XXX: We ought to inline or remove this one for sure
@@ -806,6 +642,38 @@ def _derive_interface_tags_many(jobs):
                 data.pop(iface.path, None)
 
 
+@metrics.wraps("save_event.calculate_event_grouping_many")
+def _calculate_event_grouping_many(jobs, projects):
+    fingerprinting_configs = {}
+
+    for job in jobs:
+        project = projects[job["project_id"]]
+
+        with metrics.timer("event_manager.apply_server_fingerprinting"):
+            # The active grouping config was put into the event in the
+            # normalize step before.  We now also make sure that the
+            # fingerprint was set to `'{{ default }}' just in case someone
+            # removed it from the payload.  The call to get_hashes will then
+            # look at `grouping_config` to pick the right parameters.
+            if project.id not in fingerprinting_configs:
+                fingerprinting_configs[project.id] = get_fingerprinting_config_for_project(project)
+
+            job["data"]["fingerprint"] = job["data"].get("fingerprint") or ["{{ default }}"]
+            apply_server_fingerprinting(job["data"], fingerprinting_configs[project.id])
+
+        with metrics.timer("event_manager.event.get_hashes"):
+            # Here we try to use the grouping config that was requested in the
+            # event.  If that config has since been deleted (because it was an
+            # experimental grouping config) we fall back to the default.
+            try:
+                hashes = job["event"].get_hashes()
+            except GroupingConfigNotFound:
+                job["data"]["grouping_config"] = get_grouping_config_dict_for_project(project)
+                hashes = job["event"].get_hashes()
+
+        job["data"]["hashes"] = hashes
+
+
 @metrics.wraps("save_event.materialize_metadata_many")
 def _materialize_metadata_many(jobs):
     for job in jobs:
@@ -821,11 +689,134 @@ def _materialize_metadata_many(jobs):
         data["culprit"] = job["culprit"]
 
 
+@metrics.wraps("save_event.save_aggregate_many")
+def _save_aggregate_many(jobs, projects):
+    """
+    Assigns every job to a group.  Jobs whose hashes were discarded are
+    refunded, tracked as filtered and left out of the returned list, with the
+    exception stored in ``job["hash_discarded"]``.
+    """
+    saved_jobs = []
+
+    with metrics.timer("event_manager.find_hashes_many"):
+        hash_lists_by_project = {}
+        for job in jobs:
+            hash_lists_by_project.setdefault(job["project_id"], []).append(job["data"]["hashes"])
+
+        group_hashes_by_project = {
+            project_id: iter(_find_hashes_many(projects[project_id], hash_lists))
+            for project_id, hash_lists in six.iteritems(hash_lists_by_project)
+        }
+
+    for job in jobs:
+        group_hashes = next(group_hashes_by_project[job["project_id"]])
+
+        # The group gets the same metadata as the event when it's flushed but
+        # additionally the `last_received` key is set.  This key is used by
+        # _save_aggregate.
+        group_metadata = dict(job["materialized_metadata"])
+        group_metadata["last_received"] = job["received_timestamp"]
+        kwargs = {
+            "platform": job["platform"],
+            "message": job["event"].search_message,
+            "culprit": job["culprit"],
+            "logger": job["logger_name"],
+            "level": LOG_LEVELS_MAP.get(job["level"]),
+            "last_seen": job["event"].datetime,
+            "first_seen": job["event"].datetime,
+            "active_at": job["event"].datetime,
+            "data": group_metadata,
+        }
+
+        if job["release"]:
+            kwargs["first_release"] = job["release"]
+
+        try:
+            job["group"], job["is_new"], job["is_regression"] = _save_aggregate(
+                event=job["event"],
+                hashes=job["data"]["hashes"],
+                release=job["release"],
+                group_hashes=group_hashes,
+                **kwargs
+            )
+        except HashDiscarded as e:
+            _handle_hash_discarded(job, projects[job["project_id"]])
+            job["hash_discarded"] = e
+            continue
+
+        job["event"].group = job["group"]
+
+        # store a reference to the group id to guarantee validation of isolation
+        # XXX(markus): No clue what this does
+        job["event"].data.bind_ref(job["event"])
+
+        saved_jobs.append(job)
+
+    return saved_jobs
+
+
+def _handle_hash_discarded(job, project):
+    project_key = None
+    if job["key_id"] is not None:
+        try:
+            project_key = ProjectKey.objects.get_from_cache(id=job["key_id"])
+        except ProjectKey.DoesNotExist:
+            pass
+
+    quotas.refund(project, key=project_key, timestamp=job["start_time"])
+
+    track_outcome(
+        org_id=project.organization_id,
+        project_id=job["project_id"],
+        key_id=job["key_id"],
+        outcome=Outcome.FILTERED,
+        reason=FilterStatKeys.DISCARDED_HASH,
+        timestamp=to_datetime(job["start_time"]),
+        event_id=job["event"].event_id,
+        category=job["category"],
+    )
+
+    metrics.incr(
+        "events.discarded",
+        skip_internal=True,
+        tags={"organization_id": project.organization_id, "platform": job["platform"]},
+    )
+
+
 @metrics.wraps("save_event.get_or_create_environment_many")
 def _get_or_create_environment_many(jobs, projects):
+    environments = {}
+
+    for job in jobs:
+        environment_key = (job["project_id"], job["environment"])
+        if environment_key not in environments:
+            environments[environment_key] = Environment.get_or_create(
+                project=projects[job["project_id"]], name=job["environment"]
+            )
+        job["environment"] = environments[environment_key]
+
+
+@metrics.wraps("save_event.get_or_create_group_environment_many")
+def _get_or_create_group_environment_many(jobs):
+    # Only the first job of a batch can create a given group environment, the
+    # remaining ones see it as already existing.
+    seen_group_environments = set()
+
     for job in jobs:
-        job["environment"] = Environment.get_or_create(
-            project=projects[job["project_id"]], name=job["environment"]
+        if not job["group"]:
+            job["is_new_group_environment"] = False
+            continue
+
+        group_environment_key = (job["group"].id, job["environment"].id)
+        if group_environment_key in seen_group_environments:
+            job["is_new_group_environment"] = False
+            continue
+
+        seen_group_environments.add(group_environment_key)
+        _, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
+            group_id=job["group"].id,
+            environment_id=job["environment"].id,
+            defaults={"first_release": job["release"] or None},
         )
 
 
@@ -852,6 +843,29 @@ def _get_or_create_release_associated_models(jobs, projects):
         )
 
 
+@metrics.wraps("save_event.get_or_create_group_release_many")
+def _get_or_create_group_release_many(jobs):
+    jobs_by_group_release = {}
+
+    for job in jobs:
+        if job["release"] and job["group"]:
+            group_release_key = (job["group"].id, job["release"].id, job["environment"].id)
+            jobs_by_group_release.setdefault(group_release_key, []).append(job)
+
+    for jobs_to_update in six.itervalues(jobs_by_group_release):
+        job = jobs_to_update[0]
+        grouprelease = GroupRelease.get_or_create(
+            group=job["group"],
+            release=job["release"],
+            environment=job["environment"],
+            datetime=min(j["event"].datetime for j in jobs_to_update),
+            last_seen=max(j["event"].datetime for j in jobs_to_update),
+        )
+
+        for job in jobs_to_update:
+            job["grouprelease"] = grouprelease
+
+
 @metrics.wraps("save_event.tsdb_record_all_metrics")
 def _tsdb_record_all_metrics(jobs):
     """
@@ -908,6 +922,48 @@ def _tsdb_record_all_metrics(jobs):
             tsdb.record_frequency_multi(frequencies, timestamp=event.datetime)
 
 
+@metrics.wraps("save_event.update_user_reports_many")
+def _update_user_reports_many(jobs):
+    event_ids_by_group_environment = {}
+
+    for job in jobs:
+        if job["group"]:
+            group_environment_key = (job["project_id"], job["group"], job["environment"])
+            event_ids_by_group_environment.setdefault(group_environment_key, []).append(
+                job["event"].event_id
+            )
+
+    for (project_id, group, environment), event_ids in six.iteritems(
+        event_ids_by_group_environment
+    ):
+        UserReport.objects.filter(project_id=project_id, event_id__in=event_ids).update(
+            group=group, environment=environment
+        )
+
+
+@metrics.wraps("save_event.get_attachments_many")
+def _get_attachments_many(jobs):
+    # Load attachments first, but persist them at the very last after
+    # posting to eventstream to make sure all counters and eventstream are
+    # incremented for sure.
+    for job in jobs:
+        attachments = []
+        cache_key = job.get("cache_key")
+        for attachment in get_attachments(cache_key, job["event"]):
+            try:
+                attachment_data = attachment.data
+            except MissingAttachmentChunks:
+                logger.exception("Missing chunks for cache_key=%s", cache_key)
+            else:
+                key = "bytes.stored.%s" % (attachment.type,)
+                job["event_metrics"][key] = (job["event_metrics"].get(key) or 0) + len(
+                    attachment_data
+                )
+                attachments.append(attachment)
+
+        job["attachments"] = attachments
+
+
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs):
     for job in jobs:
@@ -915,6 +971,49 @@ def _nodestore_save_many(jobs):
         job["event"].data.save()
 
 
+@metrics.wraps("save_event.increment_release_associated_counts_many")
+def _increment_release_associated_counts_many(jobs):
+    for job in jobs:
+        if not job["release"]:
+            continue
+
+        if job["is_new"]:
+            buffer.incr(
+                ReleaseProject,
+                {"new_groups": 1},
+                {"release_id": job["release"].id, "project_id": job["project_id"]},
+            )
+        if job["is_new_group_environment"]:
+            buffer.incr(
+                ReleaseProjectEnvironment,
+                {"new_issues_count": 1},
+                {
+                    "project_id": job["project_id"],
+                    "release_id": job["release"].id,
+                    "environment_id": job["environment"].id,
+                },
+            )
+
+
+@metrics.wraps("save_event.record_first_event_many")
+def _record_first_event_many(jobs, projects):
+    first_jobs = {}
+
+    for job in jobs:
+        if job["raw"]:
+            continue
+
+        first_job = first_jobs.get(job["project_id"])
+        if first_job is None or job["event"].datetime < first_job["event"].datetime:
+            first_jobs[job["project_id"]] = job
+
+    for project_id, job in six.iteritems(first_jobs):
+        project = projects[project_id]
+        if not project.first_event:
+            project.update(first_event=job["event"].datetime)
+            first_event_received.send_robust(project=project, event=job["event"], sender=Project)
+
+
 @metrics.wraps("save_event.eventstream_insert_many")
 def _eventstream_insert_many(jobs):
     for job in jobs:
@@ -935,6 +1034,30 @@ def _eventstream_insert_many(jobs):
         )
 
 
+@metrics.wraps("save_event.save_attachments_many")
+def _save_attachments_many(jobs):
+    for job in jobs:
+        save_attachments(job["attachments"], job["event"])
+
+
+@metrics.wraps("save_event.record_post_save_metrics_many")
+def _record_post_save_metrics_many(jobs):
+    for job in jobs:
+        metric_tags = {"from_relay": "_relay_processed" in job["data"]}
+
+        metrics.timing(
+            "events.latency",
+            job["received_timestamp"] - job["recorded_timestamp"],
+            tags=metric_tags,
+        )
+        metrics.timing("events.size.data.post_save", job["event"].size, tags=metric_tags)
+        metrics.incr(
+            "events.post_save.normalize.errors",
+            amount=len(job["data"].get("errors") or ()),
+            tags=metric_tags,
+        )
+
+
 @metrics.wraps("save_event.track_outcome_accepted_many")
 def _track_outcome_accepted_many(jobs):
     for job in jobs:
@@ -1051,11 +1174,14 @@ def get_culprit(data):
     )
 
 
-def _save_aggregate(event, hashes, release, **kwargs):
+def _save_aggregate(event, hashes, release, group_hashes=None, **kwargs):
     project = event.project
 
-    # attempt to find a matching hash
-    all_hashes = _find_hashes(project, hashes)
+    # attempt to find a matching hash, unless they have been resolved for a
+    # whole batch of events already
+    if group_hashes is None:
+        group_hashes = _find_hashes(project, hashes)
+    all_hashes = group_hashes
 
     existing_group_id = None
     for h in all_hashes:
@@ -1119,6 +1245,14 @@ def _save_aggregate(event, hashes, release, **kwargs):
             state=GroupHash.State.LOCKED_IN_MIGRATION
         ).update(group=group)
 
+        # Reflect the update on the instances which may be shared with other
+        # events of the same batch.
+        for h in new_hashes:
+            if h.state != GroupHash.State.LOCKED_IN_MIGRATION:
+                h.group_id = group.id
+
+        _cache_group_hashes(project, GroupHash.get_cache_version(project.id), new_hashes)
+
         if group_is_new and len(new_hashes) == len(all_hashes):
             is_new = True
 
@@ -1331,8 +1465,66 @@ def save_attachments(attachments, event):
 
 
 def _find_hashes(project, hash_list):
-    return map(
-        lambda hash: GroupHash.objects.get_or_create(project=project, hash=hash)[0], hash_list
+    return _find_hashes_many(project, [hash_list])[0]
+
+
+def _find_hashes_many(project, hash_lists):
+    """
+    Resolves the `GroupHash` rows for the hash lists of several events of the
+    same project.  Returns one list of `GroupHash` instances per hash list.
+
+    Hashes assigned to a group are looked up in a process-local cache first,
+    all remaining hashes are fetched with a single query and only hashes that
+    do not exist yet are created one by one.  Events sharing a hash share the
+    same instance, so that group assignments made while saving one event are
+    visible when saving the next one.
+    """
+    version = GroupHash.get_cache_version(project.id)
+
+    group_hashes = {}
+    missing_hashes = []
+    for hash_list in hash_lists:
+        for hash in hash_list:
+            if hash in group_hashes:
+                continue
+
+            cached = _group_hash_cache.get((project.id, version, hash))
+            if cached is not None:
+                group_hash_id, group_id = cached
+                group_hashes[hash] = GroupHash(
+                    id=group_hash_id, project_id=project.id, hash=hash, group_id=group_id
+                )
+            else:
+                group_hashes[hash] = None
+                missing_hashes.append(hash)
+
+    metrics.incr(
+        "event_manager.grouphash_cache.hit", amount=len(group_hashes) - len(missing_hashes)
+    )
+    metrics.incr("event_manager.grouphash_cache.miss", amount=len(missing_hashes))
+
+    if missing_hashes:
+        for group_hash in GroupHash.objects.filter(project=project, hash__in=missing_hashes):
+            group_hashes[group_hash.hash] = group_hash
+
+        for hash in missing_hashes:
+            if group_hashes[hash] is None:
+                group_hashes[hash] = GroupHash.objects.get_or_create(project=project, hash=hash)[0]
+
+        _cache_group_hashes(project, version, [group_hashes[hash] for hash in missing_hashes])
+
+    return [[group_hashes[hash] for hash in hash_list] for hash_list in hash_lists]
+
+
+def _cache_group_hashes(project, version, group_hashes):
+    # Only settled assignments are cached.  Unassigned, tombstoned and locked
+    # hashes always need to be read from the database.
+    _group_hash_cache.set_many(
+        ((project.id, version, h.hash), (h.id, h.group_id))
+        for h in group_hashes
+        if h.group_id is not None
+        and h.group_tombstone_id is None
+        and h.state != GroupHash.State.LOCKED_IN_MIGRATION
     )
 
 
@@ -1394,3 +1586,94 @@ def save_transaction_events(jobs, projects):
     _eventstream_insert_many(jobs)
     _track_outcome_accepted_many(jobs)
     return jobs
+
+
+@metrics.wraps("event_manager.save_many")
+def save_many(jobs):
+    """
+    Saves a batch of normalized error events, like `EventManager.save` does
+    for a single event.  Every job is a dictionary with ``data``,
+    ``project_id`` and ``start_time``, and optionally ``raw`` and
+    ``cache_key``.  Jobs of projects that do not exist are skipped.
+
+    Returns the list of saved jobs, see `save_error_events`.
+
+    Events read by the ingest consumer still have to go through
+    `preprocess_event` (and possibly symbolication) before they can be saved,
+    so the consumer cannot hand its batches to this function yet.
+    """
+    project_ids = set(int(job["project_id"]) for job in jobs)
+    with metrics.timer("event_manager.save_many.fetch_projects"):
+        projects = {p.id: p for p in Project.objects.get_many_from_cache(project_ids)}
+
+    existing_jobs = []
+    for job in jobs:
+        if int(job["project_id"]) in projects:
+            existing_jobs.append(job)
+        else:
+            logger.error("Project for saved event does not exist: %s", job["project_id"])
+
+    return save_error_events(existing_jobs, projects)
+
+
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs, projects):
+    """
+    Saves a batch of normalized error events.  Every job is a dictionary with
+    at least ``data``, ``project_id`` and ``start_time``, and optionally
+    ``raw`` and ``cache_key`` (used to look up attachments).  ``projects``
+    maps the project ids of all jobs to their project instances.
+
+    Jobs are grouped, associated with releases and environments, and written
+    to tsdb, nodestore and eventstream together so that lookups shared by
+    several events in the batch are only performed once.
+
+    Returns the list of saved jobs.  Jobs whose hashes were discarded are not
+    part of the returned list and carry the exception in ``hash_discarded``.
+    """
+    with metrics.timer("event_manager.save_error_events.fetch_organizations"):
+        organization_ids = set(
+            project.organization_id
+            for project in six.itervalues(projects)
+            if not hasattr(project, "_organization_cache")
+        )
+        if organization_ids:
+            organizations = {
+                o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)
+            }
+            for project in six.itervalues(projects):
+                if project.organization_id in organizations:
+                    project._organization_cache = organizations[project.organization_id]
+
+    with metrics.timer("event_manager.save_error_events.prepare_jobs"):
+        for job in jobs:
+            job.setdefault("raw", False)
+            job.setdefault("cache_key", None)
+
+    _pull_out_data(jobs, projects)
+    _get_or_create_release_many(jobs, projects)
+    _get_event_user_many(jobs, projects)
+    _normalize_stacktraces_for_grouping_many(jobs, projects)
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
+    _calculate_event_grouping_many(jobs, projects)
+    _materialize_metadata_many(jobs)
+    jobs = _save_aggregate_many(jobs, projects)
+    _get_or_create_environment_many(jobs, projects)
+    _get_or_create_group_environment_many(jobs)
+    _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_group_release_many(jobs)
+    _tsdb_record_all_metrics(jobs)
+    _update_user_reports_many(jobs)
+    _materialize_event_metrics(jobs)
+    _get_attachments_many(jobs)
+    _nodestore_save_many(jobs)
+    _increment_release_associated_counts_many(jobs)
+    _record_first_event_many(jobs, projects)
+    _eventstream_insert_many(jobs)
+    # Do this last to ensure signals get emitted even if connection to the
+    # file store breaks temporarily.
+    _save_attachments_many(jobs)
+    _record_post_save_metrics_many(jobs)
+    _track_outcome_accepted_many(jobs)
+    return jobs
@@ -29,6 +29,15 @@ class BaseEventProcessingStore(object):
         self.inner.set(key, event, self.timeout)
         return key
 
+    def store_many(self, events):
+        """
+        Stores several events at once and returns their keys in the same
+        order.
+        """
+        items = [(self._key_for_event(event), event) for event in events]
+        self.inner.set_many(items, self.timeout)
+        return [key for key, _ in items]
+
     def get(self, key):
         return self.inner.get(key)
 
@@ -3,6 +3,8 @@ from __future__ import absolute_import
 import re
 import six
 
+from django.conf import settings
+
 from sentry.grouping.strategies.configurations import CONFIGURATIONS
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.variants import (
@@ -18,10 +20,25 @@ from sentry.grouping.utils import (
     hash_from_values,
     resolve_fingerprint_values,
 )
+from sentry.utils import json, metrics
+from sentry.utils.canonical import get_canonical_name
+from sentry.utils.datastructures import LRUCache
+from sentry.utils.hashlib import md5_text
 
 
 HASH_RE = re.compile(r"^[0-9a-f]{32}$")
 
+VARIANT_CACHE_TTL = 300
+
+# Serialized grouping components of recently grouped events by the grouping
+# config and the event data the config looks at.  Many events carry identical
+# exceptions and stacktraces, so this skips walking the strategies for them.
+_variant_cache = LRUCache(5000, ttl=VARIANT_CACHE_TTL, max_size=32 * 1024 * 1024)
+
+# Parsed fingerprinting rules by their cache key so that their evaluation plan
+# is reused across events.
+_fingerprinting_rules_cache = LRUCache(1000)
+
 
 class GroupingConfigNotFound(LookupError):
     pass
@@ -116,15 +133,22 @@ def get_fingerprinting_config_for_project(project):
     from sentry.utils.hashlib import md5_text
 
     cache_key = "fingerprinting-rules:" + md5_text(rules).hexdigest()
+    rv = _fingerprinting_rules_cache.get(cache_key)
+    if rv is not None:
+        return rv
+
     rv = cache.get(cache_key)
     if rv is not None:
-        return FingerprintingRules.from_json(rv)
+        rv = FingerprintingRules.from_json(rv)
+        _fingerprinting_rules_cache.set(cache_key, rv)
+        return rv
 
     try:
         rv = FingerprintingRules.from_config_string(rules)
     except InvalidFingerprintingConfig:
         rv = FingerprintingRules([])
     cache.set(cache_key, rv.to_json())
+    _fingerprinting_rules_cache.set(cache_key, rv)
     return rv
 
 
@@ -165,6 +189,53 @@ def _get_calculated_grouping_variants_for_event(event, config):
     return rv
 
 
+def _get_variant_cache_key(event, config):
+    paths = set()
+    for strategy in config.iter_strategies():
+        paths.update(get_canonical_name(path) for path in strategy.interfaces)
+
+    relevant_data = [event.platform] + [event.data.get(path) for path in sorted(paths)]
+    return "grouping-variants:%s:%s" % (
+        config.id,
+        md5_text(config.enhancements_config or "", json.dumps(relevant_data)).hexdigest(),
+    )
+
+
+def _get_cached_grouping_variants_for_event(event, config):
+    """Returns the grouping components of an event by variant.  Components
+    are cached by a digest of everything that goes into calculating them.
+    """
+    cache_key = _get_variant_cache_key(event, config)
+    tier = "local"
+    rv = _variant_cache.get(cache_key)
+    if rv is None and settings.SENTRY_GROUPING_SHARED_VARIANT_CACHE:
+        from sentry.utils.cache import cache
+
+        tier = "shared"
+        rv = cache.get(cache_key)
+        if rv is not None:
+            _variant_cache.set(cache_key, rv)
+
+    if rv is not None:
+        metrics.incr("grouping.variant-cache.hit", tags={"tier": tier}, skip_internal=True)
+        return {
+            variant: GroupingComponent.from_dict(component)
+            for (variant, component) in six.iteritems(json.loads(rv))
+        }
+
+    metrics.incr("grouping.variant-cache.miss", skip_internal=True)
+    components = _get_calculated_grouping_variants_for_event(event, config)
+    rv = json.dumps(
+        {variant: component.as_dict() for (variant, component) in six.iteritems(components)}
+    )
+    _variant_cache.set(cache_key, rv)
+    if settings.SENTRY_GROUPING_SHARED_VARIANT_CACHE:
+        from sentry.utils.cache import cache
+
+        cache.set(cache_key, rv, VARIANT_CACHE_TTL)
+    return components
+
+
 def get_grouping_variants_for_event(event, config=None):
     """Returns a dict of all grouping variants for this event."""
     # If a checksum is set the only variant that comes back from this
@@ -201,7 +272,7 @@ def get_grouping_variants_for_event(event, config=None):
 
     # At this point we need to calculate the default event values.  If the
     # fingerprint is salted we will wrap it.
-    components = _get_calculated_grouping_variants_for_event(event, config)
+    components = _get_cached_grouping_variants_for_event(event, config)
     rv = {}
 
     # If the fingerprints are unsalted, we can return them right away.
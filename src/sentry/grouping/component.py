@@ -131,6 +131,19 @@ class GroupingComponent(object):
                 rv["values"].append(value)
         return rv
 
+    @classmethod
+    def from_dict(cls, data):
+        """Restores a component tree that was converted with `as_dict`."""
+        return cls(
+            id=data["id"],
+            hint=data["hint"],
+            contributes=data["contributes"],
+            values=[
+                cls.from_dict(value) if isinstance(value, dict) else value
+                for value in data["values"]
+            ],
+        )
+
     def __repr__(self):
         return "GroupingComponent(%r, hint=%r, contributes=%r, values=%r)" % (
             self.id,
@@ -12,12 +12,13 @@ from parsimonious.grammar import Grammar, NodeVisitor
 from parsimonious.exceptions import ParseError
 
 from sentry import projectoptions
-from sentry.stacktraces.functions import set_in_app
+from sentry.stacktraces.functions import get_function_name_for_frame, set_in_app
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.utils import get_rule_bool
 from sentry.utils.compat import implements_to_string
-from sentry.utils.glob import glob_match
+from sentry.utils.datastructures import LRUCache
+from sentry.utils.glob import cached_glob_match, get_literal_prefix
 from sentry.utils.safe import get_path
 from sentry.utils.compat import zip
 
@@ -88,11 +89,32 @@ ACTION_FLAGS = {
 }
 REVERSE_ACTION_FLAGS = dict((v, k) for k, v in six.iteritems(ACTION_FLAGS))
 
+# Matchers that are cheap to evaluate are checked first.
+MATCHER_COSTS = {"app": 0, "family": 0, "module": 1, "function": 1, "package": 2, "path": 2}
+
+# Parsed enhancement configs by their serialized form.  Configs are loaded
+# for every event that is grouped but there are only few distinct ones.
+_loads_cache = LRUCache(1000)
+
 
 class InvalidEnhancerConfig(Exception):
     pass
 
 
+def get_frame_match_values(frame_data, platform):
+    """Returns the values of a frame that matchers compare against.  These
+    only have to be computed once per frame for all rules.  `in_app` is not
+    part of this as actions change it while rules are applied.
+    """
+    return {
+        "path": frame_data.get("abs_path") or frame_data.get("filename") or "",
+        "package": frame_data.get("package") or "",
+        "function": get_function_name_for_frame(frame_data, platform) or "<unknown>",
+        "module": frame_data.get("module") or "<unknown>",
+        "family": get_behavior_family_for_platform(frame_data.get("platform") or platform),
+    }
+
+
 class Match(object):
     def __init__(self, key, pattern):
         self.key = key
@@ -105,47 +127,35 @@ class Match(object):
             self.pattern.split() != [self.pattern] and '"%s"' % self.pattern or self.pattern,
         )
 
-    def matches_frame(self, frame_data, platform):
+    def matches_frame(self, frame_data, platform, match_values=None):
+        # in-app matching is just a bool
+        if self.key == "app":
+            ref_val = get_rule_bool(self.pattern)
+            return ref_val is not None and ref_val == frame_data.get("in_app")
+
+        if match_values is None:
+            match_values = get_frame_match_values(frame_data, platform)
+
+        # families need custom handling as well
+        if self.key == "family":
+            flags = self.pattern.split(",")
+            return "all" in flags or match_values["family"] in flags
+
         # Path matches are always case insensitive
         if self.key in ("path", "package"):
-            if self.key == "package":
-                value = frame_data.get("package") or ""
-            else:
-                value = frame_data.get("abs_path") or frame_data.get("filename") or ""
-            if glob_match(
+            value = match_values[self.key]
+            if cached_glob_match(
                 value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
             ):
                 return True
-            if not value.startswith("/") and glob_match(
+            if not value.startswith("/") and cached_glob_match(
                 "/" + value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
             ):
                 return True
             return False
 
-        # families need custom handling as well
-        if self.key == "family":
-            flags = self.pattern.split(",")
-            if "all" in flags:
-                return True
-            family = get_behavior_family_for_platform(frame_data.get("platform") or platform)
-            return family in flags
-
-        # in-app matching is just a bool
-        if self.key == "app":
-            ref_val = get_rule_bool(self.pattern)
-            return ref_val is not None and ref_val == frame_data.get("in_app")
-
         # all other matches are case sensitive
-        if self.key == "function":
-            from sentry.stacktraces.functions import get_function_name_for_frame
-
-            value = get_function_name_for_frame(frame_data, platform) or "<unknown>"
-        elif self.key == "module":
-            value = frame_data.get("module") or "<unknown>"
-        else:
-            # should not happen :)
-            value = "<unknown>"
-        return glob_match(value, self.pattern)
+        return cached_glob_match(match_values.get(self.key, "<unknown>"), self.pattern)
 
     def _to_config_structure(self):
         if self.key == "family":
@@ -308,22 +318,27 @@ class Enhancements(object):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
         """
-        for rule in self.iter_rules():
+        match_values = [get_frame_match_values(frame, platform) for frame in frames]
+        for rule in self._get_candidate_rules(match_values):
             for idx, frame in enumerate(frames):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.apply_modifications_to_frame(frames, idx)
+                if rule.matches_frame(frame, match_values[idx]):
+                    for action in rule.actions:
+                        action.apply_modifications_to_frame(frames, idx)
 
     def update_frame_components_contributions(self, components, frames, platform):
         stacktrace_state = StacktraceState()
 
         # Apply direct frame actions and update the stack state alongside
-        for rule in self.iter_rules():
+        match_values = [get_frame_match_values(frame, platform) for frame in frames]
+        for compiled_rule in self._get_candidate_rules(match_values):
+            rule = compiled_rule.rule
             for idx, (component, frame) in enumerate(zip(components, frames)):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.update_frame_components_contributions(components, frames, idx, rule=rule)
-                    action.modify_stacktrace_state(stacktrace_state, rule)
+                if compiled_rule.matches_frame(frame, match_values[idx]):
+                    for action in rule.actions:
+                        action.update_frame_components_contributions(
+                            components, frames, idx, rule=rule
+                        )
+                        action.modify_stacktrace_state(stacktrace_state, rule)
 
         # Use the stack state to update frame contributions again to trim
         # down to max-frames.  min-frames is handled on the other hand for
@@ -405,6 +420,30 @@ class Enhancements(object):
         for rule in self.rules:
             yield rule
 
+    def _get_candidate_rules(self, match_values):
+        """Returns the compiled rules that can match frames with the given
+        match values, in the order they are applied.
+        """
+        # The compiled rules are created lazily and not in the constructor
+        # so that they never end up in the serialized config.
+        rules_by_family = getattr(self, "_compiled_rules_by_family", None)
+        if rules_by_family is None:
+            rules_by_family = self._compiled_rules_by_family = self._compile_rules()
+
+        families = set(values["family"] for values in match_values)
+        if len(families) == 1:
+            family = families.pop()
+            if family in rules_by_family:
+                return rules_by_family[family]
+        return rules_by_family[None]
+
+    def _compile_rules(self):
+        compiled_rules = [CompiledRule(rule) for rule in self.iter_rules() if rule.matchers]
+        rules_by_family = {None: compiled_rules}
+        for family in ("native", "javascript", "other"):
+            rules_by_family[family] = [x for x in compiled_rules if x.matches_family(family)]
+        return rules_by_family
+
     @classmethod
     def _from_config_structure(cls, data):
         version, bases, rules = data
@@ -418,6 +457,14 @@ class Enhancements(object):
     def loads(cls, data):
         if isinstance(data, six.text_type):
             data = data.encode("ascii", "ignore")
+        rv = _loads_cache.get(data)
+        if rv is None:
+            rv = cls._loads(data)
+            _loads_cache.set(data, rv)
+        return rv
+
+    @classmethod
+    def _loads(cls, data):
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
             return cls._from_config_structure(
@@ -458,11 +505,15 @@ class Rule(object):
             matchers[matcher.key] = matcher.pattern
         return {"match": matchers, "actions": [six.text_type(x) for x in self.actions]}
 
-    def get_matching_frame_actions(self, frame_data, platform):
+    def get_matching_frame_actions(self, frame_data, platform, match_values=None):
         """Given a frame returns all the matching actions based on this rule.
         If the rule does not match `None` is returned.
         """
-        if self.matchers and all(m.matches_frame(frame_data, platform) for m in self.matchers):
+        if not self.matchers:
+            return None
+        if match_values is None:
+            match_values = get_frame_match_values(frame_data, platform)
+        if all(m.matches_frame(frame_data, platform, match_values) for m in self.matchers):
             return self.actions
 
     def _to_config_structure(self):
@@ -479,6 +530,39 @@ class Rule(object):
         )
 
 
+class CompiledRule(object):
+    """A rule prepared for matching against many frames.  The matchers are
+    sorted so that cheap ones are checked first and function and module
+    patterns are prechecked against their literal prefix before globbing.
+    """
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.actions = rule.actions
+        self.matchers = []
+        for matcher in sorted(rule.matchers, key=lambda x: MATCHER_COSTS.get(x.key, 3)):
+            prefix = None
+            if matcher.key in ("function", "module"):
+                prefix = get_literal_prefix(matcher.pattern) or None
+            self.matchers.append((matcher, prefix))
+
+    def matches_family(self, family):
+        for matcher, _ in self.matchers:
+            if matcher.key == "family":
+                flags = matcher.pattern.split(",")
+                if "all" not in flags and family not in flags:
+                    return False
+        return True
+
+    def matches_frame(self, frame_data, match_values):
+        for matcher, prefix in self.matchers:
+            if prefix is not None and not match_values[matcher.key].startswith(prefix):
+                return False
+            if not matcher.matches_frame(frame_data, None, match_values):
+                return False
+        return True
+
+
 class EnhancmentsVisitor(NodeVisitor):
     visit_comment = visit_empty = lambda *a: None
 
@@ -9,11 +9,15 @@ from parsimonious.exceptions import ParseError
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.utils import get_rule_bool
 from sentry.utils.safe import get_path
-from sentry.utils.glob import glob_match
+from sentry.utils.glob import cached_glob_match, get_literal_prefix
 
 
 VERSION = 1
 
+# Matchers with a literal pattern on one of these keys only match values
+# equal to the pattern, which allows looking up rules by value.
+LITERAL_MATCH_KEYS = ("type", "function", "module")
+
 
 # Grammar is defined in EBNF syntax.
 fingerprinting_grammar = Grammar(
@@ -61,6 +65,7 @@ class EventAccess(object):
         self._exceptions = None
         self._frames = None
         self._messages = None
+        self._value_sets = {}
 
     def get_messages(self):
         if self._messages is None:
@@ -134,6 +139,15 @@ class EventAccess(object):
             return self.get_frames()
         return []
 
+    def get_value_set(self, interface, key):
+        """Returns the set of all values of a key on the given interface."""
+        rv = self._value_sets.get((interface, key))
+        if rv is None:
+            rv = self._value_sets[interface, key] = set(
+                values.get(key) for values in self.get_values(interface)
+            )
+        return rv
+
 
 class FingerprintingRules(object):
     def __init__(self, rules, changelog=None, version=None):
@@ -150,10 +164,27 @@ class FingerprintingRules(object):
         if not self.rules:
             return
         access = EventAccess(event)
-        for rule in self.iter_rules():
-            new_values = rule.get_fingerprint_values_for_event_access(access)
-            if new_values is not None:
-                return new_values
+        plan = self._get_evaluation_plan()
+
+        # Rules with a literal matcher can only match if the event has that
+        # exact value, all other rules are always candidates.
+        candidates = set()
+        for (interface, key), rules_by_value in six.iteritems(plan.rules_by_literal):
+            for value in access.get_value_set(interface, key):
+                candidates.update(rules_by_value.get(value, ()))
+
+        for idx, rule in enumerate(plan.rules):
+            if rule.literal is not None and idx not in candidates:
+                continue
+            if rule.matches_event_access(access):
+                return rule.fingerprint
+
+    def _get_evaluation_plan(self):
+        # Created lazily so that it is not part of the serialized rules.
+        plan = getattr(self, "_evaluation_plan", None)
+        if plan is None:
+            plan = self._evaluation_plan = EvaluationPlan(self.rules)
+        return plan
 
     @classmethod
     def _from_config_structure(cls, data):
@@ -194,6 +225,11 @@ class Match(object):
         self.key = key
         self.pattern = pattern
 
+    @property
+    def is_literal(self):
+        """Literal matchers only match values equal to their pattern."""
+        return self.key in LITERAL_MATCH_KEYS and get_literal_prefix(self.pattern) == self.pattern
+
     @property
     def interface(self):
         if self.key == "message":
@@ -206,11 +242,11 @@ class Match(object):
         if value is None:
             return False
         if self.key in ("path", "package"):
-            if glob_match(
+            if cached_glob_match(
                 value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
             ):
                 return True
-            if not value.startswith("/") and glob_match(
+            if not value.startswith("/") and cached_glob_match(
                 "/" + value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
             ):
                 return True
@@ -222,7 +258,7 @@ class Match(object):
             ref_val = get_rule_bool(self.pattern)
             if ref_val is not None and ref_val == value:
                 return True
-        elif glob_match(value, self.pattern, ignorecase=self.key in ("message", "value")):
+        elif cached_glob_match(value, self.pattern, ignorecase=self.key in ("message", "value")):
             return True
         return False
 
@@ -264,6 +300,55 @@ class Rule(object):
         return cls([Match._from_config_structure(x) for x in obj["matchers"]], obj["fingerprint"])
 
 
+class CompiledRule(object):
+    """A rule with its matchers grouped by interface.  Literal matchers are
+    compared directly and the first one is used to index the rule.
+    """
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.fingerprint = rule.fingerprint
+        self.literal = None
+        by_interface = {}
+        for matcher in rule.matchers:
+            if matcher.is_literal:
+                if self.literal is None:
+                    self.literal = (matcher.interface, matcher.key, matcher.pattern)
+                by_interface.setdefault(matcher.interface, []).append(
+                    (matcher.key, matcher.pattern, None)
+                )
+            else:
+                by_interface.setdefault(matcher.interface, []).append((matcher.key, None, matcher))
+        self.matchers_by_interface = sorted(six.iteritems(by_interface))
+
+    def matches_event_access(self, access):
+        for interface, matchers in self.matchers_by_interface:
+            for values in access.get_values(interface):
+                for key, literal, matcher in matchers:
+                    value = values.get(key)
+                    if matcher is None:
+                        if value != literal:
+                            break
+                    elif not matcher.matches_value(value):
+                        break
+                else:
+                    break
+            else:
+                return False
+        return True
+
+
+class EvaluationPlan(object):
+    def __init__(self, rules):
+        self.rules = [CompiledRule(rule) for rule in rules]
+        self.rules_by_literal = {}
+        for idx, rule in enumerate(self.rules):
+            if rule.literal is not None:
+                interface, key, value = rule.literal
+                rules_by_value = self.rules_by_literal.setdefault((interface, key), {})
+                rules_by_value.setdefault(value, []).append(idx)
+
+
 class FingerprintingVisitor(NodeVisitor):
     visit_comment = visit_empty = lambda *a: None
 
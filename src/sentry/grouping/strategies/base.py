@@ -177,6 +177,9 @@ class StrategyConfiguration(object):
     risk = RISK_LEVEL_LOW
 
     def __init__(self, enhancements=None, **extra):
+        # The serialized enhancements identify this configuration together
+        # with its id.
+        self.enhancements_config = enhancements
         if enhancements is None:
             enhancements = Enhancements([])
         else:
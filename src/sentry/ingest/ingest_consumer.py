@@ -5,6 +5,7 @@ import functools
 import atexit
 import logging
 import msgpack
+import six
 from six import BytesIO
 
 import multiprocessing.dummy
@@ -55,6 +56,7 @@ class IngestConsumerWorker(AbstractBatchWorker):
     def _flush_batch(self, batch):
         attachment_chunks = []
         other_messages = []
+        events = []
         transactions = []
 
         projects_to_fetch = set()
@@ -65,7 +67,7 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 projects_to_fetch.add(message["project_id"])
 
                 if message_type == "event":
-                    other_messages.append((process_event, message))
+                    events.append(message)
                 elif message_type == "transaction":
                     transactions.append(message)
                 elif message_type == "attachment_chunk":
@@ -100,6 +102,10 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 ):
                     pass
 
+        if events:
+            with metrics.timer("ingest_consumer.process_events"):
+                process_events_batch(events, projects, pool=self.pool)
+
         if transactions:
             with metrics.timer("ingest_consumer.process_transactions"):
                 process_transactions_batch(transactions, projects)
@@ -147,6 +153,119 @@ def process_transactions_batch(messages, projects):
     save_transaction_events(jobs, projects)
 
 
+@trace_func(transaction="ingest_consumer.process_events_batch")
+@metrics.wraps("ingest_consumer.process_events_batch")
+def process_events_batch(messages, projects, pool=None):
+    """
+    Processes a batch of error event messages.  This does the same as
+    `process_event` for every message, but checks and records deduplication
+    keys and writes payloads into the processing store with a single call
+    each.  ``pool`` is used to preprocess the events concurrently.
+    """
+    if options.get("store.events-batch-preprocess") is not True:
+        for message in messages:
+            _do_process_event(message, projects)
+        return
+
+    messages_by_deduplication_key = {}
+    for message in messages:
+        deduplication_key = _get_deduplication_key(message)
+        # Duplicates within the same batch are dropped right away
+        messages_by_deduplication_key.setdefault(deduplication_key, message)
+
+    with metrics.timer("ingest_consumer.process_events_batch.deduplicate"):
+        # See `_do_process_event` for caveats on deduplication.
+        duplicates = cache.get_many(list(messages_by_deduplication_key))
+
+    jobs = []
+    for deduplication_key, message in six.iteritems(messages_by_deduplication_key):
+        project_id = int(message["project_id"])
+
+        if duplicates.get(deduplication_key) is not None:
+            logger.warning(
+                "pre-process-forwarder detected a duplicated event" " with id:%s for project:%s.",
+                message["event_id"],
+                project_id,
+            )
+            continue
+
+        try:
+            project = projects[project_id]
+        except KeyError:
+            logger.error("Project for ingested event does not exist: %s", project_id)
+            continue
+
+        with metrics.timer("ingest_consumer.decode_event_json"):
+            data = json.loads(message["payload"])
+
+        jobs.append(
+            {
+                "message": message,
+                "data": data,
+                "project": project,
+                "deduplication_key": deduplication_key,
+            }
+        )
+
+    if not jobs:
+        return
+
+    # Keep events of the same project next to each other so that workers
+    # preprocessing a chunk of the batch share project state.
+    jobs.sort(key=lambda job: job["project"].id)
+
+    with metrics.timer("ingest_consumer.process_events_batch.store_many"):
+        cache_keys = event_processing_store.store_many([job["data"] for job in jobs])
+
+    for job, cache_key in zip(jobs, cache_keys):
+        job["cache_key"] = cache_key
+
+        attachments = job["message"].get("attachments") or ()
+        if attachments:
+            attachment_objects = [
+                CachedAttachment(type=attachment.pop("attachment_type"), **attachment)
+                for attachment in attachments
+            ]
+
+            attachment_cache.set(cache_key, attachments=attachment_objects, timeout=CACHE_TIMEOUT)
+
+    if pool is not None:
+        for _ in pool.imap(_preprocess_event_job, jobs, chunksize=100):
+            pass
+    else:
+        for job in jobs:
+            _preprocess_event_job(job)
+
+    # remember for an 1 hour that we saved these events (deduplication protection)
+    cache.set_many({job["deduplication_key"]: "" for job in jobs}, CACHE_TIMEOUT)
+
+    for job in jobs:
+        # emit event_accepted once everything is done
+        event_accepted.send_robust(
+            ip=job["message"].get("remote_addr"),
+            data=job["data"],
+            project=job["project"],
+            sender=process_event,
+        )
+
+
+def _preprocess_event_job(job):
+    message = job["message"]
+
+    with sentry_sdk.start_span(op="ingest_consumer.process_event.preprocess_event"):
+        preprocess_event(
+            cache_key=job["cache_key"],
+            data=job["data"],
+            start_time=float(message["start_time"]),
+            event_id=message["event_id"],
+            project=job["project"],
+        )
+
+
+def _get_deduplication_key(message):
+    return "ev:{}:{}".format(int(message["project_id"]), message["event_id"])
+
+
 @metrics.wraps("ingest_consumer.process_event")
 def _do_process_event(message, projects):
     payload = message["payload"]
@@ -170,7 +289,7 @@ def _do_process_event(message, projects):
     # This code has been ripped from the old python store endpoint. We're
     # keeping it around because it does provide some protection against
     # reprocessing good events if a single consumer is in a restart loop.
-    deduplication_key = "ev:{}:{}".format(project_id, event_id)
+    deduplication_key = _get_deduplication_key(message)
     if cache.get(deduplication_key) is not None:
         logger.warning(
             "pre-process-forwarder detected a duplicated event" " with id:%s for project:%s.",
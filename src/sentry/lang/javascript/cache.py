@@ -1,10 +1,23 @@
 from __future__ import absolute_import, print_function
 
+from hashlib import sha1
+from operator import itemgetter
+
 from six import text_type
-from symbolic import SourceView
+from symbolic import SourceMapView, SourceView
+from sentry.utils import metrics
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "get_source_view", "get_sourcemap_view"]
+
+VIEW_CACHE_MAX_SIZE = 128 * 1024 * 1024
+
+# Parsed source maps and sources by a digest of their contents, shared by all
+# events processed by this worker.  Events of the same release reference the
+# same files, so most of them can skip parsing.  The size of a view is
+# estimated by the size of the contents it was parsed from.
+_view_cache = LRUCache(1000, max_size=VIEW_CACHE_MAX_SIZE, sizeof=itemgetter(1))
 
 
 def is_utf8(codec):
@@ -12,6 +25,29 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def _get_view(kind, body, parse):
+    key = (kind, sha1(body).digest())
+    rv = _view_cache.get(key)
+    if rv is not None:
+        metrics.incr("sourcemaps.view_cache.hit", tags={"kind": kind}, skip_internal=True)
+        return rv[0]
+
+    metrics.incr("sourcemaps.view_cache.miss", tags={"kind": kind}, skip_internal=True)
+    view = parse(body)
+    _view_cache.set(key, (view, len(body)))
+    return view
+
+
+def get_source_view(body):
+    """Returns a source view of the given bytes."""
+    return _get_view("source", body, SourceView.from_bytes)
+
+
+def get_sourcemap_view(body):
+    """Returns a parsed source map of the given JSON bytes."""
+    return _get_view("sourcemap", body, SourceMapView.from_json_bytes)
+
+
 class SourceCache(object):
     def __init__(self):
         self._cache = {}
@@ -52,7 +88,7 @@ class SourceCache(object):
                     source = source.decode(encoding).encode("utf-8")
                 except UnicodeError:
                     pass
-            source = SourceView.from_bytes(source)
+            source = get_source_view(source)
         self._cache[url] = source
 
     def add_error(self, url, error):
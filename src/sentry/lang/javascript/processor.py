@@ -9,11 +9,11 @@ import base64
 import six
 import zlib
 
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from os.path import splitext
 from requests.utils import get_encoding_from_headers
 from six.moves.urllib.parse import urlsplit
-from symbolic import SourceMapView
 
 # In case SSL is unavailable (light builds) we can't import this here.
 try:
@@ -41,7 +41,7 @@ from sentry.utils import metrics
 from sentry.utils.urls import non_standard_url_join
 from sentry.stacktraces.processing import StacktraceProcessor
 
-from .cache import SourceCache, SourceMapCache
+from .cache import SourceCache, SourceMapCache, get_sourcemap_view
 
 # number of surrounding lines (on each side) to fetch
 LINES_OF_CONTEXT = 5
@@ -71,6 +71,8 @@ CACHE_CONTROL_MIN = 60
 # the maximum number of remote resources (i.e. source files) that should be
 # fetched
 MAX_RESOURCE_FETCHES = 100
+# the maximum number of release artifacts that are read at the same time
+RELEASE_FILE_READ_CONCURRENCY = 4
 
 logger = logging.getLogger(__name__)
 
@@ -206,90 +208,150 @@ def discover_sourcemap(result):
     return sourcemap
 
 
+def _get_release_file_cache_key(filename, release, dist_name):
+    return "releasefile:v1:%s:%s" % (release.id, ReleaseFile.get_ident(filename, dist_name))
+
+
+def _read_release_file(fp):
+    try:
+        with metrics.timer("sourcemaps.release_file_read"):
+            with fp:
+                return compress_file(fp)
+    except Exception:
+        logger.error("sourcemap.compress_read_failed", exc_info=sys.exc_info())
+
+
 def fetch_release_file(filename, release, dist=None):
     """
     Attempt to retrieve a release artifact from the database.
 
     Caches the result of that attempt (whether successful or not).
     """
+    return fetch_release_files([filename], release, dist)[filename]
 
-    dist_name = dist and dist.name or None
-    cache_key = "releasefile:v1:%s:%s" % (release.id, ReleaseFile.get_ident(filename, dist_name))
 
-    logger.debug("Checking cache for release artifact %r (release_id=%s)", filename, release.id)
-    result = cache.get(cache_key)
+def fetch_release_files(filenames, release, dist=None):
+    """
+    Attempt to retrieve multiple release artifacts from the database with a
+    single cache lookup and a single query.  Files that have to be read are
+    read in parallel.
 
-    # not in the cache (meaning we haven't checked the database recently), so check the database
-    if result is None:
-        filename_choices = ReleaseFile.normalize(filename)
-        filename_idents = [ReleaseFile.get_ident(f, dist_name) for f in filename_choices]
+    Returns a dictionary of filenames to their results, which are `None` for
+    artifacts that could not be found.  Caches the result of each attempt
+    (whether successful or not).
+    """
+    dist_name = dist and dist.name or None
+    cache_keys = {
+        filename: _get_release_file_cache_key(filename, release, dist_name)
+        for filename in filenames
+    }
 
-        logger.debug(
-            "Checking database for release artifact %r (release_id=%s)", filename, release.id
-        )
+    logger.debug("Checking cache for release artifacts %r (release_id=%s)", filenames, release.id)
+    cached = cache.get_many(list(cache_keys.values()))
 
-        possible_files = list(
-            ReleaseFile.objects.filter(
-                release=release, dist=dist, ident__in=filename_idents
-            ).select_related("file")
-        )
+    rv = {}
+    missing = []
+    for filename, cache_key in six.iteritems(cache_keys):
+        result = cached.get(cache_key)
 
-        if len(possible_files) == 0:
-            logger.debug(
-                "Release artifact %r not found in database (release_id=%s)", filename, release.id
-            )
-            cache.set(cache_key, -1, 60)
-            return None
+        # not in the cache (meaning we haven't checked the database recently)
+        if result is None:
+            missing.append(filename)
 
-        elif len(possible_files) == 1:
-            releasefile = possible_files[0]
+        # in the cache as an unsuccessful attempt
+        elif result == -1:
+            rv[filename] = None
 
+        # in the cache as a successful attempt, including the zipped contents of the file
         else:
-            # Pick first one that matches in priority order.
-            # This is O(N*M) but there are only ever at most 4 things here
-            # so not really worth optimizing.
-            releasefile = next(
-                (rf for ident in filename_idents for rf in possible_files if rf.ident == ident)
+            # Previous caches would be a 3-tuple instead of a 4-tuple,
+            # so this is being maintained for backwards compatibility
+            try:
+                encoding = result[3]
+            except IndexError:
+                encoding = None
+            rv[filename] = http.UrlResult(
+                filename, result[0], zlib.decompress(result[1]), result[2], encoding
             )
 
+    if not missing:
+        return rv
+
+    # check the database for all files that were not cached
+    filename_idents = {
+        filename: [ReleaseFile.get_ident(f, dist_name) for f in ReleaseFile.normalize(filename)]
+        for filename in missing
+    }
+
+    logger.debug("Checking database for release artifacts %r (release_id=%s)", missing, release.id)
+
+    possible_files = {}
+    for releasefile in ReleaseFile.objects.filter(
+        release=release,
+        dist=dist,
+        ident__in=set(ident for idents in six.itervalues(filename_idents) for ident in idents),
+    ).select_related("file"):
+        possible_files.setdefault(releasefile.ident, releasefile)
+
+    not_found = {}
+    to_read = []
+    for filename in missing:
+        # Pick first one that matches in priority order.
+        releasefile = next(
+            (possible_files[i] for i in filename_idents[filename] if i in possible_files), None
+        )
+        if releasefile is None:
+            logger.debug(
+                "Release artifact %r not found in database (release_id=%s)", filename, release.id
+            )
+            not_found[cache_keys[filename]] = -1
+            rv[filename] = None
+            continue
+
         logger.debug(
             "Found release artifact %r (id=%s, release_id=%s)", filename, releasefile.id, release.id
         )
+        # Files are opened up front as this has to query the database, only
+        # reading them happens in parallel.
         try:
-            with metrics.timer("sourcemaps.release_file_read"):
-                with ReleaseFile.cache.getfile(releasefile) as fp:
-                    z_body, body = compress_file(fp)
+            fp = ReleaseFile.cache.getfile(releasefile)
         except Exception:
             logger.error("sourcemap.compress_read_failed", exc_info=sys.exc_info())
-            result = None
+            rv[filename] = None
         else:
-            headers = {k.lower(): v for k, v in releasefile.file.headers.items()}
-            encoding = get_encoding_from_headers(headers)
-            result = http.UrlResult(filename, headers, body, 200, encoding)
-            # This will implicitly skip too large payloads. Those will be cached
-            # on the file system by `ReleaseFile.cache`, instead.
-            cache.set(cache_key, (headers, z_body, 200, encoding), 3600)
-
-    # in the cache as an unsuccessful attempt
-    elif result == -1:
-        result = None
+            to_read.append((filename, releasefile, fp))
+
+    if not_found:
+        cache.set_many(not_found, 60)
 
-    # in the cache as a successful attempt, including the zipped contents of the file
+    files = [fp for _, _, fp in to_read]
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(files), RELEASE_FILE_READ_CONCURRENCY)) as exe:
+            contents = list(exe.map(_read_release_file, files))
     else:
-        # Previous caches would be a 3-tuple instead of a 4-tuple,
-        # so this is being maintained for backwards compatibility
-        try:
-            encoding = result[3]
-        except IndexError:
-            encoding = None
-        result = http.UrlResult(
-            filename, result[0], zlib.decompress(result[1]), result[2], encoding
-        )
+        contents = [_read_release_file(fp) for fp in files]
 
-    return result
+    found = {}
+    for (filename, releasefile, _), content in zip(to_read, contents):
+        if content is None:
+            rv[filename] = None
+            continue
+
+        z_body, body = content
+        headers = {k.lower(): v for k, v in releasefile.file.headers.items()}
+        encoding = get_encoding_from_headers(headers)
+        rv[filename] = http.UrlResult(filename, headers, body, 200, encoding)
+        # This will implicitly skip too large payloads. Those will be cached
+        # on the file system by `ReleaseFile.cache`, instead.
+        found[cache_keys[filename]] = (headers, z_body, 200, encoding)
 
+    if found:
+        cache.set_many(found, 3600)
 
-def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
+    return rv
+
+
+def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True, release_files=None):
     """
     Pull down a URL, returning a UrlResult object.
 
@@ -297,6 +359,9 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
     event), then the internet. Caches the result of each of those two attempts
     separately, whether or not those attempts are successful. Used for both
     source files and source maps.
+
+    Release artifacts that were already looked up with `fetch_release_files`
+    can be passed as `release_files`.
     """
 
     # If our url has been truncated, it'd be impossible to fetch
@@ -305,7 +370,9 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
         raise http.CannotFetch({"type": EventError.JS_MISSING_SOURCE, "url": http.expose_url(url)})
 
     # if we've got a release to look on, try that first (incl associated cache)
-    if release:
+    if release and release_files is not None and url in release_files:
+        result = release_files[url]
+    elif release:
         with metrics.timer("sourcemaps.release_file"):
             result = fetch_release_file(url, release, dist)
     else:
@@ -413,7 +480,9 @@ def get_max_age(headers):
     return min(max_age, CACHE_CONTROL_MAX)
 
 
-def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=True):
+def fetch_sourcemap(
+    url, project=None, release=None, dist=None, allow_scraping=True, release_files=None
+):
     if is_data_uri(url):
         try:
             body = base64.b64decode(
@@ -424,11 +493,16 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
     else:
         # look in the database and, if not found, optionally try to scrape the web
         result = fetch_file(
-            url, project=project, release=release, dist=dist, allow_scraping=allow_scraping
+            url,
+            project=project,
+            release=release,
+            dist=dist,
+            allow_scraping=allow_scraping,
+            release_files=release_files,
         )
         body = result.body
     try:
-        return SourceMapView.from_json_bytes(body)
+        return get_sourcemap_view(body)
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(six.text_type(exc), exc_info=True)
@@ -511,6 +585,9 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         self.release = None
         self.dist = None
 
+        # release artifacts that were looked up in bulk by url
+        self.release_files = {}
+
     def get_stacktraces(self, data):
         exceptions = get_path(data, "exception", "values", filter=True, default=())
         stacktraces = [e["stacktrace"] for e in exceptions if e.get("stacktrace")]
@@ -799,6 +876,15 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         Look for and (if found) cache a source file and its associated source
         map (if any).
         """
+        sourcemap_url = self._cache_source_file(filename)
+        if sourcemap_url:
+            self._cache_sourcemap(filename, sourcemap_url)
+
+    def _cache_source_file(self, filename):
+        """
+        Look for and (if found) cache a source file.  Returns the url of its
+        source map if it has one that still needs to be fetched.
+        """
 
         sourcemaps = self.sourcemaps
         cache = self.cache
@@ -819,6 +905,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 release=self.release,
                 dist=self.dist,
                 allow_scraping=self.allow_scraping,
+                release_files=self.release_files,
             )
         except http.BadSource as exc:
             # most people don't upload release artifacts for their third-party libraries,
@@ -845,6 +932,21 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         if sourcemap_url in sourcemaps:
             return
 
+        return sourcemap_url
+
+    def _cache_sourcemap(self, filename, sourcemap_url):
+        """
+        Fetch and cache the source map of a source file, including all of its
+        inlined sources.
+        """
+
+        sourcemaps = self.sourcemaps
+        cache = self.cache
+
+        # another source file may have pulled down the same sourcemap already
+        if sourcemap_url in sourcemaps:
+            return
+
         # pull down sourcemap
         try:
             sourcemap_view = fetch_sourcemap(
@@ -853,6 +955,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 release=self.release,
                 dist=self.dist,
                 allow_scraping=self.allow_scraping,
+                release_files=self.release_files,
             )
         except http.BadSource as exc:
             # we don't perform the same check here as above, because if someone has
@@ -872,6 +975,22 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             if source_view is not None:
                 self.cache.add(non_standard_url_join(sourcemap_url, source_name), source_view)
 
+    def prefetch_release_files(self, urls):
+        """
+        Look up the release artifacts of the given urls in bulk so that
+        fetching them does not need a roundtrip per file.
+        """
+        if not self.release:
+            return
+        urls = [
+            url
+            for url in urls
+            if url not in self.release_files and url[-3:] != "..." and not is_data_uri(url)
+        ]
+        if urls:
+            with metrics.timer("sourcemaps.release_files"):
+                self.release_files.update(fetch_release_files(urls, self.release, self.dist))
+
     def populate_source_cache(self, frames):
         """
         Fetch all sources that we know are required (being referenced directly
@@ -893,8 +1012,21 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
-        for idx, filename in enumerate(pending_file_list):
-            self.cache_source(filename=filename)
+        # Only files within the fetch limit are looked up in advance.
+        pending_file_list = list(pending_file_list)
+        self.prefetch_release_files(
+            pending_file_list[: max(self.max_fetches - self.fetch_count, 0)]
+        )
+
+        pending_sourcemaps = []
+        for filename in pending_file_list:
+            sourcemap_url = self._cache_source_file(filename=filename)
+            if sourcemap_url:
+                pending_sourcemaps.append((filename, sourcemap_url))
+
+        self.prefetch_release_files(set(url for _, url in pending_sourcemaps))
+        for filename, sourcemap_url in pending_sourcemaps:
+            self._cache_sourcemap(filename, sourcemap_url)
 
     def close(self):
         StacktraceProcessor.close(self)
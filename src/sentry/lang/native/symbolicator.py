@@ -4,6 +4,7 @@ import sys
 import jsonschema
 import logging
 import six
+import threading
 import time
 
 from django.conf import settings
@@ -18,6 +19,7 @@ from sentry import features, options
 from sentry.auth.system import get_system_token
 from sentry.cache import default_cache
 from sentry.utils import json, metrics
+from sentry.utils.hashlib import md5_text
 from sentry.net.http import Session
 from sentry.tasks.store import RetrySymbolication
 from sentry.models import Organization
@@ -25,6 +27,12 @@ from sentry.models import Organization
 MAX_ATTEMPTS = 3
 REQUEST_CACHE_TIMEOUT = 3600
 
+# How long the in-flight marker and the shared result of a coalesced request
+# live in the cache. The owner of a request refreshes the marker every time it
+# polls, so this only bounds how long waiters stall if the owner goes away.
+COALESCE_TIMEOUT = 60
+COALESCE_RETRY_AFTER = 2
+
 logger = logging.getLogger(__name__)
 
 
@@ -101,6 +109,31 @@ def _task_id_cache_key_for_event(project_id, event_id):
     return u"symbolicator:{1}:{0}".format(project_id, event_id)
 
 
+def _get_coalesce_key(project_id, sources, stacktraces, modules, signal=None):
+    """
+    Returns a key identifying a symbolication request by its contents. Two
+    events with the same key produce the same symbolicator response.
+    """
+    return md5_text(json.dumps([project_id, sources, stacktraces, modules, signal])).hexdigest()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_shared_session():
+    """
+    Returns the HTTP session shared by all symbolicator requests of this
+    process, so that connections to symbolicator are pooled and reused across
+    events.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = Session()
+        return _session
+
+
 class Symbolicator(object):
     def __init__(self, project, event_id):
         symbolicator_options = options.get("symbolicator.options")
@@ -117,10 +150,42 @@ class Symbolicator(object):
 
         self.task_id_cache_key = _task_id_cache_key_for_event(project.id, event_id)
 
-    def _process(self, create_task):
+    def _get_coalesced_response(self, coalesce_key):
+        """
+        Checks whether an identical request has been sent to symbolicator by
+        another event. Returns the shared response if that request completed
+        and `None` if this event should send the request itself. While the
+        other request is still in flight, this puts the event back into the
+        sleep queue.
+        """
+        result = default_cache.get(u"symbolicator:result:%s" % coalesce_key)
+        if result is not None:
+            metrics.incr("events.symbolicator.coalesced", tags={"result": "hit"})
+            return result
+
+        inflight_key = u"symbolicator:inflight:%s" % coalesce_key
+        if default_cache.add(inflight_key, self.task_id_cache_key, COALESCE_TIMEOUT):
+            return None
+
+        owner = default_cache.get(inflight_key)
+        if owner is None or owner == self.task_id_cache_key:
+            return None
+
+        metrics.incr("events.symbolicator.coalesced", tags={"result": "wait"})
+        raise RetrySymbolication(retry_after=COALESCE_RETRY_AFTER)
+
+    def _process(self, create_task, coalesce_key=None):
         task_id = default_cache.get(self.task_id_cache_key)
         json_response = None
 
+        if not settings.SYMBOLICATOR_COALESCE_REQUESTS:
+            coalesce_key = None
+
+        if not task_id and coalesce_key is not None:
+            json_response = self._get_coalesced_response(coalesce_key)
+            if json_response is not None:
+                return json_response
+
         with self.sess:
             try:
                 if task_id:
@@ -156,11 +221,28 @@ class Symbolicator(object):
                 default_cache.set(
                     self.task_id_cache_key, json_response["request_id"], REQUEST_CACHE_TIMEOUT
                 )
+                if coalesce_key is not None:
+                    # Keep identical requests of other events waiting for us.
+                    default_cache.set(
+                        u"symbolicator:inflight:%s" % coalesce_key,
+                        self.task_id_cache_key,
+                        COALESCE_TIMEOUT,
+                    )
                 raise RetrySymbolication(retry_after=json_response["retry_after"])
             else:
                 # Once we arrive here, we are done processing. Clean up the
                 # task id from the cache.
                 default_cache.delete(self.task_id_cache_key)
+                if coalesce_key is not None:
+                    # Only successful responses are shared. After a failure,
+                    # waiting events send their own request.
+                    if json_response["status"] == "completed":
+                        default_cache.set(
+                            u"symbolicator:result:%s" % coalesce_key,
+                            json_response,
+                            COALESCE_TIMEOUT,
+                        )
+                    default_cache.delete(u"symbolicator:inflight:%s" % coalesce_key)
                 metrics.timing(
                     "events.symbolicator.response.completed.size", len(json.dumps(json_response))
                 )
@@ -173,10 +255,14 @@ class Symbolicator(object):
         return self._process(lambda: self.sess.upload_applecrashreport(report))
 
     def process_payload(self, stacktraces, modules, signal=None):
+        coalesce_key = _get_coalesce_key(
+            self.sess.project_id, self.sess.sources, stacktraces, modules, signal
+        )
         return self._process(
             lambda: self.sess.symbolicate_stacktraces(
                 stacktraces=stacktraces, modules=modules, signal=signal
-            )
+            ),
+            coalesce_key=coalesce_key,
         )
 
 
@@ -336,12 +422,12 @@ class SymbolicatorSession(object):
 
     def open(self):
         if self.session is None:
-            self.session = Session()
+            self.session = _get_shared_session()
 
     def close(self):
-        if self.session is not None:
-            self.session.close()
-            self.session = None
+        # The underlying session is shared and keeps its connections pooled
+        # for the next event, so it is only released here.
+        self.session = None
 
     def _ensure_open(self):
         if not self.session:
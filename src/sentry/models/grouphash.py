@@ -1,9 +1,12 @@
 from __future__ import absolute_import
 
+from uuid import uuid4
+
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 
 from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, Model
+from sentry.utils.cache import cache
 
 
 class GroupHash(Model):
@@ -25,3 +28,27 @@ class GroupHash(Model):
         app_label = "sentry"
         db_table = "sentry_grouphash"
         unique_together = (("project", "hash"),)
+
+    @classmethod
+    def _get_cache_version_key(cls, project_id):
+        return u"grouphash:version:{}".format(project_id)
+
+    @classmethod
+    def get_cache_version(cls, project_id):
+        """
+        Returns the version under which hash to group assignments of the
+        project may be cached.  The version changes whenever hashes of the
+        project are moved between groups, tombstoned or deleted.
+        """
+        cache_key = cls._get_cache_version_key(project_id)
+        version = cache.get(cache_key)
+        if version is None:
+            # A random version ensures that an evicted version key never
+            # revives previously cached assignments.
+            version = uuid4().hex
+            cache.set(cache_key, version, 3600)
+        return version
+
+    @classmethod
+    def invalidate_cache(cls, project_id):
+        cache.delete(cls._get_cache_version_key(project_id))
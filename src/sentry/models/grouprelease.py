@@ -33,7 +33,15 @@ class GroupRelease(Model):
         )
 
     @classmethod
-    def get_or_create(cls, group, release, environment, datetime, **kwargs):
+    def get_or_create(cls, group, release, environment, datetime, last_seen=None, **kwargs):
+        """
+        Returns the ``GroupRelease`` of the group, release and environment.
+        New instances were first seen at ``datetime``, and ``last_seen``
+        defaults to it as well.
+        """
+        if last_seen is None:
+            last_seen = datetime
+
         cache_key = cls.get_cache_key(group.id, release.id, environment.name)
 
         instance = cache.get(cache_key)
@@ -47,7 +55,7 @@ class GroupRelease(Model):
                             environment=environment.name,
                             project_id=group.project_id,
                             first_seen=datetime,
-                            last_seen=datetime,
+                            last_seen=last_seen,
                         ),
                         True,
                     )
@@ -65,10 +73,10 @@ class GroupRelease(Model):
         # TODO(dcramer): this would be good to buffer, but until then we minimize
         # updates to once a minute, and allow Postgres to optimistically skip
         # it even if we can't
-        if not created and instance.last_seen < datetime - timedelta(seconds=60):
+        if not created and instance.last_seen < last_seen - timedelta(seconds=60):
             cls.objects.filter(
-                id=instance.id, last_seen__lt=datetime - timedelta(seconds=60)
-            ).update(last_seen=datetime)
-            instance.last_seen = datetime
+                id=instance.id, last_seen__lt=last_seen - timedelta(seconds=60)
+            ).update(last_seen=last_seen)
+            instance.last_seen = last_seen
             cache.set(cache_key, instance, 3600)
         return instance
@@ -1,5 +1,7 @@
 from __future__ import absolute_import, print_function
 
+import six
+
 from django.db import models
 
 from sentry import projectoptions
@@ -54,6 +56,43 @@ class ProjectOptionManager(OptionManager):
                 self._option_cache[cache_key] = result
         return self._option_cache.get(cache_key, {})
 
+    def get_all_values_bulk(self, projects):
+        """
+        Loads the options of several projects at once, using one cache round
+        trip and one query for all projects that are not cached yet. Returns
+        a mapping of project ids to their options.
+        """
+        project_ids = set(
+            project.id if isinstance(project, models.Model) else project for project in projects
+        )
+
+        result = {}
+        missing = {}
+        for project_id in project_ids:
+            cache_key = self._make_key(project_id)
+            if cache_key in self._option_cache:
+                result[project_id] = self._option_cache[cache_key]
+            else:
+                missing[cache_key] = project_id
+
+        if missing:
+            for cache_key, values in six.iteritems(cache.get_many(list(missing))):
+                if values is not None:
+                    self._option_cache[cache_key] = result[missing.pop(cache_key)] = values
+
+        if missing:
+            loaded = dict((project_id, {}) for project_id in six.itervalues(missing))
+            for option in self.filter(project__in=list(loaded)):
+                loaded[option.project_id][option.key] = option.value
+
+            to_cache = {}
+            for project_id, values in six.iteritems(loaded):
+                cache_key = self._make_key(project_id)
+                self._option_cache[cache_key] = to_cache[cache_key] = result[project_id] = values
+            cache.set_many(to_cache)
+
+        return result
+
     def reload_cache(self, project_id, update_reason):
         if update_reason != "projectoption.get_all_values":
             schedule_update_config_cache(
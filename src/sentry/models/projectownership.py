@@ -10,12 +10,20 @@ from django.utils import timezone
 
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
-from sentry.ownership.grammar import load_schema
+from sentry.ownership.grammar import load_schema, match_rules
 from sentry.utils.cache import cache
+from sentry.utils.datastructures import LRUCache
 from functools import reduce
 
 READ_CACHE_DURATION = 3600
 
+# Loaded rules by ownership id and version.
+_rules_cache = LRUCache(1000)
+
+# Matching rules by ownership version and event, so that owners and the
+# auto-assign owner of an event are only evaluated once.
+_matching_rules_cache = LRUCache(1000, ttl=300)
+
 
 class ProjectOwnership(Model):
     __core__ = True
@@ -127,15 +135,36 @@ class ProjectOwnership(Model):
         return actors[0].resolve()
 
     @classmethod
-    def _matching_ownership_rules(cls, ownership, project_id, data):
-        rules = []
-        if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
-
+    def _get_rules(cls, ownership):
+        if ownership.schema is None:
+            return []
+        if ownership.id is None:
+            return load_schema(ownership.schema)
+
+        cache_key = (ownership.id, ownership.last_updated)
+        rules = _rules_cache.get(cache_key)
+        if rules is None:
+            rules = load_schema(ownership.schema)
+            _rules_cache.set(cache_key, rules)
         return rules
 
+    @classmethod
+    def _matching_ownership_rules(cls, ownership, project_id, data):
+        rules = cls._get_rules(ownership)
+        if not rules:
+            return []
+
+        event_id = data.get("event_id")
+        if ownership.id is None or event_id is None:
+            return match_rules(rules, data)
+
+        cache_key = (ownership.id, ownership.last_updated, event_id)
+        matching_rules = _matching_rules_cache.get(cache_key)
+        if matching_rules is None:
+            matching_rules = match_rules(rules, data)
+            _matching_rules_cache.set(cache_key, matching_rules)
+        return list(matching_rules)
+
 
 def resolve_actors(owners, project_id):
     """ Convert a list of Owner objects into a dictionary
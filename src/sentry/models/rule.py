@@ -1,5 +1,7 @@
 from __future__ import absolute_import, print_function
 
+from uuid import uuid4
+
 from django.db import models
 from django.utils import timezone
 
@@ -50,23 +52,41 @@ class Rule(Model):
 
     @classmethod
     def get_for_project(cls, project_id):
-        cache_key = u"project:{}:rules".format(project_id)
-        rules_list = cache.get(cache_key)
-        if rules_list is None:
+        return cls.get_for_project_with_version(project_id)[1]
+
+    @classmethod
+    def get_for_project_with_version(cls, project_id):
+        """
+        Returns a 2-tuple of a version and the active rules of the project.
+        The version changes whenever the rules are loaded from the database
+        again, which allows to cache data derived from them.
+        """
+        cache_key = u"project:{}:rules:v2".format(project_id)
+        result = cache.get(cache_key)
+        if result is None:
             rules_list = list(cls.objects.filter(project=project_id, status=RuleStatus.ACTIVE))
-            cache.set(cache_key, rules_list, 60)
-        return rules_list
+            result = (uuid4().hex, rules_list)
+            cache.set(cache_key, result, 60)
+        return result
+
+    def _invalidate_project_cache(self):
+        # The unversioned key only holds the list of rules and may still be
+        # read by older processes.
+        cache.delete_many(
+            [
+                u"project:{}:rules".format(self.project_id),
+                u"project:{}:rules:v2".format(self.project_id),
+            ]
+        )
 
     def delete(self, *args, **kwargs):
         rv = super(Rule, self).delete(*args, **kwargs)
-        cache_key = u"project:{}:rules".format(self.project_id)
-        cache.delete(cache_key)
+        self._invalidate_project_cache()
         return rv
 
     def save(self, *args, **kwargs):
         rv = super(Rule, self).save(*args, **kwargs)
-        cache_key = u"project:{}:rules".format(self.project_id)
-        cache.delete(cache_key)
+        self._invalidate_project_cache()
         return rv
 
     def get_audit_log_data(self):
@@ -3,14 +3,37 @@ from __future__ import absolute_import
 import six
 
 from base64 import b64encode
-from threading import local
+from threading import Event, Lock, local
 from uuid import uuid4
 
 from django.core.cache import caches, InvalidCacheBackendError
 
+from sentry.utils import json, metrics
 from sentry.utils.cache import memoize
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.services import Service
 
+# Seconds entries stay in the process local cache. Node data is hardly ever
+# rewritten, and writes within this process invalidate it immediately.
+LOCAL_CACHE_TTL = 60
+
+# Seconds ids are remembered as missing, in both cache tiers.
+MISSING_TTL = 10
+
+# Seconds to wait for another thread fetching the same nodes before fetching
+# them again.
+INFLIGHT_TIMEOUT = 10
+
+# Marks missing ids in the shared cache. Node data is always a dict.
+_MISSING = "__sentry_nodestore_missing__"
+
+# Node storages are thread locals, so the process local cache and the
+# bookkeeping of in flight fetches live at module level. The local cache holds
+# JSON encoded node data, with an empty string marking missing ids.
+_local_cache = LRUCache(max_entries=10000, ttl=LOCAL_CACHE_TTL, max_size=64 * 1024 * 1024)
+_inflight = {}
+_inflight_lock = Lock()
+
 
 class NodeStorage(local, Service):
     __all__ = (
@@ -99,31 +122,136 @@ class NodeStorage(local, Service):
         raise NotImplementedError
 
     def _get_cache_item(self, id):
-        if self.cache:
-            return self.cache.get(id)
+        return self._get_cache_items([id]).get(id)
 
     def _get_cache_items(self, id_list):
-        if self.cache:
-            return self.cache.get_many(id_list)
-        return {}
+        """
+        Returns cached node data by id, read from the process local cache
+        first and the shared cache second. Ids known to be missing map to
+        ``None``.
+        """
+        items = {}
+        for id, value in six.iteritems(_local_cache.get_many(id_list)):
+            items[id] = json.loads(value) if value else None
+        if items:
+            metrics.incr("nodestore.cache.hit", amount=len(items), tags={"tier": "local"})
+
+        uncached_ids = [id for id in id_list if id not in items]
+        if not self.cache or not uncached_ids:
+            return items
+
+        shared_items = self.cache.get_many(uncached_ids)
+        if shared_items:
+            metrics.incr("nodestore.cache.hit", amount=len(shared_items), tags={"tier": "shared"})
+
+        missing_ids = [id for id, value in six.iteritems(shared_items) if value == _MISSING]
+        _local_cache.set_many(((id, "") for id in missing_ids), ttl=MISSING_TTL)
+        _local_cache.set_many(
+            (id, json.dumps(value))
+            for id, value in six.iteritems(shared_items)
+            if value != _MISSING
+        )
+
+        for id, value in six.iteritems(shared_items):
+            items[id] = None if value == _MISSING else value
+        return items
 
     def _set_cache_item(self, id, data):
-        if self.cache and data:
-            self.cache.set(id, data)
+        self._set_cache_items({id: data})
 
     def _set_cache_items(self, items):
         cacheable_items = {k: v for k, v in six.iteritems(items) if v}
+
+        # Entries of empty nodes would otherwise be stale, they could even
+        # mark the node as missing.
+        self._delete_cache_items([k for k in items if k not in cacheable_items])
+
+        _local_cache.set_many((k, json.dumps(v)) for k, v in six.iteritems(cacheable_items))
         if self.cache:
             self.cache.set_many(cacheable_items)
 
+    def _set_missing_cache_items(self, id_list):
+        if not id_list:
+            return
+        _local_cache.set_many(((id, "") for id in id_list), ttl=MISSING_TTL)
+        if self.cache:
+            self.cache.set_many(dict.fromkeys(id_list, _MISSING), timeout=MISSING_TTL)
+
     def _delete_cache_item(self, id):
+        _local_cache.delete(id)
         if self.cache:
             self.cache.delete(id)
 
     def _delete_cache_items(self, id_list):
+        if not id_list:
+            return
+        _local_cache.delete_many(id_list)
         if self.cache:
             self.cache.delete_many(id_list)
 
+    def _clear_cache(self):
+        _local_cache.clear()
+        if self.cache:
+            self.cache.clear()
+
+    def _get_multi_cached(self, id_list, fetch):
+        """
+        Reads nodes through both cache tiers and fetches the remaining ones
+        from the backend with ``fetch``, which receives a list of ids and
+        returns a dict of the nodes that exist. Every id maps to its data or
+        ``None`` in the result, and missing ids are cached as such.
+
+        Threads of this process that request the same nodes at the same time
+        wait for the first one to fetch them instead of fetching them again.
+        """
+        id_list = list(set(id_list))
+        items = self._get_cache_items(id_list)
+        uncached_ids = [id for id in id_list if id not in items]
+        if not uncached_ids:
+            return items
+
+        fetch_ids = []
+        waiting = []
+        with _inflight_lock:
+            for id in uncached_ids:
+                if id in _inflight:
+                    waiting.append((id, _inflight[id]))
+                else:
+                    _inflight[id] = Event()
+                    fetch_ids.append(id)
+
+        if fetch_ids:
+            try:
+                items.update(self._fetch_and_cache(fetch_ids, fetch))
+            finally:
+                with _inflight_lock:
+                    for id in fetch_ids:
+                        _inflight.pop(id).set()
+
+        if waiting:
+            metrics.incr("nodestore.inflight.wait", amount=len(waiting))
+            for _, event in waiting:
+                event.wait(INFLIGHT_TIMEOUT)
+
+            waiting_ids = [id for id, _ in waiting]
+            waited_items = self._get_cache_items(waiting_ids)
+            items.update(waited_items)
+
+            # The other thread failed, or the nodes weren't cacheable.
+            refetch_ids = [id for id in waiting_ids if id not in waited_items]
+            if refetch_ids:
+                items.update(self._fetch_and_cache(refetch_ids, fetch))
+
+        return items
+
+    def _fetch_and_cache(self, id_list, fetch):
+        metrics.incr("nodestore.cache.miss", amount=len(id_list))
+        fetched = fetch(id_list)
+        items = {id: fetched.get(id) for id in id_list}
+        self._set_cache_items({id: data for id, data in six.iteritems(items) if data is not None})
+        self._set_missing_cache_items([id for id, data in six.iteritems(items) if data is None])
+        return items
+
     @memoize
     def cache(self):
         try:
@@ -10,6 +10,7 @@ from google.cloud.bigtable.row_set import RowSet
 from simplejson import JSONEncoder, _default_decoder
 from django.utils import timezone
 
+from sentry.nodestore import codecs
 from sentry.nodestore.base import NodeStorage
 
 
@@ -63,6 +64,25 @@ class BigtableNodeStorage(NodeStorage):
     ...     default_ttl=timedelta(days=30),
     ...     compression=True,
     ... )
+
+    ``codec`` selects one of the codecs in `sentry.nodestore.codecs` and takes
+    precedence over ``compression``. Rows written with another codec or with
+    plain zlib compression remain readable.
+
+    >>> BigtableNodeStorage(
+    ...     codec='zstd-dictionary',
+    ...     codec_options={'dictionaries': {'python': b'...'}},
+    ... )
+
+    Rows compressed with a zstd dictionary can only be read while the
+    dictionary is configured. ``decode_dictionaries`` keeps dictionaries that
+    are no longer used for writing, e.g. after switching to ``codec='zstd'``,
+    available for reading.
+
+    >>> BigtableNodeStorage(
+    ...     codec='zstd',
+    ...     decode_dictionaries=[b'...'],
+    ... )
     """
 
     max_size = 1024 * 1024 * 10
@@ -72,6 +92,7 @@ class BigtableNodeStorage(NodeStorage):
     data_column = b"0"
 
     _FLAG_COMPRESSED = 1 << 0
+    _FLAG_CODEC = 1 << 1
 
     def __init__(
         self,
@@ -81,6 +102,9 @@ class BigtableNodeStorage(NodeStorage):
         automatic_expiry=False,
         default_ttl=None,
         compression=False,
+        codec=None,
+        codec_options=None,
+        decode_dictionaries=None,
         thread_pool_size=5,  # TODO(mattrobenolt): Remove this
         **kwargs
     ):
@@ -91,6 +115,8 @@ class BigtableNodeStorage(NodeStorage):
         self.automatic_expiry = automatic_expiry
         self.default_ttl = default_ttl
         self.compression = compression
+        self.codec = codecs.get_codec(codec, **(codec_options or {})) if codec else None
+        self.decoders = codecs.get_decoders(self.codec, dictionaries=decode_dictionaries)
         self.skip_deletes = automatic_expiry and "_SENTRY_CLEANUP" in os.environ
 
     @property
@@ -98,37 +124,22 @@ class BigtableNodeStorage(NodeStorage):
         return get_connection(self.project, self.instance, self.table, self.options)
 
     def get(self, id):
-        item_from_cache = self._get_cache_item(id)
-        if item_from_cache:
-            return item_from_cache
-
-        data = self.decode_row(self.connection.read_row(id))
-        self._set_cache_item(id, data)
-        return data
+        return self._get_multi_cached([id], self._fetch_multi)[id]
 
     def get_multi(self, id_list):
-        id_list = list(set(id_list))
+        return self._get_multi_cached(id_list, self._fetch_multi)
 
+    def _fetch_multi(self, id_list):
         if len(id_list) == 1:
-            return {id_list[0]: self.get(id_list[0])}
+            return {id_list[0]: self.decode_row(self.connection.read_row(id_list[0]))}
 
-        cache_items = self._get_cache_items(id_list)
-
-        if len(cache_items) == len(id_list):
-            return cache_items
-
-        uncached_ids = [id for id in id_list if id not in cache_items]
-        rv = {}
         rows = RowSet()
-        for id in uncached_ids:
+        for id in id_list:
             rows.add_row_key(id)
-            rv[id] = None
 
-        for row in self.connection.read_rows(row_set=rows):
-            rv[row.row_key] = self.decode_row(row)
-        self._set_cache_items(rv)
-        rv.update(cache_items)
-        return rv
+        return {
+            row.row_key: self.decode_row(row) for row in self.connection.read_rows(row_set=rows)
+        }
 
     def decode_row(self, row):
         if row is None:
@@ -161,7 +172,9 @@ class BigtableNodeStorage(NodeStorage):
 
         # Check for a compression flag on, if so
         # decompress the data.
-        if flags & self._FLAG_COMPRESSED:
+        if flags & self._FLAG_CODEC:
+            data = codecs.decode(data, decoders=self.decoders)
+        elif flags & self._FLAG_COMPRESSED:
             data = zlib_decompress(data)
 
         return json_loads(data)
@@ -172,6 +185,7 @@ class BigtableNodeStorage(NodeStorage):
         self._set_cache_item(id, data)
 
     def encode_row(self, id, data, ttl=None):
+        platform = data.get("platform") if isinstance(data, dict) else None
         data = json_dumps(data)
 
         row = self.connection.row(id)
@@ -205,10 +219,13 @@ class BigtableNodeStorage(NodeStorage):
             )
 
         # Track flags for metadata about this row.
-        # This only flag we're tracking now is whether compression
-        # is on or not for the data column.
+        # The flags track whether and how the data column is compressed.
+        # Codec payloads carry their own header naming the codec.
         flags = 0
-        if self.compression:
+        if self.codec is not None:
+            flags |= self._FLAG_CODEC
+            data = codecs.encode(self.codec, data, platform=platform)
+        elif self.compression:
             flags |= self._FLAG_COMPRESSED
             data = zlib_compress(data)
 
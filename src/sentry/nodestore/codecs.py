@@ -0,0 +1,211 @@
+"""
+Codecs compress node data before it is handed to a storage backend.
+
+Every encoded payload starts with a two byte header, a marker followed by the
+id of the codec that produced it.  Payloads can therefore always be decoded
+with the codec they were written with, which allows to change the configured
+codec without rewriting existing data.
+"""
+
+from __future__ import absolute_import
+
+import six
+import threading
+import zlib
+import zstandard
+
+# Neither valid JSON nor a zlib header, so encoded payloads can not be
+# confused with data written before codecs were introduced.
+HEADER_MARKER = b"\xfe"
+HEADER_SIZE = 2
+
+# The default size of trained dictionaries, as recommended by zstd.
+DEFAULT_DICTIONARY_SIZE = 110 * 1024
+
+
+class Codec(object):
+    id = None
+    name = None
+
+    def encode(self, data, platform=None):
+        """
+        Compresses ``data`` (bytes).  ``platform`` is the platform of the
+        event the data belongs to, if known.
+        """
+        raise NotImplementedError
+
+    def decode(self, data):
+        raise NotImplementedError
+
+
+class ZlibCodec(Codec):
+    id = 1
+    name = "zlib"
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def encode(self, data, platform=None):
+        return zlib.compress(data, self.level)
+
+    def decode(self, data):
+        return zlib.decompress(data)
+
+
+class ZstdCodec(Codec):
+    id = 2
+    name = "zstd"
+
+    def __init__(self, level=3):
+        self.level = level
+        # zstd (de)compressors must not be used by several threads at once,
+        # so every thread creates its own and reuses it for all payloads.
+        self._local = threading.local()
+
+    def _get_compressor(self, dictionary=None):
+        compressors = self._local.__dict__.setdefault("compressors", {})
+        key = dictionary.dict_id() if dictionary is not None else None
+        try:
+            return compressors[key]
+        except KeyError:
+            compressors[key] = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+            return compressors[key]
+
+    def _get_decompressor(self, dictionary=None):
+        decompressors = self._local.__dict__.setdefault("decompressors", {})
+        key = dictionary.dict_id() if dictionary is not None else None
+        try:
+            return decompressors[key]
+        except KeyError:
+            decompressors[key] = zstandard.ZstdDecompressor(dict_data=dictionary)
+            return decompressors[key]
+
+    def encode(self, data, platform=None):
+        return self._get_compressor().compress(data)
+
+    def decode(self, data):
+        return self._get_decompressor().decompress(data)
+
+
+class ZstdDictionaryCodec(ZstdCodec):
+    """
+    Compresses data with a zstd dictionary trained for the platform of the
+    event.  Data of platforms without a dictionary is compressed without one.
+
+    The id of the dictionary is stored in the zstd frame, so dictionaries must
+    stay configured for as long as data compressed with them is retained.
+    Retired dictionaries can be passed as ``decode_dictionaries``, which are
+    only used to decode existing data.
+    """
+
+    id = 3
+    name = "zstd-dictionary"
+
+    def __init__(self, dictionaries=None, level=3, decode_dictionaries=None):
+        super(ZstdDictionaryCodec, self).__init__(level=level)
+        self.dictionaries_by_platform = {}
+        self.dictionaries_by_id = {}
+        for dictionary in decode_dictionaries or ():
+            self.add_dictionary(dictionary)
+        for platform, dictionary in six.iteritems(dictionaries or {}):
+            dictionary = self.add_dictionary(dictionary)
+            dictionary.precompute_compress(level=level)
+            self.dictionaries_by_platform[platform] = dictionary
+
+    def add_dictionary(self, dictionary):
+        """
+        Makes a raw dictionary available for decoding and returns it as a
+        ``ZstdCompressionDict``.
+        """
+        if not isinstance(dictionary, zstandard.ZstdCompressionDict):
+            dictionary = zstandard.ZstdCompressionDict(dictionary)
+        self.dictionaries_by_id[dictionary.dict_id()] = dictionary
+        return dictionary
+
+    def encode(self, data, platform=None):
+        dictionary = self.dictionaries_by_platform.get(platform)
+        return self._get_compressor(dictionary).compress(data)
+
+    def decode(self, data):
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        if not dict_id:
+            return self._get_decompressor().decompress(data)
+
+        try:
+            dictionary = self.dictionaries_by_id[dict_id]
+        except KeyError:
+            raise ValueError("Unknown zstd dictionary: %s" % dict_id)
+        return self._get_decompressor(dictionary).decompress(data)
+
+
+CODECS = {codec.name: codec for codec in (ZlibCodec, ZstdCodec, ZstdDictionaryCodec)}
+CODECS_BY_ID = {codec.id: codec for codec in six.itervalues(CODECS)}
+
+
+def get_codec(name, **options):
+    try:
+        return CODECS[name](**options)
+    except KeyError:
+        raise ValueError("Unknown nodestore codec: %s" % name)
+
+
+def get_decoders(codec=None, dictionaries=None):
+    """
+    Returns a codec for every codec id, to decode payloads regardless of the
+    codec they were written with.  ``codec`` is used for its own id and zstd
+    ``dictionaries`` stay available for decoding even if ``codec`` does not
+    use them, e.g. after switching from ``zstd-dictionary`` to ``zstd``.
+    """
+    decoders = {codec_id: cls() for codec_id, cls in six.iteritems(CODECS_BY_ID)}
+    if codec is not None:
+        decoders[codec.id] = codec
+
+    dictionary_codec = decoders[ZstdDictionaryCodec.id]
+    for dictionary in dictionaries or ():
+        dictionary_codec.add_dictionary(dictionary)
+
+    return decoders
+
+
+def encode(codec, data, platform=None):
+    """
+    Compresses ``data`` with ``codec`` and prepends the codec header.
+    """
+    return HEADER_MARKER + six.int2byte(codec.id) + codec.encode(data, platform=platform)
+
+
+def is_encoded(data):
+    return data[:1] == HEADER_MARKER and len(data) >= HEADER_SIZE
+
+
+def decode(data, codec=None, decoders=None):
+    """
+    Decompresses a payload produced by ``encode``.  ``codec`` is used if it
+    produced the payload, then the codecs by id in ``decoders`` (see
+    `get_decoders`), otherwise a codec with default options is used.
+    """
+    if not is_encoded(data):
+        raise ValueError("Data is not encoded with a nodestore codec")
+
+    codec_id = six.indexbytes(data, 1)
+    if codec is None or codec.id != codec_id:
+        codec = (decoders or {}).get(codec_id)
+    if codec is None:
+        try:
+            codec = CODECS_BY_ID[codec_id]()
+        except KeyError:
+            raise ValueError("Unknown nodestore codec id: %s" % codec_id)
+
+    return codec.decode(data[HEADER_SIZE:])
+
+
+def train_dictionaries(samples_by_platform, dict_size=DEFAULT_DICTIONARY_SIZE):
+    """
+    Trains one zstd dictionary per platform from sampled, JSON encoded node
+    data.  Returns the raw dictionaries by platform, as accepted by
+    `ZstdDictionaryCodec`.
+    """
+    return {
+        platform: zstandard.train_dictionary(dict_size, list(samples)).as_bytes()
+        for platform, samples in six.iteritems(samples_by_platform)
+    }
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import math
+import six
 
 from django.utils import timezone
 
@@ -16,26 +17,19 @@ class DjangoNodeStorage(NodeStorage):
         self._delete_cache_item(id)
 
     def get(self, id):
-        item_from_cache = self._get_cache_item(id)
-        if item_from_cache:
-            return item_from_cache
-        try:
-            data = Node.objects.get(id=id).data
-            self._set_cache_item(id, data)
-            return data
-        except Node.DoesNotExist:
-            return None
+        return self._get_multi_cached([id], self._fetch_multi)[id]
 
     def get_multi(self, id_list):
-        cache_items = self._get_cache_items(id_list)
-        if len(cache_items) == len(id_list):
-            return cache_items
+        items = self._get_multi_cached(id_list, self._fetch_multi)
+        return {id: data for id, data in six.iteritems(items) if data is not None}
 
-        uncached_ids = [id for id in id_list if id not in cache_items]
-        items = {n.id: n.data for n in Node.objects.filter(id__in=uncached_ids)}
-        self._set_cache_items(items)
-        items.update(cache_items)
-        return items
+    def _fetch_multi(self, id_list):
+        if len(id_list) == 1:
+            try:
+                return {id_list[0]: Node.objects.get(id=id_list[0]).data}
+            except Node.DoesNotExist:
+                return {}
+        return {n.id: n.data for n in Node.objects.filter(id__in=id_list)}
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
@@ -52,8 +46,7 @@ class DjangoNodeStorage(NodeStorage):
         days = math.floor(total_seconds / 86400)
 
         BulkDeleteQuery(model=Node, dtfield="timestamp", days=days).execute()
-        if self.cache:
-            self.cache.clear()
+        self._clear_cache()
 
     def bootstrap(self):
         # Nothing for Django backend to do during bootstrap
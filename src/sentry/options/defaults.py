@@ -190,6 +190,10 @@ register("store.lie-about-filter-status", default=False)
 # (``False``) and spawning a save_event task (``True``).
 register("store.transactions-celery", default=False)
 
+# Toggles between preprocessing error events in batches in the ingest consumer
+# (``True``) and handling every event message individually (``False``).
+register("store.events-batch-preprocess", default=True)
+
 # Symbolicator refactors
 # - Disabling minidump stackwalking in endpoints
 register("symbolicator.minidump-refactor-projects-opt-in", type=Sequence, default=[])  # unused
@@ -4,9 +4,9 @@ from collections import namedtuple
 from parsimonious.grammar import Grammar, NodeVisitor
 from parsimonious.exceptions import ParseError  # noqa
 from sentry.utils.safe import get_path
-from sentry.utils.glob import glob_match
+from sentry.utils.glob import cached_glob_match
 
-__all__ = ("parse_rules", "dump_schema", "load_schema")
+__all__ = ("parse_rules", "dump_schema", "load_schema", "match_rules")
 
 VERSION = 1
 
@@ -100,16 +100,14 @@ class Matcher(namedtuple("Matcher", "type pattern")):
             url = data["request"]["url"]
         except KeyError:
             return False
-        return url and glob_match(url, self.pattern, ignorecase=True)
+        return url and cached_glob_match(url, self.pattern, ignorecase=True)
 
     def test_path(self, data):
-        for frame in _iter_frames(data):
-            filename = frame.get("filename") or frame.get("abs_path")
+        return self.test_filenames(_get_frame_filenames(data))
 
-            if not filename:
-                continue
-
-            if glob_match(filename, self.pattern, ignorecase=True, path_normalize=True):
+    def test_filenames(self, filenames):
+        for filename in filenames:
+            if cached_glob_match(filename, self.pattern, ignorecase=True, path_normalize=True):
                 return True
 
         return False
@@ -117,7 +115,7 @@ class Matcher(namedtuple("Matcher", "type pattern")):
     def test_tag(self, data):
         tag = self.type[5:]
         for k, v in data.get("tags"):
-            if k == tag and glob_match(v, self.pattern):
+            if k == tag and cached_glob_match(v, self.pattern):
                 return True
         return False
 
@@ -217,6 +215,41 @@ def _iter_frames(data):
             continue
 
 
+def _get_frame_filenames(data):
+    """Returns the distinct filenames of all frames in the order they appear."""
+    rv = []
+    seen = set()
+    for frame in _iter_frames(data):
+        filename = frame.get("filename") or frame.get("abs_path")
+        if filename and filename not in seen:
+            seen.add(filename)
+            rv.append(filename)
+    return rv
+
+
+def match_rules(rules, data):
+    """Returns the rules that match the event data.  Frame filenames are
+    only collected once and every distinct matcher is only tested once.
+    """
+    filenames = None
+    results = {}
+    rv = []
+    for rule in rules:
+        matcher = rule.matcher
+        result = results.get(matcher)
+        if result is None:
+            if matcher.type == "path":
+                if filenames is None:
+                    filenames = _get_frame_filenames(data)
+                result = matcher.test_filenames(filenames)
+            else:
+                result = bool(matcher.test(data))
+            results[matcher] = result
+        if result:
+            rv.append(rule)
+    return rv
+
+
 def parse_rules(data):
     """Convert a raw text input into a Rule tree"""
     tree = ownership_grammar.parse(data)
@@ -8,6 +8,7 @@ from time import time
 from sentry import features
 from sentry.constants import DataCategory
 from sentry.quotas.base import NotRateLimited, Quota, QuotaConfig, QuotaScope, RateLimited
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.redis import (
     get_dynamic_cluster_from_options,
     validate_dynamic_cluster,
@@ -17,9 +18,21 @@ from sentry.utils.compat import map
 from sentry.utils.compat import zip
 
 is_rate_limited = load_script("quotas/is_rate_limited.lua")
+lease_quota = load_script("quotas/lease_quota.lua")
 
 
 class RedisQuota(Quota):
+    """
+    Quota backend that counts usage in Redis.
+
+    If the ``lease_size`` option is set, ``is_rate_limited`` runs in a hybrid
+    mode: every quota leases up to that many items from Redis at once and
+    accepts them locally until the lease is used up. Quotas that cannot grant
+    any more items reject locally until the end of their window. Leased but
+    unused items still count as usage, so every worker may reject up to
+    ``lease_size`` items per quota too early.
+    """
+
     #: The ``grace`` period allows accommodating for clock drift in TTL
     #: calculation since the clock on the Redis instance used to store quota
     #: metrics may not be in sync with the computer running this code.
@@ -40,6 +53,12 @@ class RedisQuota(Quota):
         super(RedisQuota, self).__init__(**options)
         self.namespace = "quota"
 
+        self.lease_size = options.get("lease_size", 0)
+        # Both local caches are keyed by the redis key of a quota, which
+        # includes its window, and expire with the window.
+        self._allowances = LRUCache(10000)
+        self._exhausted = LRUCache(10000)
+
     def validate(self):
         validate_dynamic_cluster(self.is_redis_cluster, self.cluster)
 
@@ -216,8 +235,6 @@ class RedisQuota(Quota):
         if not quotas:
             return NotRateLimited()
 
-        keys = []
-        args = []
         for quota in quotas:
             if quota.limit == 0:
                 # A zero-sized quota is the absolute worst-case. Do not call
@@ -230,6 +247,12 @@ class RedisQuota(Quota):
 
             assert quota.should_track
 
+        if self.lease_size:
+            return self.__is_rate_limited_leased(project, quotas, timestamp)
+
+        keys = []
+        args = []
+        for quota in quotas:
             shift = project.organization_id % quota.window
             key = self.__get_redis_key(quota, timestamp, shift, project.organization_id)
             return_key = self.get_refunded_quota_key(key)
@@ -260,3 +283,57 @@ class RedisQuota(Quota):
                 worst_case = (delay, quota.reason_code)
 
         return RateLimited(retry_after=worst_case[0], reason_code=worst_case[1])
+
+    def __is_rate_limited_leased(self, project, quotas, timestamp):
+        organization_id = project.organization_id
+
+        windows = []
+        for quota in quotas:
+            shift = organization_id % quota.window
+            key = self.__get_redis_key(quota, timestamp, shift, organization_id)
+            period_end = self.get_next_period_start(quota.window, shift, timestamp)
+            windows.append((quota, key, period_end))
+
+        def get_rate_limited(rejected):
+            quota, _, period_end = max(rejected, key=lambda window: window[2])
+            return RateLimited(retry_after=period_end - timestamp, reason_code=quota.reason_code)
+
+        # Quotas that are known to be exhausted reject without a round-trip.
+        rejected = [window for window in windows if self._exhausted.get(window[1])]
+        if rejected:
+            return get_rate_limited(rejected)
+
+        allowances = self._allowances.get_many([key for _, key, _ in windows])
+
+        renew = [window for window in windows if not allowances.get(window[1])]
+        if renew:
+            keys = []
+            args = []
+            for quota, key, period_end in renew:
+                keys.extend((key, self.get_refunded_quota_key(key)))
+                # limit=None is represented as limit=-1 in lua
+                lua_quota = quota.limit if quota.limit is not None else -1
+                args.extend((lua_quota, int(period_end + self.grace), self.lease_size))
+
+            client = self.__get_redis_client(six.text_type(organization_id))
+            for (quota, key, period_end), granted in zip(renew, lease_quota(client, keys, args)):
+                granted = int(granted)
+                if granted:
+                    allowances[key] = granted
+                else:
+                    self._exhausted.set(key, True, ttl=period_end - timestamp)
+                    rejected.append((quota, key, period_end))
+
+        if not rejected:
+            # Accept the item by drawing it from the allowance of every quota.
+            for quota, key, period_end in windows:
+                allowances[key] -= 1
+
+        for quota, key, period_end in windows:
+            if key in allowances:
+                self._allowances.set(key, allowances[key], ttl=period_end - timestamp)
+
+        if rejected:
+            return get_rate_limited(rejected)
+
+        return NotRateLimited()
@@ -4,9 +4,17 @@ from sentry.utils.services import Service
 
 
 class RateLimiter(Service):
-    __all__ = ("is_limited", "validate")
+    __all__ = ("is_limited", "is_limited_many", "validate")
 
     window = 60
 
     def is_limited(self, key, limit, project=None, window=None):
         return False
+
+    def is_limited_many(self, items, project=None, window=None):
+        """
+        Checks several rate limits at once. ``items`` is a sequence of
+        ``(key, limit)`` tuples, and the result is a list of booleans in the
+        same order.
+        """
+        return [self.is_limited(key, limit, project=project, window=window) for key, limit in items]
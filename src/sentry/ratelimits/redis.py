@@ -6,8 +6,11 @@ from time import time
 
 from sentry.exceptions import InvalidConfiguration
 from sentry.ratelimits.base import RateLimiter
+from sentry.utils.compat import zip
 from sentry.utils.hashlib import md5_text
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
+
+is_limited = load_script("ratelimits/is_limited.lua")
 
 
 class RedisRateLimiter(RateLimiter):
@@ -23,20 +26,37 @@ class RedisRateLimiter(RateLimiter):
         except Exception as e:
             raise InvalidConfiguration(six.text_type(e))
 
-    def is_limited(self, key, limit, project=None, window=None):
-        if window is None:
-            window = self.window
-
+    def _get_redis_key(self, key, project=None):
         key_hex = md5_text(key).hexdigest()
-        bucket = int(time() / window)
 
         if project:
-            key = "rl:%s:%s:%s" % (key_hex, project.id, bucket)
+            return "rlg:%s:%s" % (key_hex, project.id)
         else:
-            key = "rl:%s:%s" % (key_hex, bucket)
+            return "rlg:%s" % (key_hex,)
 
-        with self.cluster.map() as client:
-            result = client.incr(key)
-            client.expire(key, window)
+    def is_limited(self, key, limit, project=None, window=None):
+        return self.is_limited_many([(key, limit)], project=project, window=window)[0]
+
+    def is_limited_many(self, items, project=None, window=None):
+        if window is None:
+            window = self.window
 
-        return result.value > limit
+        # Rate limits are checked with a single script call per host, so all
+        # keys routed to the same host share one round-trip.
+        router = self.cluster.get_router()
+        hosts = {}
+        for index, (key, limit) in enumerate(items):
+            redis_key = self._get_redis_key(key, project)
+            host = hosts.setdefault(router.get_host_for_key(redis_key), ([], [], []))
+            host[0].append(index)
+            host[1].append(redis_key)
+            host[2].extend((limit, window))
+
+        now = time()
+        results = [False] * len(items)
+        for host_id, (indexes, keys, args) in six.iteritems(hosts):
+            client = self.cluster.get_local_client(host_id)
+            for index, limited in zip(indexes, is_limited(client, keys, ["%.6f" % now] + args)):
+                results[index] = bool(limited)
+
+        return results
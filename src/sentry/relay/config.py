@@ -143,6 +143,62 @@ def get_project_config(project, org_options=None, full_config=True, project_keys
     return ProjectConfig(project, **cfg)
 
 
+def get_project_configs(projects, full_config=True):
+    """
+    Constructs the ProjectConfig information for several projects at once.
+
+    Organizations, organization options, project options and project keys of
+    all projects are loaded up front with a constant number of cache lookups
+    and queries, instead of once per project.
+
+    :param projects: The projects to load configuration for.
+    :param full_config: True if the full config is required, False if only
+        the restricted (for external relays) is required.
+
+    :return: a dict of project ids to ProjectConfig objects
+    """
+    from sentry.models import Organization, ProjectKey, ProjectOption
+
+    projects = list(projects)
+    if not projects:
+        return {}
+
+    with Hub.current.start_span(op="get_project_configs.prefetch"):
+        organizations = {
+            organization.id: organization
+            for organization in Organization.objects.get_many_from_cache(
+                set(project.organization_id for project in projects)
+            )
+        }
+        org_options = {
+            organization_id: OrganizationOption.objects.get_all_values(organization_id)
+            for organization_id in organizations
+        }
+
+        ProjectOption.objects.get_all_values_bulk(projects)
+
+        project_keys = {}
+        for key in ProjectKey.objects.filter(project_id__in=[project.id for project in projects]):
+            project_keys.setdefault(key.project_id, []).append(key)
+
+    configs = {}
+    for project in projects:
+        organization = organizations.get(project.organization_id)
+        if organization is not None:
+            # Prevent the organization from being fetched again per project.
+            project.organization = organization
+            project._organization_cache = organization
+
+        configs[project.id] = get_project_config(
+            project,
+            org_options=org_options.get(project.organization_id) or {},
+            full_config=full_config,
+            project_keys=project_keys.get(project.id) or [],
+        )
+
+    return configs
+
+
 class _ConfigBase(object):
     """
     Base class for configuration objects
@@ -30,16 +30,23 @@ class RedisProjectConfigCache(ProjectConfigCache):
             return self.cluster.get_local_client_for_key(routing_key)
 
     def set_many(self, configs):
-        for project_id, config in six.iteritems(configs):
-            # XXX(markus): Figure out how to do pipelining here. We may have
-            # multiple routing keys (-> multiple clients).
-            #
-            # We cannot route by org, because Relay does not know the org when
-            # fetching.
+        values = [
+            (self.__get_redis_key(project_id), json.dumps(config))
+            for project_id, config in six.iteritems(configs)
+        ]
 
-            key = self.__get_redis_key(project_id)
-            client = self.__get_redis_client(key)
-            client.setex(key, REDIS_CACHE_TIMEOUT, json.dumps(config))
+        # We cannot route by org, because Relay does not know the org when
+        # fetching, so the keys may live on different hosts. Both cluster
+        # types can still send all writes without waiting for each of them.
+        if self.is_redis_cluster:
+            pipe = self.cluster.pipeline()
+            for key, value in values:
+                pipe.setex(key, REDIS_CACHE_TIMEOUT, value)
+            pipe.execute()
+        else:
+            with self.cluster.map() as client:
+                for key, value in values:
+                    client.setex(key, REDIS_CACHE_TIMEOUT, value)
 
     def delete_many(self, project_ids):
         for project_id in project_ids:
@@ -6,5 +6,9 @@ from sentry.rules.base import RuleBase
 class EventCondition(RuleBase):
     rule_type = "condition/event"
 
+    # Conditions that only look at the ``EventState`` are evaluated before
+    # anything else, so that rules failing them are skipped cheaply.
+    state_only = False
+
     def passes(self, event, state):
         raise NotImplementedError
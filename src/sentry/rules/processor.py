@@ -6,17 +6,44 @@ import six
 from collections import namedtuple
 from datetime import timedelta
 from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from random import randrange
 
 from sentry import analytics
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, rules
+from sentry.utils.datastructures import LRUCache
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
 RuleFuture = namedtuple("RuleFuture", ["rule", "kwargs"])
 
+# A rule prepared for evaluation. ``conditions`` is a list of
+# ``(condition_cls, data)`` pairs, where ``condition_cls`` is ``None`` for
+# unregistered conditions. The first ``num_state_conditions`` conditions only
+# depend on the ``EventState``.
+CompiledRule = namedtuple(
+    "CompiledRule", ["rule", "match", "frequency", "conditions", "num_state_conditions"]
+)
+
+# project_id -> (rules version, [CompiledRule, ...])
+_compiled_rules_cache = LRUCache(max_entries=1000)
+
+
+def evaluate_match(match, condition_results):
+    """
+    Combines an iterable of condition results according to ``match``. Returns
+    ``None`` for unsupported match types.
+    """
+    if match == "all":
+        return all(condition_results)
+    elif match == "any":
+        return any(condition_results)
+    elif match == "none":
+        return not any(condition_results)
+    return None
+
 
 class RuleProcessor(object):
     logger = logging.getLogger("sentry.rules")
@@ -33,18 +60,109 @@ class RuleProcessor(object):
 
         self.grouped_futures = {}
 
-    def get_rules(self):
-        return Rule.get_for_project(self.project.id)
+    def get_compiled_rules(self):
+        """
+        Returns the rules of the project compiled with ``compile_rule``. The
+        compiled rules are kept until the rules of the project change.
+        """
+        version, rules_list = Rule.get_for_project_with_version(self.project.id)
+        cached = _compiled_rules_cache.get(self.project.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        compiled_rules = [
+            compiled_rule
+            for compiled_rule in (self.compile_rule(rule) for rule in rules_list)
+            if compiled_rule is not None
+        ]
+        _compiled_rules_cache.set(self.project.id, (version, compiled_rules))
+        return compiled_rules
+
+    def compile_rule(self, rule):
+        # XXX(dcramer): if theres no condition should we really skip it,
+        # or should we just apply it blindly?
+        condition_list = rule.data.get("conditions", ())
+        if not condition_list:
+            return None
+
+        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
+        if match not in ("all", "any", "none"):
+            self.logger.error("Unsupported action_match %r for rule %d", match, rule.id)
+            return None
+
+        conditions = []
+        for condition in condition_list:
+            condition_cls = rules.get(condition["id"])
+            if condition_cls is None:
+                self.logger.warn("Unregistered condition %r", condition["id"])
+            conditions.append((condition_cls, condition))
+
+        # Stable sort, so the order of other conditions is preserved.
+        conditions.sort(key=lambda c: not getattr(c[0], "state_only", False))
+
+        return CompiledRule(
+            rule=rule,
+            match=match,
+            frequency=rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY,
+            conditions=conditions,
+            num_state_conditions=sum(
+                1 for condition_cls, _ in conditions if getattr(condition_cls, "state_only", False)
+            ),
+        )
+
+    def _get_rule_status_cache_key(self, rule):
+        return "grouprulestatus:1:%s" % hash_values([self.group.id, rule.id])
 
     def get_rule_status(self, rule):
-        key = "grouprulestatus:1:%s" % hash_values([self.group.id, rule.id])
-        rule_status = cache.get(key)
-        if rule_status is None:
-            rule_status, _ = GroupRuleStatus.objects.get_or_create(
-                rule=rule, group=self.group, defaults={"project": self.project}
-            )
-            cache.set(key, rule_status, 300)
-        return rule_status
+        return self.get_rule_statuses([rule])[rule.id]
+
+    def get_rule_statuses(self, rules_list):
+        """
+        Returns the ``GroupRuleStatus`` of the group for every rule by rule id,
+        reading all of them with a single cache and database query.
+        """
+        cache_keys = {rule.id: self._get_rule_status_cache_key(rule) for rule in rules_list}
+        cached = cache.get_many(list(cache_keys.values()))
+        statuses = {
+            rule_id: cached[key] for rule_id, key in six.iteritems(cache_keys) if key in cached
+        }
+
+        missing = [rule for rule in rules_list if rule.id not in statuses]
+        if not missing:
+            return statuses
+
+        fetched = {}
+        for status in GroupRuleStatus.objects.filter(
+            group=self.group, rule__in=[rule.id for rule in missing]
+        ):
+            fetched[status.rule_id] = status
+
+        to_create = [rule for rule in missing if rule.id not in fetched]
+        if to_create:
+            try:
+                with transaction.atomic():
+                    created = GroupRuleStatus.objects.bulk_create(
+                        [
+                            GroupRuleStatus(rule=rule, group=self.group, project=self.project)
+                            for rule in to_create
+                        ]
+                    )
+            except IntegrityError:
+                # Another process created some of them concurrently.
+                created = [
+                    GroupRuleStatus.objects.get_or_create(
+                        rule=rule, group=self.group, defaults={"project": self.project}
+                    )[0]
+                    for rule in to_create
+                ]
+            for status in created:
+                fetched[status.rule_id] = status
+
+        cache.set_many(
+            {cache_keys[rule_id]: status for rule_id, status in six.iteritems(fetched)}, 300
+        )
+        statuses.update(fetched)
+        return statuses
 
     def condition_matches(self, condition, state, rule):
         condition_cls = rules.get(condition["id"])
@@ -52,6 +170,12 @@ class RuleProcessor(object):
             self.logger.warn("Unregistered condition %r", condition["id"])
             return
 
+        return self._condition_matches(condition_cls, condition, state, rule)
+
+    def _condition_matches(self, condition_cls, condition, state, rule):
+        if condition_cls is None:
+            return
+
         condition_inst = condition_cls(self.project, data=condition, rule=rule)
         return safe_execute(condition_inst.passes, self.event, state, _with_transaction=False)
 
@@ -64,42 +188,60 @@ class RuleProcessor(object):
         )
 
     def apply_rule(self, rule):
-        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
-        condition_list = rule.data.get("conditions", ())
-        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
-
-        # XXX(dcramer): if theres no condition should we really skip it,
-        # or should we just apply it blindly?
-        if not condition_list:
+        compiled_rule = self.compile_rule(rule)
+        if compiled_rule is None:
             return
 
+        state = self.get_state()
+        if self.is_candidate(compiled_rule, state):
+            self.apply_compiled_rule(compiled_rule, state, self.get_rule_status(rule))
+
+    def is_candidate(self, compiled_rule, state):
+        """
+        Checks whether a rule could pass for this event, looking only at the
+        environment and at the conditions that depend on the event state.
+        """
+        rule = compiled_rule.rule
         if (
             rule.environment_id is not None
             and self.event.get_environment().id != rule.environment_id
         ):
-            return
-
-        status = self.get_rule_status(rule)
+            return False
 
+        state_results = (
+            self._condition_matches(condition_cls, condition, state, rule)
+            for condition_cls, condition in compiled_rule.conditions[
+                : compiled_rule.num_state_conditions
+            ]
+        )
+        if compiled_rule.match == "all":
+            return all(state_results)
+        elif compiled_rule.match == "none":
+            return not any(state_results)
+        # An "any" rule is only decided by its state conditions if it has
+        # no other conditions.
+        if len(compiled_rule.conditions) > compiled_rule.num_state_conditions:
+            return True
+        return any(state_results)
+
+    def apply_compiled_rule(self, compiled_rule, state, status):
+        """
+        Evaluates a rule that passed ``is_candidate`` and runs its actions.
+        """
+        rule = compiled_rule.rule
         now = timezone.now()
-        freq_offset = now - timedelta(minutes=frequency)
+        freq_offset = now - timedelta(minutes=compiled_rule.frequency)
 
         if status.last_active and status.last_active > freq_offset:
             return
 
-        state = self.get_state()
-
-        condition_iter = (self.condition_matches(c, state, rule) for c in condition_list)
-
-        if match == "all":
-            passed = all(condition_iter)
-        elif match == "any":
-            passed = any(condition_iter)
-        elif match == "none":
-            passed = not any(condition_iter)
-        else:
-            self.logger.error("Unsupported action_match %r for rule %d", match, rule.id)
-            return
+        passed = evaluate_match(
+            compiled_rule.match,
+            (
+                self._condition_matches(condition_cls, condition, state, rule)
+                for condition_cls, condition in compiled_rule.conditions
+            ),
+        )
 
         if passed:
             passed = (
@@ -149,6 +291,17 @@ class RuleProcessor(object):
             return six.itervalues({})
 
         self.grouped_futures.clear()
-        for rule in self.get_rules():
-            self.apply_rule(rule)
+        state = self.get_state()
+
+        # Rules failing on the event state alone are skipped before the rule
+        # statuses of all remaining ones are loaded at once.
+        candidates = [
+            compiled_rule
+            for compiled_rule in self.get_compiled_rules()
+            if self.is_candidate(compiled_rule, state)
+        ]
+        if candidates:
+            statuses = self.get_rule_statuses([c.rule for c in candidates])
+            for compiled_rule in candidates:
+                self.apply_compiled_rule(compiled_rule, state, statuses[compiled_rule.rule.id])
         return six.itervalues(self.grouped_futures)
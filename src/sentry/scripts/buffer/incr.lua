@@ -0,0 +1,54 @@
+-- Apply a batch of buffered increments to keys that are stored on the same
+-- Redis host. Values provided as ``KEYS`` specify, for every buffered
+-- ``(model, filters)`` pair, the key of its hash followed by the key of the
+-- pending set that tracks it.
+--
+-- ``ARGV`` starts with the expiration time (in seconds) of the hashes and the
+-- score to use for the pending sets, followed by one record per pair of keys:
+--
+--   model, filters, signal_only,
+--   number of counters, (column, amount) for every counter,
+--   number of extra values, (column, value) for every extra value
+--
+-- For example, incrementing ``times_seen`` of a group and updating its
+-- ``last_seen`` column would use the following ``KEYS`` and ``ARGV`` values:
+--
+--   KEYS = {"b:k:sentry.group:<hash>", "b:p"}
+--   ARGV = {3600, 1493791566, "sentry.models.group.Group", '{"id":["i","1"]}',
+--           "0", 1, "times_seen", 1, 1, "last_seen", '["d","1493791566.000000"]'}
+assert(#KEYS % 2 == 0, "there must be an even number of keys")
+
+local expiration = tonumber(ARGV[1])
+local score = ARGV[2]
+local cursor = 3
+
+for i = 1, #KEYS, 2 do
+    local key = KEYS[i]
+    local pending_key = KEYS[i + 1]
+
+    redis.call('HSETNX', key, 'm', ARGV[cursor])
+    redis.call('HSETNX', key, 'f', ARGV[cursor + 1])
+    if ARGV[cursor + 2] == '1' then
+        redis.call('HSET', key, 's', '1')
+    end
+    cursor = cursor + 3
+
+    local counters = tonumber(ARGV[cursor])
+    cursor = cursor + 1
+    for _ = 1, counters do
+        redis.call('HINCRBY', key, 'i+' .. ARGV[cursor], ARGV[cursor + 1])
+        cursor = cursor + 2
+    end
+
+    local extras = tonumber(ARGV[cursor])
+    cursor = cursor + 1
+    for _ = 1, extras do
+        redis.call('HSET', key, 'e+' .. ARGV[cursor], ARGV[cursor + 1])
+        cursor = cursor + 2
+    end
+
+    redis.call('EXPIRE', key, expiration)
+    redis.call('ZADD', pending_key, score, key)
+end
+
+return #KEYS / 2
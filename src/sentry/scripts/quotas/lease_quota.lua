@@ -0,0 +1,40 @@
+-- Leases a batch of items from a collection of quota counters at once, so that
+-- a caller can accept items locally without checking every single item against
+-- Redis. Values provided as ``KEYS`` specify the keys of the counters and the
+-- keys of the counters to subtract, like in ``is_rate_limited.lua``. Values
+-- provided as ``ARGV`` specify the maximum value (quota limit), the expiration
+-- time and the number of items to lease for each key.
+--
+-- For example, to lease 10 items from a quota ``foo`` with a refund counter
+-- "subtract_from_foo", a limit of 100 items that expires at the Unix timestamp
+-- ``100``, the ``KEYS`` and ``ARGV`` values would be as follows:
+--
+--   KEYS = {"foo", "subtract_from_foo"}
+--   ARGV = {100, 100, 10}
+--
+-- Every counter is incremented by the number of items that still fit into its
+-- limit, up to the requested number of items. The result is a Lua table/array
+-- (Redis multi bulk reply) that specifies the number of items granted for each
+-- quota. A quota that grants no items is exhausted.
+assert(#KEYS % 2 == 0, "there must be an even number of keys")
+assert(#ARGV == #KEYS / 2 * 3, "incorrect number of keys and arguments provided")
+
+local results = {}
+for i=1, #KEYS, 2 do
+    local j = (i - 1) / 2 * 3 + 1
+    local limit = tonumber(ARGV[j])
+    local granted = tonumber(ARGV[j + 2])
+    -- limit=-1 means "no limit"
+    if limit >= 0 then
+        local used = (redis.call('GET', KEYS[i]) or 0) - (redis.call('GET', KEYS[i + 1]) or 0)
+        granted = math.max(math.min(granted, limit - used), 0)
+    end
+
+    if granted > 0 then
+        redis.call('INCRBY', KEYS[i], granted)
+        redis.call('EXPIREAT', KEYS[i], ARGV[j + 1])
+    end
+    results[(i + 1) / 2] = granted
+end
+
+return results
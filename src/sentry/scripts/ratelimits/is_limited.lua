@@ -0,0 +1,44 @@
+-- Checks a collection of rate limits using the generic cell rate algorithm
+-- (GCRA). Every key stores the theoretical arrival time of the next request,
+-- which moves ahead by ``window / limit`` seconds for every accepted request.
+-- A request is limited if that would move it more than ``window`` seconds
+-- ahead of the current time. This behaves like a sliding window: ``limit``
+-- requests are allowed at once, after which requests are accepted at a steady
+-- rate, without the bursts at the edges of fixed windows.
+--
+-- Values provided as ``KEYS`` specify the keys of the rate limits to check.
+-- ``ARGV`` starts with the current timestamp (in seconds), followed by the
+-- limit and the window (in seconds) for each key. For example, to check the
+-- rate limits ``foo`` with 10 requests per minute and ``bar`` with 100
+-- requests per hour, the ``KEYS`` and ``ARGV`` values would be as follows:
+--
+--   KEYS = {"foo", "bar"}
+--   ARGV = {1500000000.5, 10, 60, 100, 3600}
+--
+-- Arrival times are stored as whole microseconds, as Lua numbers are
+-- formatted with limited precision and rounding them up could reject the last
+-- request of a burst. Only keys of accepted requests are updated. The result
+-- is a Lua table/array (Redis multi bulk reply) that specifies whether or not
+-- each request was *limited*.
+assert(#ARGV == #KEYS * 2 + 1, "incorrect number of keys and arguments provided")
+
+local now = math.floor(tonumber(ARGV[1]) * 1000000)
+
+local results = {}
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2])
+    local window = tonumber(ARGV[i * 2 + 1])
+
+    local limited = limit <= 0
+    if not limited then
+        local interval = math.floor(window * 1000000 / limit)
+        local tat = math.max(tonumber(redis.call('GET', key) or now), now)
+        limited = tat + interval - now > window * 1000000
+        if not limited then
+            redis.call('SET', key, string.format('%.0f', tat + interval), 'EX', math.ceil(window))
+        end
+    end
+    results[i] = limited
+end
+
+return results
@@ -19,6 +19,17 @@ class AbstractIndexBackend(object):
     def record(self, scope, key, items, timestamp=None):
         pass
 
+    def record_many(self, requests):
+        """
+        Records several items at once. Each request is a ``(scope, key,
+        items, timestamp)`` tuple, and the results are returned in the same
+        order as the requests.
+        """
+        return [
+            self.record(scope, key, items, timestamp=timestamp)
+            for scope, key, items, timestamp in requests
+        ]
+
     @abstractmethod
     def merge(self, scope, destination, items, timestamp=None):
         pass
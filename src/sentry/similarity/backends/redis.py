@@ -34,14 +34,24 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         self.retention = retention
         self.candidate_set_limit = candidate_set_limit
 
-    def _build_signature_arguments(self, features):
-        if not features:
-            return [0] * self.bands
-
-        arguments = []
-        for bucket in band(self.bands, self.signature_builder(features)):
-            arguments.extend([1, ",".join(map("{}".format, bucket)), 1])
-        return arguments
+    def _build_many_signature_arguments(self, feature_sets):
+        # Signatures of all non-empty feature sets are built in one pass so
+        # that features shared between them are only hashed once.
+        signatures = iter(
+            self.signature_builder.build_many([features for features in feature_sets if features])
+        )
+
+        results = []
+        for features in feature_sets:
+            if not features:
+                results.append([0] * self.bands)
+                continue
+
+            arguments = []
+            for bucket in band(self.bands, next(signatures)):
+                arguments.extend([1, ",".join(map("{}".format, bucket)), 1])
+            results.append(arguments)
+        return results
 
     def __index(self, scope, args):
         # scope must be passed into the script call as a key to allow the
@@ -92,9 +102,10 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
             limit if limit is not None else -1,
         ]
 
-        for idx, threshold, features in items:
+        signatures = self._build_many_signature_arguments([features for _, _, features in items])
+        for (idx, threshold, _), signature in zip(items, signatures):
             arguments.extend([idx, threshold])
-            arguments.extend(self._build_signature_arguments(features))
+            arguments.extend(signature)
 
         return self._as_search_result(self.__index(scope, arguments))
 
@@ -121,29 +132,42 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         return self._as_search_result(self.__index(scope, arguments))
 
     def record(self, scope, key, items, timestamp=None):
-        if not items:
-            return  # nothing to do
+        return self.record_many([(scope, key, items, timestamp)])[0]
 
-        if timestamp is None:
-            timestamp = int(time.time())
-
-        arguments = [
-            "RECORD",
-            timestamp,
-            self.namespace,
-            self.bands,
-            self.interval,
-            self.retention,
-            self.candidate_set_limit,
-            scope,
-            key,
-        ]
+    def record_many(self, requests):
+        signatures = iter(
+            self._build_many_signature_arguments(
+                [features for _, _, items, _ in requests for _, features in items]
+            )
+        )
+
+        results = []
+        for scope, key, items, timestamp in requests:
+            if not items:
+                results.append(None)  # nothing to do
+                continue
+
+            if timestamp is None:
+                timestamp = int(time.time())
+
+            arguments = [
+                "RECORD",
+                timestamp,
+                self.namespace,
+                self.bands,
+                self.interval,
+                self.retention,
+                self.candidate_set_limit,
+                scope,
+                key,
+            ]
 
-        for idx, features in items:
-            arguments.append(idx)
-            arguments.extend(self._build_signature_arguments(features))
+            for idx, _ in items:
+                arguments.append(idx)
+                arguments.extend(next(signatures))
 
-        return self.__index(scope, arguments)
+            results.append(self.__index(scope, arguments))
+        return results
 
     def merge(self, scope, destination, items, timestamp=None):
         if timestamp is None:
@@ -3,6 +3,7 @@ from __future__ import absolute_import
 import functools
 import itertools
 import logging
+from collections import OrderedDict
 
 from sentry.utils.dates import to_timestamp
 from sentry.utils.compat import map
@@ -102,28 +103,23 @@ class FeatureSet(object):
         if not events:
             return []
 
-        scope = None
-        key = None
-
-        items = []
+        # Items are recorded with one request per group, which allows
+        # recording events of several groups and projects in one call. The
+        # features of all events of a group are added up, and the group is
+        # recorded at the time of its latest event, which determines when the
+        # recorded features expire.
+        requests = OrderedDict()
         for event in events:
             if not event.group_id:
                 continue
-            for label, features in self.extract(event).items():
-                if scope is None:
-                    scope = self.__get_scope(event.project)
-                else:
-                    assert (
-                        self.__get_scope(event.project) == scope
-                    ), "all events must be associated with the same project"
-
-                if key is None:
-                    key = self.__get_key(event.group)
-                else:
-                    assert (
-                        self.__get_key(event.group) == key
-                    ), "all events must be associated with the same group"
 
+            timestamp = int(to_timestamp(event.datetime))
+            request = requests.setdefault(
+                (self.__get_scope(event.project), self.__get_key(event.group)), [timestamp, []]
+            )
+            request[0] = max(request[0], timestamp)
+            items = request[1]
+            for label, features in self.extract(event).items():
                 try:
                     features = map(self.encoder.dumps, features)
                 except Exception as error:
@@ -142,7 +138,12 @@ class FeatureSet(object):
                     if features:
                         items.append((self.aliases[label], features))
 
-        return self.index.record(scope, key, items, timestamp=int(to_timestamp(event.datetime)))
+        return self.index.record_many(
+            [
+                (scope, key, items, timestamp)
+                for (scope, key), (timestamp, items) in requests.items()
+            ]
+        )
 
     def classify(self, events, limit=None, thresholds=None):
         if not events:
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 import mmh3
 from sentry.utils.compat import map
+from sentry.utils.compat import zip
 
 
 class MinHashSignatureBuilder(object):
@@ -10,9 +11,26 @@ class MinHashSignatureBuilder(object):
         self.rows = rows
 
     def __call__(self, features):
-        return map(
-            lambda column: min(
-                map(lambda feature: mmh3.hash(feature, column) % self.rows, features)
-            ),
-            range(self.columns),
-        )
+        return self.build_many([features])[0]
+
+    def build_many(self, feature_sets):
+        """
+        Builds the signatures of several feature sets at once. Every distinct
+        feature is hashed only once for all columns, no matter how many of the
+        sets contain it, and each signature is the column-wise minimum of the
+        hashes of its features.
+        """
+        hashes = {}
+
+        def get_hashes(feature):
+            value = hashes.get(feature)
+            if value is None:
+                value = hashes[feature] = [
+                    mmh3.hash(feature, column) % self.rows for column in range(self.columns)
+                ]
+            return value
+
+        return [
+            map(min, zip(*[get_hashes(feature) for feature in set(features)]))
+            for features in feature_sets
+        ]
@@ -707,7 +707,9 @@ def key_transaction_timeseries_query(selected_columns, query, params, rollup, re
         return SnubaTSResult({"data": result}, snuba_filter.start, snuba_filter.end, rollup)
 
 
-def timeseries_query(selected_columns, query, params, rollup, reference_event=None, referrer=None):
+def timeseries_query(
+    selected_columns, query, params, rollup, reference_event=None, referrer=None, use_cache=False
+):
     """
     High-level API for doing arbitrary user timeseries queries against events.
 
@@ -728,6 +730,7 @@ def timeseries_query(selected_columns, query, params, rollup, reference_event=No
     reference_event (ReferenceEvent) A reference event object. Used to generate additional
                     conditions based on the provided reference.
     referrer (str|None) A referrer string to help locate the origin of this query.
+    use_cache (bool) Whether to use the Snuba response cache, see `bulk_raw_query`.
     """
     with sentry_sdk.start_span(
         op="discover.discover", description="timeseries.filter_transform"
@@ -750,6 +753,7 @@ def timeseries_query(selected_columns, query, params, rollup, reference_event=No
             dataset=Dataset.Discover,
             limit=10000,
             referrer=referrer,
+            use_cache=use_cache,
         )
 
     with sentry_sdk.start_span(
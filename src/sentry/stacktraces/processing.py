@@ -10,6 +10,7 @@ from collections import namedtuple, OrderedDict
 import sentry_sdk
 
 from sentry.models import Project, Release
+from sentry.utils import metrics
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import get_path, safe_execute
@@ -35,6 +36,7 @@ class ProcessableFrame(object):
         self.data = None
         self.cache_key = None
         self.cache_value = None
+        self.pending_cache_value = None
         self.processable_frames = processable_frames
 
     def __repr__(self):
@@ -68,8 +70,11 @@ class ProcessableFrame(object):
         return self.processable_frames[last_idx]
 
     def set_cache_value(self, value):
+        """Remembers a value for the cache key of this frame.  All values are
+        written in one batch once the stacktraces are processed.
+        """
         if self.cache_key is not None:
-            cache.set(self.cache_key, value, 3600)
+            self.pending_cache_value = value
             return True
         return False
 
@@ -104,6 +109,16 @@ class StacktraceProcessingTask(object):
                 if processor is None or frame.processor == processor:
                     yield frame
 
+    def write_cache_values(self):
+        """Writes the cache values set on all frames in one batch."""
+        values = {}
+        for frame in self.iter_processable_frames():
+            if frame.cache_key is not None and frame.pending_cache_value is not None:
+                values[frame.cache_key] = frame.pending_cache_value
+                frame.pending_cache_value = None
+        if values:
+            cache.set_many(values, 3600)
+
 
 class StacktraceProcessor(object):
     def __init__(self, data, stacktrace_infos, project=None):
@@ -446,9 +461,12 @@ def get_crash_frame_from_event_data(data, frame_filter=None):
 
 
 def lookup_frame_cache(keys):
-    rv = {}
+    keys = list(keys)
+    if not keys:
+        return {}
+    rv = cache.get_many(keys)
     for key in keys:
-        rv[key] = cache.get(key)
+        rv.setdefault(key, None)
     return rv
 
 
@@ -473,11 +491,27 @@ def get_stacktrace_processing_task(infos, processors):
                 processable_frame
             )
             if processable_frame.cache_key is not None:
-                to_lookup[processable_frame.cache_key] = processable_frame
+                to_lookup.setdefault(processable_frame.cache_key, []).append(processable_frame)
 
     frame_cache = lookup_frame_cache(to_lookup)
-    for cache_key, processable_frame in six.iteritems(to_lookup):
-        processable_frame.cache_value = frame_cache.get(cache_key)
+    hits = {}
+    misses = {}
+    for cache_key, processable_frames in six.iteritems(to_lookup):
+        cache_value = frame_cache.get(cache_key)
+        for processable_frame in processable_frames:
+            processable_frame.cache_value = cache_value
+            counts = hits if cache_value is not None else misses
+            processor_name = processable_frame.processor.__class__.__name__
+            counts[processor_name] = counts.get(processor_name, 0) + 1
+
+    for name, counts in (("hit", hits), ("miss", misses)):
+        for processor_name, count in six.iteritems(counts):
+            metrics.incr(
+                "stacktraces.frame_cache.%s" % name,
+                amount=count,
+                tags={"processor": processor_name},
+                skip_internal=True,
+            )
 
     return StacktraceProcessingTask(
         processable_stacktraces=by_stacktrace_info, processors=by_processor
@@ -568,6 +602,10 @@ def process_stacktraces(data, make_processors=None, set_raw_stacktrace=True):
         data.setdefault("_metrics", {})["flag.processing.error"] = True
         changed = True
     finally:
+        try:
+            processing_task.write_cache_values()
+        except Exception:
+            logger.exception("stacktraces.processing.cache_write_failed")
         for processor in processors:
             processor.close()
         processing_task.close()
@@ -107,6 +107,7 @@ def merge_groups(
         has_more = merge_objects(
             model_list, group, new_group, logger=logger, transaction_id=transaction_id
         )
+        GroupHash.invalidate_cache(group.project_id)
 
         if not has_more:
             # There are no more objects to merge for *this* "from" group, remove it
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import logging
+import six
 
 from django.conf import settings
 
@@ -27,9 +28,9 @@ def update_config_cache(generate, organization_id=None, project_id=None, update_
         invalidated.
     """
 
-    from sentry.models import Project, ProjectKey
+    from sentry.models import Project
     from sentry.relay import projectconfig_cache
-    from sentry.relay.config import get_project_config
+    from sentry.relay.config import get_project_configs
 
     # Delete key before generating configs such that we never have an outdated
     # but valid cache.
@@ -47,16 +48,14 @@ def update_config_cache(generate, organization_id=None, project_id=None, update_
         projects = Project.objects.filter(organization_id=organization_id)
 
     if generate:
-        project_keys = {}
-        for key in ProjectKey.objects.filter(project_id__in=[project.id for project in projects]):
-            project_keys.setdefault(key.project_id, []).append(key)
-
-        project_configs = {}
-        for project in projects:
-            project_config = get_project_config(
-                project, project_keys=project_keys.get(project.id, []), full_config=True
+        # Configs of all projects of an organization are built and written in
+        # one pass when an organization option changes.
+        project_configs = {
+            project_id: project_config.to_dict()
+            for project_id, project_config in six.iteritems(
+                get_project_configs(projects, full_config=True)
             )
-            project_configs[project.id] = project_config.to_dict()
+        }
 
         projectconfig_cache.set_many(project_configs)
     else:
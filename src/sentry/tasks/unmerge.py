@@ -192,6 +192,7 @@ def migrate_events(
         GroupHash.objects.filter(project_id=project.id, hash__in=fingerprints).update(
             group=destination_id
         )
+        GroupHash.invalidate_cache(project.id)
 
         # Create activity records for the source and destination group.
         Activity.objects.create(
@@ -417,8 +418,7 @@ def repair_denormalizations(caches, project, events):
     repair_group_release_data(caches, project, events)
     repair_tsdb_data(caches, project, events)
 
-    for event in events:
-        features.record([event])
+    features.record(events)
 
 
 def lock_hashes(project_id, source_id, fingerprints):
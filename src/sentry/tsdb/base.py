@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 
 import collections
+import operator
 import six
 
+from array import array
 from collections import OrderedDict
 from datetime import timedelta
 from django.conf import settings
@@ -99,10 +101,113 @@ class TSDBModel(Enum):
     sentry_app_component_interacted = 801
 
 
+class TimeSeries(object):
+    """
+    Counts of a contiguous range of rollup intervals, stored in an array.
+
+    ``start`` is the timestamp of the first interval and ``rollup`` the length
+    of every interval in seconds. Use ``to_points`` for the list of
+    ``(timestamp, count)`` pairs returned by ``get_range``.
+    """
+
+    __slots__ = ("start", "rollup", "values")
+
+    typecode = "l"
+
+    def __init__(self, start, rollup, values):
+        self.start = start
+        self.rollup = rollup
+        if not isinstance(values, array):
+            values = array(self.typecode, values)
+        self.values = values
+
+    @classmethod
+    def zeros(cls, start, rollup, length):
+        return cls(start, rollup, array(cls.typecode, [0]) * length)
+
+    @classmethod
+    def from_points(cls, points, start, rollup, length):
+        """
+        Builds a series from ``(timestamp, count)`` pairs. Intervals without a
+        pair are zero, pairs outside of the series are ignored.
+        """
+        series = cls.zeros(start, rollup, length)
+        for timestamp, count in points:
+            index, offset = divmod(timestamp - start, rollup)
+            if not offset and 0 <= index < length:
+                series.values[index] = int(count)
+        return series
+
+    def __len__(self):
+        return len(self.values)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, TimeSeries)
+            and self.start == other.start
+            and self.rollup == other.rollup
+            and self.values == other.values
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "<TimeSeries start=%r rollup=%r values=%r>" % (
+            self.start,
+            self.rollup,
+            list(self.values),
+        )
+
+    def __add__(self, other):
+        """
+        Adds the counts of two series covering the same intervals.
+        """
+        if (self.start, self.rollup, len(self)) != (other.start, other.rollup, len(other)):
+            raise ValueError("Can only add series covering the same intervals")
+        return TimeSeries(
+            self.start,
+            self.rollup,
+            array(self.typecode, map(operator.add, self.values, other.values)),
+        )
+
+    def timestamps(self):
+        return range(self.start, self.start + self.rollup * len(self), self.rollup)
+
+    def to_points(self):
+        return list(zip(self.timestamps(), self.values))
+
+    def sum(self):
+        return sum(self.values)
+
+    def rollup_to(self, rollup):
+        """
+        Sums the counts into intervals of ``rollup`` seconds, aligned to the
+        epoch like the intervals returned by ``BaseTSDB.rollup``. ``rollup``
+        must be a multiple of the rollup of this series.
+        """
+        if not self.values:
+            return TimeSeries(self.start, rollup, [])
+
+        start = self.start - self.start % rollup
+        end = self.start + self.rollup * (len(self) - 1)
+        length = (end - start) // rollup + 1
+
+        # Sum the slice of counts falling into each new interval, rather than
+        # looking at every single count.
+        values = array(self.typecode, [0]) * length
+        for index in range(length):
+            lower = -(-(start + index * rollup - self.start) // self.rollup)
+            upper = -(-(start + (index + 1) * rollup - self.start) // self.rollup)
+            values[index] = sum(self.values[max(lower, 0) : upper])
+        return TimeSeries(start, rollup, values)
+
+
 class BaseTSDB(Service):
     __read_methods__ = frozenset(
         [
             "get_range",
+            "get_range_arrays",
             "get_sums",
             "get_distinct_counts_series",
             "get_distinct_counts_totals",
@@ -139,6 +244,7 @@ class BaseTSDB(Service):
                 "get_optimal_rollup_series",
                 "get_rollups",
                 "make_series",
+                "make_series_array",
                 "models",
                 "models_with_environment_support",
                 "normalize_to_epoch",
@@ -278,6 +384,13 @@ class BaseTSDB(Service):
             for timestamp in self.get_optimal_rollup_series(start, end, rollup)[1]
         ]
 
+    def make_series_array(self, start, end=None, rollup=None):
+        """
+        Returns an empty ``TimeSeries`` for the intervals of ``make_series``.
+        """
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        return TimeSeries.zeros(series[0], rollup, len(series))
+
     def calculate_expiry(self, rollup, samples, timestamp):
         """
         Calculate the expiration time for a rollup.
@@ -362,8 +475,19 @@ class BaseTSDB(Service):
         """
         raise NotImplementedError
 
+    def get_range_arrays(self, model, keys, start, end, rollup=None, environment_ids=None):
+        """
+        Like ``get_range``, but returns a mapping of key => ``TimeSeries``.
+        """
+        range_set = self.get_range(model, keys, start, end, rollup, environment_ids)
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        return {
+            key: TimeSeries.from_points(points, series[0], rollup, len(series))
+            for key, points in six.iteritems(range_set)
+        }
+
     def get_sums(self, model, keys, start, end, rollup=None, environment_id=None):
-        range_set = self.get_range(
+        range_set = self.get_range_arrays(
             model,
             keys,
             start,
@@ -371,19 +495,22 @@ class BaseTSDB(Service):
             rollup,
             environment_ids=[environment_id] if environment_id is not None else None,
         )
-        sum_set = dict(
-            (key, sum(p for _, p in points)) for (key, points) in six.iteritems(range_set)
-        )
+        sum_set = dict((key, series.sum()) for (key, series) in six.iteritems(range_set))
         return sum_set
 
     def rollup(self, values, rollup):
         """
-        Given a set of values (as returned from ``get_range``), roll them up
-        using the ``rollup`` time (in seconds).
+        Given a set of values (as returned from ``get_range`` or
+        ``get_range_arrays``), roll them up using the ``rollup`` time (in
+        seconds).
         """
         normalize_ts_to_epoch = self.normalize_ts_to_epoch
         result = {}
         for key, points in six.iteritems(values):
+            if isinstance(points, TimeSeries):
+                result[key] = points.rollup_to(rollup)
+                continue
+
             result[key] = []
             last_new_ts = None
             for (ts, count) in points:
@@ -14,7 +14,9 @@ from django.utils import timezone
 from pkg_resources import resource_string
 from redis.client import Script
 
-from sentry.tsdb.base import BaseTSDB
+from sentry.tsdb.base import BaseTSDB, TimeSeries
+from sentry.utils import metrics
+from sentry.utils.coalescing import CoalescingBuffer
 from sentry.utils.dates import to_datetime, to_timestamp
 from sentry.utils.redis import check_cluster_versions, get_cluster_from_options
 from sentry.utils.versioning import Version
@@ -108,15 +110,41 @@ class RedisTSDB(BaseTSDB):
     frequency table can be displayed as percentages of the whole data set.
     (Additional documentation and the bulk of the logic for implementing the
     frequency table API can be found in the ``cmsketch.lua`` script.)
+
+    Writes can be buffered in process by setting ``write_buffer_window``.
+    Counter increments, distinct counter additions and frequency table updates
+    to the same Redis keys are then merged for up to that many seconds, or
+    until ``write_buffer_max_keys`` keys are pending, and written with a
+    single round trip per cluster. Buffered writes are lost if the process
+    dies before they are flushed.
     """
 
     DEFAULT_SKETCH_PARAMETERS = SketchParameters(3, 128, 50)
 
-    def __init__(self, prefix="ts:", vnodes=64, **options):
+    def __init__(
+        self, prefix="ts:", vnodes=64, write_buffer_window=0, write_buffer_max_keys=1000, **options
+    ):
         self.cluster, options = get_cluster_from_options("SENTRY_TSDB_OPTIONS", options)
         self.prefix = prefix
         self.vnodes = vnodes
         self.enable_frequency_sketches = options.pop("enable_frequency_sketches", False)
+
+        self.write_buffer_window = write_buffer_window
+        self.write_buffer_max_keys = write_buffer_max_keys
+        assert self.write_buffer_window >= 0
+        assert self.write_buffer_max_keys > 0
+        # (cluster, durable) -> pending writes, see ``_make_writes``
+        self._pending_writes = (
+            CoalescingBuffer(
+                self._flush_pending_writes,
+                write_buffer_window,
+                write_buffer_max_keys,
+                size=lambda writes: sum(map(self._count_pending_keys, six.itervalues(writes))),
+            )
+            if write_buffer_window
+            else None
+        )
+
         super(RedisTSDB, self).__init__(**options)
 
     def validate(self):
@@ -224,46 +252,38 @@ class RedisTSDB(BaseTSDB):
         if default_timestamp is None:
             default_timestamp = timezone.now()
 
-        for (cluster, durable), environment_ids in self.get_cluster_groups(
-            set([None, environment_id])
-        ):
-            manager = cluster.map()
-            if not durable:
-                manager = SuppressionWrapper(manager)
-
-            with manager as client:
-                # (hash_key, hash_field) -> count
-                key_operations = defaultdict(lambda: 0)
-                # (hash_key) -> "max expiration encountered"
-                key_expiries = defaultdict(lambda: 0.0)
+        writes_by_cluster = {}
+        for cluster_key, environment_ids in self.get_cluster_groups(set([None, environment_id])):
+            writes = writes_by_cluster[cluster_key] = self._make_writes()
+            counters = writes["counters"]
+            expiries = writes["counter_expiries"]
 
-                for rollup, max_values in six.iteritems(self.rollups):
-                    for item in items:
-                        if len(item) == 2:
-                            model, key = item
-                            options = {}
-                        else:
-                            model, key, options = item
+            for rollup, max_values in six.iteritems(self.rollups):
+                for item in items:
+                    if len(item) == 2:
+                        model, key = item
+                        options = {}
+                    else:
+                        model, key, options = item
 
-                        count = options.get("count", default_count)
-                        timestamp = options.get("timestamp", default_timestamp)
+                    count = options.get("count", default_count)
+                    timestamp = options.get("timestamp", default_timestamp)
 
-                        expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                    expiry = self.calculate_expiry(rollup, max_values, timestamp)
 
-                        for environment_id in environment_ids:
-                            hash_key, hash_field = self.make_counter_key(
-                                model, rollup, timestamp, key, environment_id
-                            )
+                    for environment_id in environment_ids:
+                        hash_key, hash_field = self.make_counter_key(
+                            model, rollup, timestamp, key, environment_id
+                        )
 
-                            if key_expiries[hash_key] < expiry:
-                                key_expiries[hash_key] = expiry
+                        if expiries.get(hash_key, 0.0) < expiry:
+                            expiries[hash_key] = expiry
 
-                            key_operations[(hash_key, hash_field)] += count
+                        counters[(hash_key, hash_field)] = (
+                            counters.get((hash_key, hash_field), 0) + count
+                        )
 
-                for (hash_key, hash_field), count in six.iteritems(key_operations):
-                    client.hincrby(hash_key, hash_field, count)
-                    if key_expiries.get(hash_key):
-                        client.expireat(hash_key, key_expiries.pop(hash_key))
+        self._submit_writes(writes_by_cluster)
 
     def get_range(self, model, keys, start, end, rollup=None, environment_ids=None):
         """
@@ -274,35 +294,53 @@ class RedisTSDB(BaseTSDB):
         >>>          start=now - timedelta(days=1),
         >>>          end=now)
         """
-        # redis backend doesn't support multiple envs
-        if environment_ids is not None and len(environment_ids) > 1:
-            raise NotImplementedError
-        environment_id = environment_ids[0] if environment_ids else None
+        return {
+            key: series.to_points()
+            for key, series in six.iteritems(
+                self.get_range_arrays(model, keys, start, end, rollup, environment_ids)
+            )
+        }
 
-        self.validate_arguments([model], [environment_id])
+    def get_range_arrays(self, model, keys, start, end, rollup=None, environment_ids=None):
+        """
+        Like ``get_range``, but returns a mapping of key => ``TimeSeries``.
+
+        Counters of the same hash are read with a single ``HMGET``, and the
+        counts of multiple environments are added up.
+        """
+        if not environment_ids:
+            environment_ids = [None]
+
+        self.validate_arguments([model], environment_ids)
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        series = map(to_datetime, series)
+        timestamps = map(to_datetime, series)
+
+        results = {key: TimeSeries.zeros(series[0], rollup, len(series)) for key in keys}
+        for (cluster, _), cluster_environment_ids in self.get_cluster_groups(environment_ids):
+            # hash_key -> [(key, index, hash_field), ...]
+            fields = defaultdict(list)
+            for environment_id in cluster_environment_ids:
+                for index, timestamp in enumerate(timestamps):
+                    for key in keys:
+                        hash_key, hash_field = self.make_counter_key(
+                            model, rollup, timestamp, key, environment_id
+                        )
+                        fields[hash_key].append((key, index, hash_field))
 
-        results = []
-        cluster, _ = self.get_cluster(environment_id)
-        with cluster.map() as client:
-            for key in keys:
-                for timestamp in series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
+            responses = []
+            with cluster.map() as client:
+                for hash_key, entries in six.iteritems(fields):
+                    responses.append(
+                        (entries, client.hmget(hash_key, [entry[2] for entry in entries]))
                     )
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+            for entries, response in responses:
+                for (key, index, _), count in zip(entries, response.value):
+                    if count is not None:
+                        results[key].values[index] += int(count)
 
-        for key, points in six.iteritems(results_by_key):
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+        return results
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -394,21 +432,22 @@ class RedisTSDB(BaseTSDB):
 
         ts = int(to_timestamp(timestamp))  # ``timestamp`` is not actually a timestamp :(
 
-        for (cluster, durable), environment_ids in self.get_cluster_groups(
-            set([None, environment_id])
-        ):
-            manager = cluster.fanout()
-            if not durable:
-                manager = SuppressionWrapper(manager)
+        writes_by_cluster = {}
+        for cluster_key, environment_ids in self.get_cluster_groups(set([None, environment_id])):
+            writes = writes_by_cluster[cluster_key] = self._make_writes()
 
-            with manager as client:
-                for model, key, values in items:
-                    c = client.target_key(key)
-                    for rollup, max_values in six.iteritems(self.rollups):
-                        for environment_id in environment_ids:
-                            k = self.make_key(model, rollup, ts, key, environment_id)
-                            c.pfadd(k, *values)
-                            c.expireat(k, self.calculate_expiry(rollup, max_values, timestamp))
+            for model, key, values in items:
+                # All keys of an item are stored on the host of the item key.
+                distinct = writes["distinct"].setdefault(key, {})
+                for rollup, max_values in six.iteritems(self.rollups):
+                    expiry = self.calculate_expiry(rollup, max_values, timestamp)
+                    for environment_id in environment_ids:
+                        k = self.make_key(model, rollup, ts, key, environment_id)
+                        pending = distinct.setdefault(k, [set(), expiry])
+                        pending[0].update(values)
+                        pending[1] = max(pending[1], expiry)
+
+        self._submit_writes(writes_by_cluster)
 
     def get_distinct_counts_series(
         self, model, keys, start, end=None, rollup=None, environment_id=None
@@ -662,15 +701,14 @@ class RedisTSDB(BaseTSDB):
 
         ts = int(to_timestamp(timestamp))  # ``timestamp`` is not actually a timestamp :(
 
-        for (cluster, durable), environment_ids in self.get_cluster_groups(
-            set([None, environment_id])
-        ):
-            commands = {}
+        writes_by_cluster = {}
+        for cluster_key, environment_ids in self.get_cluster_groups(set([None, environment_id])):
+            writes = writes_by_cluster[cluster_key] = self._make_writes()
 
             for model, request in requests:
                 for key, items in six.iteritems(request):
                     keys = []
-                    expirations = {}
+                    expirations = writes["frequency_expiries"].setdefault(key, {})
 
                     # Figure out all of the keys we need to be incrementing, as
                     # well as their expiration policies.
@@ -683,18 +721,126 @@ class RedisTSDB(BaseTSDB):
 
                         expiry = self.calculate_expiry(rollup, max_values, timestamp)
                         for k in chunk:
-                            expirations[k] = expiry
+                            expirations[k] = max(expirations.get(k, 0), expiry)
 
-                    arguments = ["INCR"] + list(self.DEFAULT_SKETCH_PARAMETERS)
+                    # Scores of the same members in the same tables are added
+                    # up, so that every table is only incremented once.
+                    scores = writes["frequencies"].setdefault(key, {}).setdefault(tuple(keys), {})
                     for member, score in items.items():
+                        scores[member] = scores.get(member, 0) + score
+
+        self._submit_writes(writes_by_cluster)
+
+    def _make_writes(self):
+        return {
+            # (hash_key, hash_field) -> count
+            "counters": {},
+            # hash_key -> max expiry
+            "counter_expiries": {},
+            # item key -> {distinct counter key -> [values, max expiry]}
+            "distinct": {},
+            # item key -> {frequency table keys -> {member -> score}}
+            "frequencies": {},
+            # item key -> {frequency table key -> max expiry}
+            "frequency_expiries": {},
+        }
+
+    def _merge_writes(self, writes, other):
+        for key, count in six.iteritems(other["counters"]):
+            writes["counters"][key] = writes["counters"].get(key, 0) + count
+
+        for hash_key, expiry in six.iteritems(other["counter_expiries"]):
+            writes["counter_expiries"][hash_key] = max(
+                writes["counter_expiries"].get(hash_key, 0), expiry
+            )
+
+        for key, distinct in six.iteritems(other["distinct"]):
+            pending_distinct = writes["distinct"].setdefault(key, {})
+            for k, (values, expiry) in six.iteritems(distinct):
+                pending = pending_distinct.setdefault(k, [set(), expiry])
+                pending[0].update(values)
+                pending[1] = max(pending[1], expiry)
+
+        for key, tables in six.iteritems(other["frequencies"]):
+            pending_tables = writes["frequencies"].setdefault(key, {})
+            for keys, scores in six.iteritems(tables):
+                pending_scores = pending_tables.setdefault(keys, {})
+                for member, score in six.iteritems(scores):
+                    pending_scores[member] = pending_scores.get(member, 0) + score
+
+        for key, expirations in six.iteritems(other["frequency_expiries"]):
+            pending_expirations = writes["frequency_expiries"].setdefault(key, {})
+            for k, expiry in six.iteritems(expirations):
+                pending_expirations[k] = max(pending_expirations.get(k, 0), expiry)
+
+    def _count_pending_keys(self, writes):
+        return len(writes["counters"]) + len(writes["distinct"]) + len(writes["frequencies"])
+
+    def _submit_writes(self, writes_by_cluster):
+        """
+        Writes the given writes, a mapping of ``(cluster, durable)`` pairs to
+        the writes built with ``_make_writes``, or merges them into the pending
+        writes if writes are buffered.
+        """
+        if self._pending_writes is None:
+            for (cluster, durable), writes in six.iteritems(writes_by_cluster):
+                self._write(cluster, durable, writes)
+            return
+
+        with self._pending_writes.pending() as pending_writes:
+            for cluster_key, writes in six.iteritems(writes_by_cluster):
+                pending = pending_writes.get(cluster_key)
+                if pending is None:
+                    pending = pending_writes[cluster_key] = self._make_writes()
+                self._merge_writes(pending, writes)
+
+    def flush_writes(self):
+        """
+        Writes all writes buffered within the current window to Redis.
+        """
+        if self._pending_writes is not None:
+            self._pending_writes.flush()
+
+    def _flush_pending_writes(self, pending_writes):
+        for (cluster, durable), writes in six.iteritems(pending_writes):
+            metrics.timing("tsdb.buffered-keys", self._count_pending_keys(writes))
+            self._write(cluster, durable, writes)
+
+    def _write(self, cluster, durable, writes):
+        """
+        Writes counter increments and distinct counter additions with a single
+        fanout, and frequency table updates with a single batch of commands.
+        """
+        if writes["counters"] or writes["distinct"]:
+            manager = cluster.fanout()
+            if not durable:
+                manager = SuppressionWrapper(manager)
+
+            with manager as client:
+                for (hash_key, hash_field), count in six.iteritems(writes["counters"]):
+                    client.target_key(hash_key).hincrby(hash_key, hash_field, count)
+
+                for hash_key, expiry in six.iteritems(writes["counter_expiries"]):
+                    client.target_key(hash_key).expireat(hash_key, expiry)
+
+                for key, distinct in six.iteritems(writes["distinct"]):
+                    c = client.target_key(key)
+                    for k, (values, expiry) in six.iteritems(distinct):
+                        c.pfadd(k, *values)
+                        c.expireat(k, expiry)
+
+        if writes["frequencies"]:
+            commands = {}
+            for key, tables in six.iteritems(writes["frequencies"]):
+                cmds = commands[key] = []
+                for keys, scores in six.iteritems(tables):
+                    arguments = ["INCR"] + list(self.DEFAULT_SKETCH_PARAMETERS)
+                    for member, score in six.iteritems(scores):
                         arguments.extend((score, member))
+                    cmds.append((CountMinScript, list(keys), arguments))
 
-                    # Since we're essentially merging dictionaries, we need to
-                    # append this to any value that already exists at the key.
-                    cmds = commands.setdefault(key, [])
-                    cmds.append((CountMinScript, keys, arguments))
-                    for k, t in expirations.items():
-                        cmds.append(("EXPIREAT", k, t))
+                for k, t in six.iteritems(writes["frequency_expiries"][key]):
+                    cmds.append(("EXPIREAT", k, t))
 
             try:
                 cluster.execute_commands(commands)
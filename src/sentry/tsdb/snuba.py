@@ -6,7 +6,7 @@ import itertools
 
 import six
 
-from sentry.tsdb.base import BaseTSDB, TSDBModel
+from sentry.tsdb.base import BaseTSDB, TimeSeries, TSDBModel
 from sentry.utils import snuba, outcomes
 from sentry.utils.data_filters import FILTER_STAT_KEYS_TO_VALUES
 from sentry.utils.dates import to_datetime
@@ -332,6 +332,14 @@ class SnubaTSDB(BaseTSDB):
                         del result[rk]
 
     def get_range(self, model, keys, start, end, rollup=None, environment_ids=None):
+        result = self._get_range_data(model, keys, start, end, rollup, environment_ids)
+        # convert
+        #    {group:{timestamp:count, ...}}
+        # into
+        #    {group: [(timestamp, count), ...]}
+        return {k: sorted(result[k].items()) for k in result}
+
+    def _get_range_data(self, model, keys, start, end, rollup, environment_ids):
         # 10s is the only rollup under an hour that we support
         if rollup and rollup == 10 and model in self.lower_rollup_query_settings.keys():
             model_query_settings = self.lower_rollup_query_settings.get(model)
@@ -345,7 +353,7 @@ class SnubaTSDB(BaseTSDB):
         else:
             aggregate_function = "count()"
 
-        result = self.get_data(
+        return self.get_data(
             model,
             keys,
             start,
@@ -355,11 +363,14 @@ class SnubaTSDB(BaseTSDB):
             aggregation=aggregate_function,
             group_on_time=True,
         )
-        # convert
-        #    {group:{timestamp:count, ...}}
-        # into
-        #    {group: [(timestamp, count), ...]}
-        return {k: sorted(result[k].items()) for k in result}
+
+    def get_range_arrays(self, model, keys, start, end, rollup=None, environment_ids=None):
+        result = self._get_range_data(model, keys, start, end, rollup, environment_ids)
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        return {
+            key: TimeSeries.from_points(six.iteritems(points), series[0], rollup, len(series))
+            for key, points in six.iteritems(result)
+        }
 
     def get_distinct_counts_series(
         self, model, keys, start, end=None, rollup=None, environment_id=None
@@ -0,0 +1,64 @@
+from __future__ import absolute_import
+
+import atexit
+import threading
+from contextlib import contextmanager
+
+
+class CoalescingBuffer(object):
+    """
+    Buffers writes in process so that writes to the same keys can be merged
+    before they are flushed.
+
+    Pending writes are kept in a dictionary that callers update through
+    ``pending``. They are passed to ``callback`` once ``window`` seconds have
+    passed since the first buffered write, once ``size`` of the pending writes
+    reaches ``max_keys``, when ``flush`` is called or when the process exits.
+    Buffered writes are lost if the process dies before they are flushed.
+
+    >>> buffer = CoalescingBuffer(write, window=1, max_keys=1000)
+    >>> with buffer.pending() as pending:
+    ...     pending[key] = pending.get(key, 0) + 1
+    """
+
+    def __init__(self, callback, window, max_keys, size=len):
+        assert window > 0
+        assert max_keys > 0
+        self.callback = callback
+        self.window = window
+        self.max_keys = max_keys
+        self.size = size
+        self.writes = {}
+        self.__lock = threading.Lock()
+        self.__timer = None
+        atexit.register(self.flush)
+
+    @contextmanager
+    def pending(self):
+        """
+        Yields the pending writes for updating them while holding the lock.
+        """
+        with self.__lock:
+            yield self.writes
+
+            flush = self.size(self.writes) >= self.max_keys
+            if not flush and self.__timer is None:
+                self.__timer = threading.Timer(self.window, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Passes all pending writes to the callback.
+        """
+        with self.__lock:
+            writes, self.writes = self.writes, {}
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+        if writes:
+            self.callback(writes)
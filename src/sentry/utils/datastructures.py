@@ -1,6 +1,9 @@
 from __future__ import absolute_import
 
-from collections import Hashable, MutableMapping
+import threading
+
+from collections import Hashable, MutableMapping, OrderedDict
+from time import time
 
 __unset__ = object()
 
@@ -61,3 +64,108 @@ class BidirectionalMapping(MutableMapping):
 
     def inverse(self):
         return self.__inverse.copy()
+
+
+class LRUCache(object):
+    """\
+    A thread safe, bounded cache that evicts the least recently used entry
+    once more than ``max_entries`` entries are stored.
+
+    If ``ttl`` (in seconds) is provided, entries also expire that long after
+    they have been set.
+
+    If ``max_size`` is provided, entries are also evicted once the total size
+    of all values exceeds it. The size of a value is measured with ``sizeof``,
+    which defaults to ``len`` and is meant for byte strings.
+    """
+
+    def __init__(self, max_entries, ttl=None, max_size=None, sizeof=len):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.size = 0
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __contains__(self, key):
+        return self.get(key, __unset__) is not __unset__
+
+    def __pop(self, key):
+        entry = self.__data.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+        return entry
+
+    def get(self, key, default=None):
+        with self.__lock:
+            entry = self.__pop(key)
+            if entry is None:
+                return default
+
+            value, expires, size = entry
+            if expires is not None and expires <= time():
+                return default
+
+            # Reinsert the entry to mark it as the most recently used one.
+            self.__data[key] = entry
+            self.size += size
+            return value
+
+    def get_many(self, keys):
+        """\
+        Returns a dictionary of all given keys that are present in the cache.
+        """
+        results = {}
+        for key in keys:
+            value = self.get(key, __unset__)
+            if value is not __unset__:
+                results[key] = value
+        return results
+
+    def set(self, key, value, ttl=None):
+        """\
+        Stores ``value``, optionally with a ``ttl`` overriding the default one.
+        Values larger than ``max_size`` are not stored at all.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        expires = time() + ttl if ttl is not None else None
+        size = self.sizeof(value) if self.max_size is not None else 0
+
+        with self.__lock:
+            self.__pop(key)
+            if self.max_size is not None and size > self.max_size:
+                return
+
+            self.__data[key] = (value, expires, size)
+            self.size += size
+
+            while len(self.__data) > self.max_entries or (
+                self.max_size is not None and self.size > self.max_size
+            ):
+                self.size -= self.__data.popitem(last=False)[1][2]
+
+    def set_many(self, items, ttl=None):
+        for key, value in items:
+            self.set(key, value, ttl=ttl)
+
+    def delete(self, key):
+        with self.__lock:
+            self.__pop(key)
+
+    def delete_many(self, keys):
+        with self.__lock:
+            for key in keys:
+                self.__pop(key)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+            self.size = 0
@@ -2,6 +2,16 @@ from __future__ import absolute_import
 
 import sentry_relay
 
+from sentry.utils.datastructures import LRUCache
+
+# Results of recent glob matches.  Grouping rules match the same handful of
+# patterns against the same frames over and over, and every match is a call
+# through FFI.
+_glob_match_cache = LRUCache(20000)
+
+# Characters that end the literal prefix of a glob pattern.
+GLOB_SPECIAL_CHARS = "*?[{\\"
+
 
 def glob_match(
     value, pat, doublestar=False, ignorecase=False, path_normalize=False, allow_newline=True
@@ -15,3 +25,32 @@ def glob_match(
         path_normalize=path_normalize,
         allow_newline=allow_newline,
     )
+
+
+def cached_glob_match(
+    value, pat, doublestar=False, ignorecase=False, path_normalize=False, allow_newline=True
+):
+    """Like `glob_match` but remembers the results of recent matches."""
+    key = (value, pat, doublestar, ignorecase, path_normalize, allow_newline)
+    rv = _glob_match_cache.get(key)
+    if rv is None:
+        rv = glob_match(
+            value,
+            pat,
+            doublestar=doublestar,
+            ignorecase=ignorecase,
+            path_normalize=path_normalize,
+            allow_newline=allow_newline,
+        )
+        _glob_match_cache.set(key, rv)
+    return rv
+
+
+def get_literal_prefix(pat):
+    """Returns the part of a pattern before the first special character.
+    Patterns without special characters only match their literal value.
+    """
+    for idx, char in enumerate(pat):
+        if char in GLOB_SPECIAL_CHARS:
+            return pat[:idx]
+    return pat
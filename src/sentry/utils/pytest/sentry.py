@@ -79,6 +79,10 @@ def pytest_configure(config):
     settings.SENTRY_TSDB = "sentry.tsdb.inmemory.InMemoryTSDB"
     settings.SENTRY_TSDB_OPTIONS = {}
 
+    # Cached Snuba queries are quantized, which hides events stored moments
+    # before querying them.
+    settings.SENTRY_SNUBA_CACHE_DURATION = 0
+
     if settings.SENTRY_NEWSLETTER == "sentry.newsletter.base.Newsletter":
         settings.SENTRY_NEWSLETTER = "sentry.newsletter.dummy.DummyNewsletter"
         settings.SENTRY_NEWSLETTER_OPTIONS = {}
@@ -255,4 +259,26 @@ def pytest_runtest_teardown(item):
     for model in (OrganizationOption, ProjectOption, UserOption):
         model.objects.clear_local_cache()
 
+    from sentry.event_manager import _group_hash_cache
+
+    _group_hash_cache.clear()
+
+    from sentry.nodestore.base import _local_cache as _nodestore_local_cache
+
+    _nodestore_local_cache.clear()
+
+    from sentry.grouping.api import _fingerprinting_rules_cache, _variant_cache
+
+    _fingerprinting_rules_cache.clear()
+    _variant_cache.clear()
+
+    from sentry.models.projectownership import _matching_rules_cache, _rules_cache
+
+    _matching_rules_cache.clear()
+    _rules_cache.clear()
+
+    from sentry.db.models.manager import _process_cache as _model_process_cache
+
+    _model_process_cache.clear()
+
     Hub.main.bind_client(None)
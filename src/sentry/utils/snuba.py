@@ -10,12 +10,13 @@ import os
 import pytz
 import re
 import six
+import threading
 import time
 import urllib3
 import sentry_sdk
 from sentry_sdk import Hub
 
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from django.conf import settings
 from six.moves.urllib.parse import urlparse
 
@@ -32,7 +33,9 @@ from sentry.models import (
 )
 from sentry.net.http import connection_from_url
 from sentry.utils import metrics, json
+from sentry.utils.cache import cache
 from sentry.utils.dates import to_timestamp
+from sentry.utils.hashlib import md5_text
 from sentry.snuba.events import Columns
 from sentry.snuba.dataset import Dataset
 from sentry.utils.compat import map
@@ -255,6 +258,10 @@ _snuba_pool = connection_from_url(
 )
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
 
+# Identical cached queries that are in flight in this process, by cache key.
+_inflight_queries = {}
+_inflight_queries_lock = threading.Lock()
+
 
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
 
@@ -542,11 +549,12 @@ def raw_query(
     rollup=None,
     referrer=None,
     is_grouprelease=False,
+    use_cache=False,
     **kwargs
 ):
     """
     Sends a query to snuba.  See `SnubaQueryParams` docstring for param
-    descriptions.
+    descriptions, and `bulk_raw_query` for `use_cache`.
     """
     snuba_params = SnubaQueryParams(
         dataset=dataset,
@@ -560,21 +568,111 @@ def raw_query(
         is_grouprelease=is_grouprelease,
         **kwargs
     )
-    return bulk_raw_query([snuba_params], referrer=referrer)[0]
+    return bulk_raw_query([snuba_params], referrer=referrer, use_cache=use_cache)[0]
+
+
+def _quantize_query_params(query_params, duration):
+    """
+    Rounds the start and end of a prepared query down with `quantize_time`, so
+    that identical queries issued within `duration` seconds of each other
+    produce the same parameters. The jitter is derived from the rest of the
+    query, so that not all cached queries expire at once.
+
+    Returns `None` if the quantized query would cover less than `duration`
+    seconds, as short ranges can collapse entirely.
+    """
+    query_key = json.dumps(
+        OrderedDict(
+            sorted(
+                (k, v) for k, v in six.iteritems(query_params) if k not in ("from_date", "to_date")
+            )
+        )
+    )
+    key_hash = int(md5_text(query_key).hexdigest()[:8], 16)
+
+    start, end = [
+        quantize_time(parse_datetime(query_params[key]), key_hash, duration=duration)
+        for key in ("from_date", "to_date")
+    ]
+    if (end - start).total_seconds() < duration:
+        return None
+
+    return dict(query_params, from_date=start.isoformat(), to_date=end.isoformat())
 
 
-def bulk_raw_query(snuba_param_list, referrer=None):
+def _cached_snuba_query(query_params, headers, referrer, ttl):
+    """
+    Sends a query to snuba through the result cache and returns a tuple of
+    `(status, data)`. Identical queries that are already in flight in this
+    process wait for that request instead of issuing their own.
+    """
+    body = json.dumps(query_params)
+    cache_key = u"snuba:query:{}".format(
+        md5_text(json.dumps(OrderedDict(sorted(six.iteritems(query_params))))).hexdigest()
+    )
+
+    result = cache.get(cache_key)
+    if result is not None:
+        metrics.incr("snuba.query.cache", tags={"referrer": referrer, "result": "hit"})
+        return result
+
+    with _inflight_queries_lock:
+        future = _inflight_queries.get(cache_key)
+        is_owner = future is None
+        if is_owner:
+            future = _inflight_queries[cache_key] = Future()
+
+    if not is_owner:
+        metrics.incr("snuba.query.cache", tags={"referrer": referrer, "result": "coalesced"})
+        return future.result()
+
+    metrics.incr("snuba.query.cache", tags={"referrer": referrer, "result": "miss"})
+    try:
+        response = _snuba_pool.urlopen("POST", "/query", body=body, headers=headers)
+        result = (response.status, response.data)
+        if response.status == 200:
+            cache.set(cache_key, result, ttl)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+    finally:
+        with _inflight_queries_lock:
+            del _inflight_queries[cache_key]
+
+    return result
+
+
+def bulk_raw_query(snuba_param_list, referrer=None, use_cache=False):
+    """
+    Sends several queries to snuba in parallel.
+
+    With `use_cache`, the start and end of each query are quantized to
+    `SENTRY_SNUBA_CACHE_DURATION` seconds and successful responses are cached
+    for that long. Concurrent identical queries share a single request.
+    Queries covering less than that duration are never cached, and a duration
+    of 0 disables the cache.
+    """
     headers = {}
     if referrer:
         headers["referer"] = referrer
 
-    query_param_list = map(_prepare_query_params, snuba_param_list)
+    cache_duration = settings.SENTRY_SNUBA_CACHE_DURATION
+    query_param_list = []
+    for query_params, forward, reverse in map(_prepare_query_params, snuba_param_list):
+        quantized_params = None
+        if use_cache and cache_duration:
+            quantized_params = _quantize_query_params(query_params, cache_duration)
+        if quantized_params is not None:
+            query_param_list.append((quantized_params, forward, reverse, True))
+        else:
+            query_param_list.append((query_params, forward, reverse, False))
 
     def snuba_query(params):
-        query_params, forward, reverse, thread_hub = params
+        query_params, forward, reverse, cached, thread_hub = params
         try:
             with timer("snuba_query"):
-                body = json.dumps(query_params)
                 referrer = headers.get("referer", "<unknown>")
                 with thread_hub.start_span(
                     op="snuba", description=u"query {}".format(referrer)
@@ -582,11 +680,15 @@ def bulk_raw_query(snuba_param_list, referrer=None):
                     span.set_tag("referrer", referrer)
                     for param_key, param_data in six.iteritems(query_params):
                         span.set_data(param_key, param_data)
-                    return (
-                        _snuba_pool.urlopen("POST", "/query", body=body, headers=headers),
-                        forward,
-                        reverse,
-                    )
+                    if cached:
+                        result = _cached_snuba_query(
+                            query_params, headers, referrer, cache_duration
+                        )
+                    else:
+                        body = json.dumps(query_params)
+                        response = _snuba_pool.urlopen("POST", "/query", body=body, headers=headers)
+                        result = (response.status, response.data)
+                    return result, forward, reverse
         except urllib3.exceptions.HTTPError as err:
             raise SnubaError(err)
 
@@ -607,18 +709,16 @@ def bulk_raw_query(snuba_param_list, referrer=None):
             query_results = [snuba_query(query_param_list[0] + (Hub(Hub.current),))]
 
     results = []
-    for response, _, reverse in query_results:
+    for (status, data), _, reverse in query_results:
         try:
-            body = json.loads(response.data)
+            body = json.loads(data)
         except ValueError:
-            raise UnexpectedResponseError(
-                u"Could not decode JSON response: {}".format(response.data)
-            )
+            raise UnexpectedResponseError(u"Could not decode JSON response: {}".format(data))
 
-        if response.status != 200:
+        if status != 200:
             if body.get("error"):
                 error = body["error"]
-                if response.status == 429:
+                if status == 429:
                     raise RateLimitExceeded(error["message"])
                 elif error["type"] == "schema":
                     raise SchemaValidationError(error["message"])
@@ -629,7 +729,7 @@ def bulk_raw_query(snuba_param_list, referrer=None):
                 else:
                     raise SnubaError(error["message"])
             else:
-                raise SnubaError(u"HTTP {}".format(response.status))
+                raise SnubaError(u"HTTP {}".format(status))
 
         # Forward and reverse translation maps from model ids to snuba keys, per column
         body["data"] = [reverse(d) for d in body["data"]]
@@ -90,30 +90,23 @@ class AuthenticationForm(forms.Form):
         return value.lower()
 
     def is_rate_limited(self):
-        if self._is_ip_rate_limited():
-            return True
-        if self._is_user_rate_limited():
-            return True
-        return False
-
-    def _is_ip_rate_limited(self):
-        limit = options.get("auth.ip-rate-limit")
-        if not limit:
-            return False
+        # Both limits are checked in a single round-trip.
+        items = []
 
-        ip_address = self.request.META["REMOTE_ADDR"]
-        return ratelimiter.is_limited(u"auth:ip:{}".format(ip_address), limit)
-
-    def _is_user_rate_limited(self):
-        limit = options.get("auth.user-rate-limit")
-        if not limit:
-            return False
+        ip_limit = options.get("auth.ip-rate-limit")
+        if ip_limit:
+            ip_address = self.request.META["REMOTE_ADDR"]
+            items.append((u"auth:ip:{}".format(ip_address), ip_limit))
 
+        user_limit = options.get("auth.user-rate-limit")
         username = self.cleaned_data.get("username")
-        if not username:
+        if user_limit and username:
+            items.append((u"auth:username:{}".format(username), user_limit))
+
+        if not items:
             return False
 
-        return ratelimiter.is_limited(u"auth:username:{}".format(username), limit)
+        return any(ratelimiter.is_limited_many(items))
 
     def clean(self):
         username = self.cleaned_data.get("username")
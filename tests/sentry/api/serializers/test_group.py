@@ -272,28 +272,30 @@ class StreamGroupSerializerTestCase(TestCase):
         from sentry.api.serializers.models.group import tsdb
 
         with mock.patch(
-            "sentry.api.serializers.models.group.tsdb.get_range", side_effect=tsdb.get_range
-        ) as get_range:
+            "sentry.api.serializers.models.group.tsdb.get_range_arrays",
+            side_effect=tsdb.get_range_arrays,
+        ) as get_range_arrays:
             serialize(
                 [group],
                 serializer=StreamGroupSerializer(
                     environment_func=lambda: environment, stats_period="14d"
                 ),
             )
-            assert get_range.call_count == 1
-            for args, kwargs in get_range.call_args_list:
+            assert get_range_arrays.call_count == 1
+            for args, kwargs in get_range_arrays.call_args_list:
                 assert kwargs["environment_ids"] == [environment.id]
 
         def get_invalid_environment():
             raise Environment.DoesNotExist()
 
         with mock.patch(
-            "sentry.api.serializers.models.group.tsdb.make_series", side_effect=tsdb.make_series
-        ) as make_series:
+            "sentry.api.serializers.models.group.tsdb.make_series_array",
+            side_effect=tsdb.make_series_array,
+        ) as make_series_array:
             serialize(
                 [group],
                 serializer=StreamGroupSerializer(
                     environment_func=get_invalid_environment, stats_period="14d"
                 ),
             )
-            assert make_series.call_count == 1
+            assert make_series_array.call_count == 1
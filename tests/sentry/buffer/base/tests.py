@@ -76,3 +76,63 @@ class BufferTest(TestCase):
         self.buf.process(Group, columns, filters, {"last_seen": the_date}, signal_only=True)
         group.refresh_from_db()
         assert group.times_seen == prev_times_seen
+
+    def test_process_batch(self):
+        group1 = Group.objects.create(project=Project(id=1))
+        group2 = Group.objects.create(project=Project(id=1))
+        the_date = timezone.now() + timedelta(days=5)
+
+        with self.assertNumQueries(1):
+            self.buf.process_batch(
+                [
+                    (Group, {"times_seen": 1}, {"id": group1.id}, {"last_seen": the_date}, None),
+                    (Group, {"times_seen": 3}, {"id": group2.id}, {"last_seen": the_date}, None),
+                ]
+            )
+
+        group1_ = Group.objects.get(id=group1.id)
+        assert group1_.times_seen == group1.times_seen + 1
+        assert group1_.last_seen == the_date
+        assert group1_.score > group1.score
+
+        group2_ = Group.objects.get(id=group2.id)
+        assert group2_.times_seen == group2.times_seen + 3
+        assert group2_.last_seen == the_date
+
+    def test_process_batch_casts_auto_fields(self):
+        group = Group.objects.create(project=Project(id=1))
+        the_date = timezone.now() + timedelta(days=5)
+
+        with self.assertNumQueries(1):
+            self.buf.process_batch(
+                [(Group, {"times_seen": 2}, {"pk": group.id}, {"last_seen": the_date}, None)]
+            )
+
+        group_ = Group.objects.get(id=group.id)
+        assert group_.times_seen == group.times_seen + 2
+        assert group_.last_seen == the_date
+
+    def test_process_batch_foreign_keys(self):
+        project = self.create_project()
+        release = Release.objects.create(organization_id=project.organization_id, version="abc")
+        release.add_project(project)
+        filters = {"release_id": release.id, "project_id": project.id}
+
+        with self.assertNumQueries(1):
+            self.buf.process_batch([(ReleaseProject, {"new_groups": 2}, filters, None, None)])
+
+        assert ReleaseProject.objects.get(**filters).new_groups == 2
+
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_batch_falls_back_to_process(self, process):
+        group = Group.objects.create(project=Project(id=1))
+        the_date = timezone.now() + timedelta(days=5)
+        incrs = [
+            (Group, {"times_seen": 1}, {"id": group.id + 1}, {"last_seen": the_date}, None),
+            (Group, {"times_seen": 1}, {"id": group.id}, {"last_seen": the_date}, True),
+        ]
+
+        self.buf.process_batch(incrs)
+
+        assert process.mock_calls == [mock.call(*incrs[1]), mock.call(*incrs[0])]
+        assert Group.objects.get(id=group.id).times_seen == group.times_seen
@@ -10,6 +10,7 @@ from django.utils import timezone
 from sentry.buffer.redis import RedisBuffer
 from sentry.models import Group, Project
 from sentry.testutils import TestCase
+from sentry.utils import json
 
 
 class RedisBufferTest(TestCase):
@@ -103,9 +104,9 @@ class RedisBufferTest(TestCase):
         self.buf.incr(model, columns, filters, extra={"foo": "bar", "datetime": now})
         result = client.hgetall("foo")
         f = result.pop("f")
-        assert pickle.loads(f) == {"pk": 1, "datetime": now}
-        assert pickle.loads(result.pop("e+datetime")) == now
-        assert pickle.loads(result.pop("e+foo")) == "bar"
+        assert self.buf._load_values(json.loads(f)) == {"pk": 1, "datetime": now}
+        assert self.buf._load_value(json.loads(result.pop("e+datetime"))) == now
+        assert self.buf._load_value(json.loads(result.pop("e+foo"))) == "bar"
         assert result == {"i+times_seen": "1", "m": "mock.mock.Mock"}
 
         pending = client.zrange("b:p", 0, -1)
@@ -113,14 +114,55 @@ class RedisBufferTest(TestCase):
         self.buf.incr(model, columns, filters, extra={"foo": "baz", "datetime": now})
         result = client.hgetall("foo")
         f = result.pop("f")
-        assert pickle.loads(f) == {"pk": 1, "datetime": now}
-        assert pickle.loads(result.pop("e+datetime")) == now
-        assert pickle.loads(result.pop("e+foo")) == "baz"
+        assert self.buf._load_values(json.loads(f)) == {"pk": 1, "datetime": now}
+        assert self.buf._load_value(json.loads(result.pop("e+datetime"))) == now
+        assert self.buf._load_value(json.loads(result.pop("e+foo"))) == "baz"
         assert result == {"i+times_seen": "2", "m": "mock.mock.Mock"}
 
         pending = client.zrange("b:p", 0, -1)
         assert pending == ["foo"]
 
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    @mock.patch("sentry.buffer.redis.process_incr", mock.Mock())
+    def test_incr_pickles_unsupported_values(self):
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        self.buf.incr(model, {"times_seen": 1}, {"pk": 1}, extra={"data": {"foo": "bar"}})
+        result = client.hgetall("foo")
+        assert pickle.loads(result["e+data"]) == {"foo": "bar"}
+
+    @mock.patch("sentry.buffer.redis.process_incr", mock.Mock())
+    def test_incr_coalesces(self):
+        buf = RedisBuffer(incr_coalesce_window=60)
+        client = buf.cluster.get_routing_client()
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        key = buf._make_key(Group, {"pk": 1})
+
+        buf.incr(Group, {"times_seen": 1}, {"pk": 1}, extra={"message": "foo"})
+        buf.incr(Group, {"times_seen": 2}, {"pk": 1}, extra={"message": "bar", "last_seen": now})
+        buf.incr(Group, {"times_seen": 1}, {"pk": 2})
+        assert client.hgetall(key) == {}
+
+        buf.flush_incrs()
+        result = client.hgetall(key)
+        assert buf._load_values(json.loads(result.pop("f"))) == {"pk": 1}
+        assert buf._load_value(json.loads(result.pop("e+message"))) == "bar"
+        assert buf._load_value(json.loads(result.pop("e+last_seen"))) == now
+        assert result == {"i+times_seen": "3", "m": "sentry.models.group.Group"}
+        assert sorted(client.zrange("b:p", 0, -1)) == sorted([key, buf._make_key(Group, {"pk": 2})])
+
+    @mock.patch("sentry.buffer.redis.process_incr", mock.Mock())
+    def test_incr_flushes_coalesced_at_max_keys(self):
+        buf = RedisBuffer(incr_coalesce_window=60, incr_coalesce_max_keys=2)
+        client = buf.cluster.get_routing_client()
+
+        buf.incr(Group, {"times_seen": 1}, {"pk": 1})
+        assert client.zrange("b:p", 0, -1) == []
+
+        buf.incr(Group, {"times_seen": 1}, {"pk": 2})
+        assert len(client.zrange("b:p", 0, -1)) == 2
+
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.redis.process_incr")
     @mock.patch("sentry.buffer.redis.process_pending")
@@ -203,3 +245,78 @@ class RedisBufferTest(TestCase):
             "s": "1"
         }
     """
+
+    @mock.patch("sentry.buffer.base.Buffer.process_batch")
+    def test_process_batch_keys(self, process_batch):
+        client = self.buf.cluster.get_routing_client()
+        client.hmset(
+            "foo", {"f": '{"pk": ["i","1"]}', "i+times_seen": "2", "m": "sentry.models.Group"}
+        )
+        client.hmset(
+            "bar", {"f": '{"pk": ["i","2"]}', "i+times_seen": "1", "m": "sentry.models.Group"}
+        )
+        client.zadd("b:p", 1, "foo")
+
+        self.buf.process(batch_keys=["foo", "bar", "baz"])
+
+        process_batch.assert_called_once_with(
+            [
+                (Group, {"times_seen": 2}, {"pk": 1}, {}, None),
+                (Group, {"times_seen": 1}, {"pk": 2}, {}, None),
+            ]
+        )
+        assert client.hgetall("foo") == {}
+        assert client.zrange("b:p", 0, -1) == []
+
+    @mock.patch("sentry.buffer.base.Buffer.process_batch")
+    def test_process_batch_keys_skips_locked(self, process_batch):
+        client = self.buf.cluster.get_routing_client()
+        client.hmset(
+            "foo", {"f": '{"pk": ["i","1"]}', "i+times_seen": "2", "m": "sentry.models.Group"}
+        )
+        client.hmset(
+            "bar", {"f": '{"pk": ["i","2"]}', "i+times_seen": "1", "m": "sentry.models.Group"}
+        )
+        client.set("l:bar", "1")
+
+        self.buf.process(batch_keys=["foo", "bar"])
+
+        process_batch.assert_called_once_with([(Group, {"times_seen": 2}, {"pk": 1}, {}, None)])
+        assert client.hgetall("bar") == {
+            "f": '{"pk": ["i","2"]}',
+            "i+times_seen": "1",
+            "m": "sentry.models.Group",
+        }
+        assert client.get("l:foo") is None
+        assert client.get("l:bar") == "1"
+
+    @mock.patch("sentry.buffer.base.Buffer.process_batch")
+    def test_process_batch_keys_restores_on_failure(self, process_batch):
+        client = self.buf.cluster.get_routing_client()
+        client.hmset(
+            "foo",
+            {
+                "f": '{"pk": ["i","1"]}',
+                "i+times_seen": "2",
+                "e+last_seen": '["i","1"]',
+                "m": "sentry.models.Group",
+            },
+        )
+
+        def incr_during_processing(incrs):
+            client.hmset("foo", {"i+times_seen": "1", "e+last_seen": '["i","2"]'})
+            raise Exception("boom")
+
+        process_batch.side_effect = incr_during_processing
+
+        with self.assertRaises(Exception):
+            self.buf.process(batch_keys=["foo"])
+
+        assert client.hgetall("foo") == {
+            "f": '{"pk": ["i","1"]}',
+            "i+times_seen": "3",
+            "e+last_seen": '["i","2"]',
+            "m": "sentry.models.Group",
+        }
+        assert client.zrange("b:p", 0, -1) == ["foo"]
+        assert client.get("l:foo") is None
@@ -0,0 +1,70 @@
+from __future__ import absolute_import
+
+from django.core.cache import cache
+
+from sentry.db.models.manager import bulk_get_from_cache
+from sentry.models import Organization, Project
+from sentry.testutils import TestCase
+
+
+class GetManyFromCacheTest(TestCase):
+    def test_fills_cache(self):
+        org = self.create_organization(slug="foo")
+        other = self.create_organization(slug="bar")
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            results = Organization.objects.get_many_from_cache(["foo", "bar"], key="slug")
+        assert {o.id for o in results} == {org.id, other.id}
+
+        with self.assertNumQueries(0):
+            results = Organization.objects.get_many_from_cache([org.id, other.id])
+        assert {o.slug for o in results} == {"foo", "bar"}
+
+        with self.assertNumQueries(0):
+            assert Organization.objects.get_from_cache(slug="bar").id == other.id
+
+    def test_process_cache(self):
+        org = self.create_organization(slug="foo")
+
+        with self.settings(SENTRY_MODEL_CACHE_LOCAL_TTL=60):
+            assert Organization.objects.get_from_cache(id=org.id).slug == "foo"
+
+            cache.clear()
+            with self.assertNumQueries(0):
+                first = Organization.objects.get_from_cache(id=org.id)
+                second = Organization.objects.get_many_from_cache([org.id])[0]
+            assert first.slug == second.slug == "foo"
+            assert first is not second
+
+            org.update(name="renamed")
+            cache.clear()
+            with self.assertNumQueries(1):
+                assert Organization.objects.get_from_cache(id=org.id).name == "renamed"
+
+    def test_process_cache_delete(self):
+        org = self.create_organization(slug="foo")
+
+        with self.settings(SENTRY_MODEL_CACHE_LOCAL_TTL=60):
+            Organization.objects.get_from_cache(id=org.id)
+            org.delete()
+            with self.assertRaises(Organization.DoesNotExist):
+                Organization.objects.get_from_cache(id=org.id)
+
+
+class BulkGetFromCacheTest(TestCase):
+    def test_mixed_models(self):
+        org = self.create_organization()
+        project = self.create_project(organization=org)
+        cache.clear()
+
+        lookups = [(Organization, org.id), (Project, project.id), (Organization, org.id)]
+        with self.assertNumQueries(2):
+            results = bulk_get_from_cache(lookups)
+        assert results == {(Organization, org.id): org, (Project, project.id): project}
+
+        with self.assertNumQueries(0):
+            assert bulk_get_from_cache(lookups) == results
+
+        with self.assertNumQueries(1):
+            assert bulk_get_from_cache([(Project, project.id + 1000)]) == {}
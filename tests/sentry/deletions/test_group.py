@@ -15,6 +15,7 @@ from sentry.models import (
 )
 from sentry import nodestore
 from sentry.deletions.defaults.group import EventDataDeletionTask
+from sentry.event_manager import _find_hashes_many
 from sentry.eventstore.models import Event
 from sentry.tasks.deletion import delete_groups
 from sentry.testutils import SnubaTestCase, TestCase
@@ -101,6 +102,18 @@ class DeleteGroupTest(TestCase, SnubaTestCase):
         assert not nodestore.get(self.node_id2)
         assert nodestore.get(self.node_id3), "Does not remove from second group"
 
+    def test_invalidates_group_hash_cache(self):
+        group = self.event.group
+        hash = GroupHash.objects.filter(group_id=group.id).values_list("hash", flat=True)[0]
+        [[group_hash]] = _find_hashes_many(self.project, [[hash]])
+        assert group_hash.group_id == group.id
+
+        with self.tasks():
+            delete_groups(object_ids=[group.id])
+
+        [[group_hash]] = _find_hashes_many(self.project, [[hash]])
+        assert group_hash.group_id is None
+
     @mock.patch("os.environ.get")
     @mock.patch("sentry.nodestore.delete_multi")
     def test_cleanup(self, nodestore_delete_multi, os_environ):
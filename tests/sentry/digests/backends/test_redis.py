@@ -154,3 +154,22 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_add_many(self):
+        backend = RedisBackend()
+
+        record_1 = Record("record:1", "value", time.time())
+        record_2 = Record("record:2", "value", time.time())
+        record_3 = Record("record:3", "value", time.time())
+
+        # Only the first record of each timeline makes it ready for immediate
+        # digestion, just like with separate calls to `add`.
+        assert backend.add_many(
+            [("timeline:1", record_1), ("timeline:1", record_2), ("timeline:2", record_3)]
+        ) == [True, False, True]
+
+        with backend.digest("timeline:1", 0) as records:
+            assert set(records) == set([record_1, record_2])
+
+        with backend.digest("timeline:2", 0) as records:
+            assert set(records) == set([record_3])
@@ -16,7 +16,14 @@ from sentry import nodestore
 from sentry.app import tsdb
 from sentry.constants import MAX_VERSION_LENGTH
 from sentry.eventstore.models import Event
-from sentry.event_manager import HashDiscarded, EventManager, EventUser
+from sentry.event_manager import (
+    HashDiscarded,
+    EventManager,
+    EventUser,
+    _find_hashes_many,
+    save_error_events,
+    save_many,
+)
 from sentry.grouping.utils import hash_from_values
 from sentry.models import (
     Activity,
@@ -1320,3 +1327,105 @@ class ReleaseIssueTest(TestCase):
             last_seen=self.timestamp + 100,
             first_seen=self.timestamp + 100,
         )
+
+
+class SaveErrorEventsTest(TestCase):
+    def make_job(self, **kwargs):
+        manager = EventManager(make_event(**kwargs))
+        manager.normalize()
+        return {"data": manager.get_data(), "project_id": self.project.id, "start_time": time()}
+
+    def test_groups_batch(self):
+        jobs = [
+            self.make_job(fingerprint=["a"], environment="production", release="1.0"),
+            self.make_job(fingerprint=["a"], environment="production", release="1.0"),
+            self.make_job(fingerprint=["b"], environment="production"),
+        ]
+        saved_jobs = save_error_events(jobs, {self.project.id: self.project})
+
+        assert saved_jobs == jobs
+        event1, event2, event3 = [job["event"] for job in jobs]
+        assert event1.group_id == event2.group_id
+        assert event1.group_id != event3.group_id
+
+        assert [job["is_new"] for job in jobs] == [True, False, True]
+        assert [job["is_new_group_environment"] for job in jobs] == [True, False, True]
+        assert jobs[0]["grouprelease"].id == jobs[1]["grouprelease"].id
+        assert GroupEnvironment.objects.filter(group_id=event1.group_id).count() == 1
+        assert GroupRelease.objects.filter(group_id=event1.group_id).count() == 1
+
+        for event in (event1, event2, event3):
+            assert nodestore.get(Event.generate_node_id(self.project.id, event.event_id))
+
+    def test_save_many(self):
+        other_project = self.create_project()
+        jobs = [
+            self.make_job(fingerprint=["a"]),
+            dict(self.make_job(fingerprint=["a"]), project_id=other_project.id),
+            dict(self.make_job(fingerprint=["a"]), project_id=other_project.id + 1000),
+        ]
+
+        saved_jobs = save_many(jobs)
+
+        assert saved_jobs == jobs[:2]
+        event1, event2 = [job["event"] for job in saved_jobs]
+        assert event1.project_id == self.project.id
+        assert event2.project_id == other_project.id
+        assert event1.group_id != event2.group_id
+
+    def test_group_release_seen_range(self):
+        now = time()
+        jobs = [
+            self.make_job(fingerprint=["a"], release="1.0", timestamp=now - 600),
+            self.make_job(fingerprint=["a"], release="1.0", timestamp=now - 60),
+        ]
+        save_error_events(jobs, {self.project.id: self.project})
+
+        grouprelease = GroupRelease.objects.get(id=jobs[0]["grouprelease"].id)
+        assert grouprelease.first_seen == jobs[0]["event"].datetime
+        assert grouprelease.last_seen == jobs[1]["event"].datetime
+
+    def test_skips_discarded_hashes(self):
+        event = self.store_event(data=make_event(fingerprint=["a"]), project_id=self.project.id)
+        group = event.group
+        tombstone = GroupTombstone.objects.create(
+            project_id=group.project_id,
+            level=group.level,
+            message=group.message,
+            culprit=group.culprit,
+            data=group.data,
+            previous_group_id=group.id,
+        )
+        GroupHash.objects.filter(group=group).update(group=None, group_tombstone_id=tombstone.id)
+
+        discarded_job = self.make_job(fingerprint=["a"])
+        saved_job = self.make_job(fingerprint=["b"])
+        saved_jobs = save_error_events([discarded_job, saved_job], {self.project.id: self.project})
+
+        assert saved_jobs == [saved_job]
+        assert isinstance(discarded_job["hash_discarded"], HashDiscarded)
+        assert saved_job["event"].group_id is not None
+
+
+class FindHashesManyTest(TestCase):
+    def test_resolves_hash_lists(self):
+        hash_lists = [["a" * 32, "b" * 32], ["b" * 32, "c" * 32]]
+        group_hashes = _find_hashes_many(self.project, hash_lists)
+
+        assert [[h.hash for h in hashes] for hashes in group_hashes] == hash_lists
+        assert group_hashes[0][1] is group_hashes[1][0]
+        assert GroupHash.objects.filter(project=self.project).count() == 3
+
+    def test_caches_group_assignments(self):
+        event = self.store_event(data=make_event(fingerprint=["a"]), project_id=self.project.id)
+        hash = GroupHash.objects.get(group_id=event.group_id).hash
+
+        with self.assertNumQueries(0):
+            [[group_hash]] = _find_hashes_many(self.project, [[hash]])
+        assert group_hash.group_id == event.group_id
+
+        GroupHash.invalidate_cache(self.project.id)
+
+        with self.assertNumQueries(1):
+            [[group_hash]] = _find_hashes_many(self.project, [[hash]])
+        assert group_hash.group_id == event.group_id
@@ -199,3 +199,65 @@ def test_package_matching():
     assert not bool(
         bundled_rule.get_matching_frame_actions({"package": "/usr/lib/linux-gate.so"}, "native")
     )
+
+
+def test_apply_modifications_to_mixed_frames():
+    enhancement = Enhancements.from_config_string(
+        """
+        family:native function:std::*                  -app
+        family:javascript path:**/vendor/**            -app
+        function:my_app::*                             +app
+        app:no function:my_app::internal::*            +app
+    """
+    )
+
+    frames = [
+        {"function": "std::panicking::begin_panic", "platform": "native"},
+        {"function": "my_app::internal::run", "platform": "native", "in_app": False},
+        {"function": "std_helpers::run", "platform": "native"},
+        {"abs_path": "http://example.com/vendor/react.js", "platform": "javascript"},
+        {"abs_path": "http://example.com/app.js", "platform": "javascript"},
+    ]
+    enhancement.apply_modifications_to_frame(frames, "native")
+    assert [frame.get("in_app") for frame in frames] == [False, True, None, False, None]
+
+    # Frames of a single family only go through the rules of that family.
+    frames = [{"function": "std::mem::swap"}, {"function": "my_app::main"}]
+    enhancement.apply_modifications_to_frame(frames, "native")
+    assert [frame.get("in_app") for frame in frames] == [False, True]
+
+    frames = [{"function": "std::mem::swap", "abs_path": "http://example.com/vendor/x.js"}]
+    enhancement.apply_modifications_to_frame(frames, "javascript")
+    assert frames[0]["in_app"] is False
+
+
+def test_literal_prefix_matching():
+    enhancement = Enhancements.from_config_string(
+        """
+        module:core::*                   -app
+        function:*::unwrap               -app
+        function:[a-z]*::run             +app
+    """
+    )
+
+    frames = [
+        {"module": "core::option", "function": "x"},
+        {"module": "alloc::vec", "function": "core::option::Option::unwrap"},
+        {"module": "corelib", "function": "main::run"},
+        {"module": "corelib", "function": "Main::run"},
+    ]
+    enhancement.apply_modifications_to_frame(frames, "native")
+    assert [frame.get("in_app") for frame in frames] == [False, False, True, None]
+
+
+def test_loads_is_cached():
+    enhancement = Enhancements.from_config_string(
+        """
+        function:foo                     -app
+    """,
+        bases=["common:v1"],
+    )
+    dumped = enhancement.dumps()
+
+    assert Enhancements.loads(dumped) is Enhancements.loads(dumped)
+    assert Enhancements.loads(dumped).dumps() == dumped
@@ -88,3 +88,42 @@ def test_event_hash_variant(insta_snapshot, testcase):
             "variants": {k: dump_variant(v) for (k, v) in evt.get_grouping_variants().items()},
         }
     )
+
+
+def test_indexed_rule_evaluation():
+    rules = FingerprintingRules.from_config_string(
+        """
+type:DatabaseUnavailable                        -> DatabaseUnavailable
+function:assertion_failed module:foo            -> AssertionFailed, foo
+type:ValueError function:handle_*               -> ValueError, handler
+type:ValueError module:foo                      -> ValueError, foo
+message:"*timed out*"                           -> timeout
+"""
+    )
+    event = {
+        "exception": {
+            "values": [
+                {
+                    "type": "ValueError",
+                    "value": "Request timed out",
+                    "stacktrace": {
+                        "frames": [
+                            {"function": "assertion_failed", "module": "bar"},
+                            {"function": "run", "module": "foo"},
+                        ]
+                    },
+                }
+            ]
+        },
+        "logentry": {"formatted": "Request timed out"},
+    }
+
+    # All matchers of a rule on the same interface have to match one frame
+    assert rules.get_fingerprint_values_for_event(event) == ["ValueError", "foo"]
+
+    event["exception"]["values"][0]["type"] = "TypeError"
+    assert rules.get_fingerprint_values_for_event(event) == ["timeout"]
+
+    event["exception"]["values"][0]["stacktrace"]["frames"][0]["function"] = "handle_request"
+    event["exception"]["values"][0]["type"] = "ValueError"
+    assert rules.get_fingerprint_values_for_event(event) == ["ValueError", "handler"]
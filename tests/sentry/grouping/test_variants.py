@@ -3,6 +3,9 @@ from __future__ import absolute_import, print_function
 import os
 import json
 import pytest
+import six
+
+from sentry.utils.compat import mock
 
 from sentry import eventstore
 from sentry.stacktraces.processing import normalize_stacktraces_for_grouping
@@ -111,3 +114,45 @@ def test_event_hash_variant(insta_snapshot, config_name, test_name, log):
     assert evt.get_grouping_config() == grouping_config
 
     insta_snapshot(output)
+
+
+def test_grouping_variants_are_cached():
+    from sentry.grouping import api
+
+    def make_event(function):
+        data = {
+            "platform": "python",
+            "exception": {
+                "values": [
+                    {
+                        "type": "ValueError",
+                        "stacktrace": {
+                            "frames": [
+                                {"function": "main", "module": "app", "in_app": True},
+                                {"function": function, "module": "app", "in_app": True},
+                            ]
+                        },
+                    }
+                ]
+            },
+        }
+        mgr = EventManager(data=data)
+        mgr.normalize()
+        return eventstore.create_event(data=mgr.get_data())
+
+    api._variant_cache.clear()
+    calculate = api._get_calculated_grouping_variants_for_event
+    with mock.patch.object(
+        api, "_get_calculated_grouping_variants_for_event", side_effect=calculate
+    ) as calculate_mock:
+        variants = make_event("handler").get_grouping_variants()
+        cached_variants = make_event("handler").get_grouping_variants()
+        assert calculate_mock.call_count == 1
+        assert sorted(variants) == sorted(cached_variants)
+        for key, variant in six.iteritems(variants):
+            assert cached_variants[key].get_hash() == variant.get_hash()
+            assert cached_variants[key].as_dict() == variant.as_dict()
+
+        other_variants = make_event("other_handler").get_grouping_variants()
+        assert calculate_mock.call_count == 2
+        assert other_variants["app"].get_hash() != variants["app"].get_hash()
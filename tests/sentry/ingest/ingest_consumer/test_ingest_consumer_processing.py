@@ -7,11 +7,13 @@ import time
 from sentry.utils import json
 from sentry.ingest.ingest_consumer import (
     process_event,
+    process_events_batch,
     process_attachment_chunk,
     process_individual_attachment,
     process_userreport,
 )
 from sentry.event_manager import EventManager
+from sentry.eventstore.processing import event_processing_store
 from sentry.models import EventAttachment, UserReport, EventUser
 
 
@@ -321,3 +323,44 @@ def test_individual_attachments_missing_chunks(default_project, factories, monke
     )
 
     assert not attachments
+
+
+@pytest.mark.django_db
+def test_process_events_batch(default_project, task_runner, preprocess_event):
+    payloads = [get_normalized_event({"message": "hello world"}, default_project) for _ in range(2)]
+    project_id = default_project.id
+    start_time = time.time() - 3600
+
+    messages = [
+        {
+            "payload": json.dumps(payload),
+            "start_time": start_time,
+            "event_id": payload["event_id"],
+            "project_id": project_id,
+            "remote_addr": "127.0.0.1",
+        }
+        for payload in payloads
+    ]
+
+    # The second batch contains the first event again, which must be dropped
+    process_events_batch(messages, projects={default_project.id: default_project})
+    process_events_batch(messages[:1], projects={default_project.id: default_project})
+
+    assert sorted(preprocess_event, key=lambda kwargs: kwargs["event_id"]) == [
+        {
+            "cache_key": u"e:{event_id}:{project_id}".format(
+                event_id=payload["event_id"], project_id=project_id
+            ),
+            "data": payload,
+            "event_id": payload["event_id"],
+            "project": default_project,
+            "start_time": start_time,
+        }
+        for payload in sorted(payloads, key=lambda payload: payload["event_id"])
+    ]
+
+    for payload in payloads:
+        cache_key = u"e:{event_id}:{project_id}".format(
+            event_id=payload["event_id"], project_id=project_id
+        )
+        assert event_processing_store.get(cache_key) == payload
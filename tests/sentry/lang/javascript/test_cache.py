@@ -1,6 +1,6 @@
 from __future__ import absolute_import
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import SourceCache, get_source_view, get_sourcemap_view
 from unittest import TestCase
 
 
@@ -38,3 +38,24 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == u"foobar"
+
+
+class SharedViewCacheTest(TestCase):
+    def test_source_views_are_shared(self):
+        first = SourceCache()
+        second = SourceCache()
+
+        first.add("http://example.com/foo.js", b"foo\nbar")
+        second.add("http://example.com/bar.js", b"foo\nbar")
+        assert first.get("http://example.com/foo.js") is second.get("http://example.com/bar.js")
+
+        second.add("http://example.com/baz.js", b"foo\nbaz")
+        assert second.get("http://example.com/baz.js")[1] == u"baz"
+        assert get_source_view(b"foo\nbaz") is second.get("http://example.com/baz.js")
+
+    def test_sourcemap_views_are_shared(self):
+        sourcemap = b'{"version":3,"sources":["foo.js"],"names":[],"mappings":"AAAA"}'
+
+        view = get_sourcemap_view(sourcemap)
+        assert get_sourcemap_view(sourcemap) is view
+        assert get_sourcemap_view(sourcemap.replace(b"foo.js", b"bar.js")) is not view
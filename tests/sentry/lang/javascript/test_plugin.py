@@ -177,6 +177,7 @@ class JavascriptIntegrationTest(SnubaTestCase):
             release=None,
             dist=None,
             allow_scraping=True,
+            release_files={},
         )
 
         exception = event.interfaces["exception"]
@@ -235,6 +236,7 @@ class JavascriptIntegrationTest(SnubaTestCase):
             release=None,
             dist=None,
             allow_scraping=True,
+            release_files={},
         )
 
         exception = event.interfaces["exception"]
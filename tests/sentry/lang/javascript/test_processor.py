@@ -20,6 +20,7 @@ from sentry.lang.javascript.processor import (
     generate_module,
     trim_line,
     fetch_release_file,
+    fetch_release_files,
     UnparseableSourcemap,
     get_max_age,
     CACHE_CONTROL_MAX,
@@ -214,6 +215,52 @@ class FetchReleaseFileTest(TestCase):
 
         assert result == new_result
 
+    def test_fetch_release_files(self):
+        project = self.project
+        release = Release.objects.create(organization_id=project.organization_id, version="abc")
+        release.add_project(project)
+
+        for name, body in (("~/foo.min.js", b"foo"), ("bar.min.js", b"bar")):
+            file = File.objects.create(
+                name=name,
+                type="release.file",
+                headers={"Content-Type": "application/json; charset=utf-8"},
+            )
+            file.putfile(six.BytesIO(body))
+            ReleaseFile.objects.create(
+                name=name, release=release, organization_id=project.organization_id, file=file
+            )
+
+        filenames = ["http://example.com/foo.min.js", "bar.min.js", "missing.min.js"]
+        with self.assertNumQueries(1, using="default"), patch(
+            "sentry.models.ReleaseFile.cache.getfile", side_effect=lambda rf: six.BytesIO(b"x")
+        ):
+            assert fetch_release_files([], release) == {}
+            results = fetch_release_files(filenames, release)
+
+        assert results == {
+            "http://example.com/foo.min.js": http.UrlResult(
+                "http://example.com/foo.min.js",
+                {"content-type": "application/json; charset=utf-8"},
+                b"x",
+                200,
+                "utf-8",
+            ),
+            "bar.min.js": http.UrlResult(
+                "bar.min.js",
+                {"content-type": "application/json; charset=utf-8"},
+                b"x",
+                200,
+                "utf-8",
+            ),
+            "missing.min.js": None,
+        }
+
+        # Everything, including the missing file, comes from the cache now
+        with self.assertNumQueries(0):
+            assert fetch_release_files(filenames, release) == results
+        assert fetch_release_file("bar.min.js", release) == results["bar.min.js"]
+
 
 class FetchFileTest(TestCase):
     @responses.activate
@@ -891,6 +938,31 @@ class CacheSourceTest(TestCase):
         assert processor.cache.get(abs_path)
         assert len(processor.cache.get_errors(abs_path)) == 0
 
+    @patch("sentry.lang.javascript.processor.fetch_release_files")
+    def test_populate_source_cache_prefetches_release_files(self, mock_fetch_release_files):
+        project = self.create_project()
+        release = self.create_release(project=project, version="12.31.12")
+        mock_fetch_release_files.return_value = {
+            "app:///foo.js": http.UrlResult("app:///foo.js", {}, b"foo", 200, None),
+            "app:///bar.js": None,
+        }
+
+        processor = JavaScriptStacktraceProcessor(
+            data={"release": release.version}, stacktrace_infos=None, project=project
+        )
+        processor.release = release
+        processor.populate_source_cache(
+            [{"abs_path": "app:///foo.js"}, {"abs_path": "app:///bar.js"}, {"abs_path": None}]
+        )
+
+        assert mock_fetch_release_files.call_count == 1
+        args, _ = mock_fetch_release_files.call_args
+        assert sorted(args[0]) == ["app:///bar.js", "app:///foo.js"]
+        assert processor.cache.get("app:///foo.js")[0] == u"foo"
+        assert processor.cache.get_errors("app:///bar.js") == [
+            {"url": "app:///bar.js", "type": "js_no_source"}
+        ]
+
     @patch("sentry.lang.javascript.processor.discover_sourcemap")
     def test_node_modules_file_with_source_but_no_map_records_error(self, mock_discover_sourcemap):
         """
@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 
 import pytest
+import responses
 
-from sentry.lang.native.symbolicator import get_sources_for_project
+from sentry.lang.native.symbolicator import Symbolicator, get_sources_for_project
+from sentry.tasks.store import RetrySymbolication
 from sentry.testutils.helpers import Feature
 from sentry.utils.compat import map
 
@@ -103,3 +105,61 @@ def test_sources_custom_disabled(default_project):
 
     source_ids = map(lambda s: s["id"], sources)
     assert source_ids == ["sentry:project"]
+
+
+STACKTRACES = [{"registers": {}, "frames": [{"instruction_addr": "0x1000"}]}]
+MODULES = [{"type": "macho", "debug_id": "502fc0a5-1ec1-3e47-9998-684fa139dca7"}]
+
+
+@pytest.mark.django_db
+@responses.activate
+def test_shared_session(default_project):
+    responses.add(responses.POST, "http://localhost:3021/symbolicate", json={"status": "completed"})
+
+    first = Symbolicator(project=default_project, event_id="a" * 32)
+    second = Symbolicator(project=default_project, event_id="b" * 32)
+
+    sessions = []
+    for symbolicator in (first, second):
+        with symbolicator.sess:
+            sessions.append(symbolicator.sess.session)
+
+    assert sessions[0] is sessions[1]
+    assert first.process_payload(STACKTRACES, MODULES) == {"status": "completed"}
+    assert len(responses.calls) == 1
+
+
+@pytest.mark.django_db
+@responses.activate
+def test_coalesce_requests(default_project, settings):
+    settings.SYMBOLICATOR_COALESCE_REQUESTS = True
+
+    completed = {"status": "completed", "stacktraces": [], "modules": []}
+    responses.add(
+        responses.POST,
+        "http://localhost:3021/symbolicate",
+        json={"status": "pending", "request_id": "req1", "retry_after": 1},
+    )
+    responses.add(responses.GET, "http://localhost:3021/requests/req1", json=completed)
+
+    owner = Symbolicator(project=default_project, event_id="a" * 32)
+    waiter = Symbolicator(project=default_project, event_id="b" * 32)
+
+    with pytest.raises(RetrySymbolication):
+        owner.process_payload(STACKTRACES, MODULES)
+
+    # The identical request of the second event waits for the first one
+    # without contacting symbolicator.
+    with pytest.raises(RetrySymbolication):
+        waiter.process_payload(STACKTRACES, MODULES)
+    assert len(responses.calls) == 1
+
+    assert owner.process_payload(STACKTRACES, MODULES) == completed
+    assert waiter.process_payload(STACKTRACES, MODULES) == completed
+    assert len(responses.calls) == 2
+
+    # A different request is sent on its own.
+    other = Symbolicator(project=default_project, event_id="c" * 32)
+    with pytest.raises(RetrySymbolication):
+        other.process_payload(STACKTRACES, [])
+    assert len(responses.calls) == 3
@@ -47,3 +47,21 @@ class GetOrCreateTest(TestCase):
 
         assert grouprelease.first_seen == datetime
         assert grouprelease.last_seen == datetime_new
+
+    def test_last_seen(self):
+        project = self.create_project()
+        group = self.create_group(project=project)
+        release = Release.objects.create(version="abc", organization_id=project.organization_id)
+        release.add_project(project)
+        env = Environment.objects.create(
+            project_id=project.id, organization_id=project.organization_id, name="prod"
+        )
+        first_seen = timezone.now() - timedelta(minutes=10)
+        last_seen = timezone.now()
+
+        grouprelease = GroupRelease.get_or_create(
+            group=group, release=release, environment=env, datetime=first_seen, last_seen=last_seen
+        )
+
+        assert grouprelease.first_seen == first_seen
+        assert grouprelease.last_seen == last_seen
@@ -32,3 +32,17 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.create(project=self.project, key="foo", value="bar")
         result = ProjectOption.objects.get_value_bulk([self.project], "foo")
         assert result == {self.project: "bar"}
+
+    def test_get_all_values_bulk(self):
+        other_project = self.create_project()
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+
+        result = ProjectOption.objects.get_all_values_bulk([self.project, other_project.id])
+        assert result == {self.project.id: {"foo": "bar"}, other_project.id: {}}
+
+        # Values are now served from the cache.
+        ProjectOption.objects.clear_local_cache()
+        with self.assertNumQueries(0):
+            result = ProjectOption.objects.get_all_values_bulk([self.project, other_project])
+        assert result == {self.project.id: {"foo": "bar"}, other_project.id: {}}
+        assert ProjectOption.objects.get_value(self.project, "foo") == "bar"
@@ -4,7 +4,8 @@ from sentry.testutils import TestCase
 from sentry.api.fields.actor import Actor
 from sentry.models import ProjectOwnership, User, Team
 from sentry.models.projectownership import resolve_actors
-from sentry.ownership.grammar import Rule, Owner, Matcher, dump_schema
+from sentry.ownership.grammar import Rule, Owner, Matcher, dump_schema, match_rules
+from sentry.utils.compat import mock
 from sentry.utils.cache import cache
 
 
@@ -79,6 +80,37 @@ class ProjectOwnershipTestCase(TestCase):
             ([Actor(self.team.id, Team), Actor(self.user.id, User)], [rule_a, rule_b]),
         )
 
+    def test_get_owners_and_autoassign_owner_share_evaluation(self):
+        rule_a = Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)])
+        rule_b = Rule(Matcher("path", "src/*"), [Owner("user", self.user.email)])
+
+        ProjectOwnership.objects.create(
+            project_id=self.project.id,
+            schema=dump_schema([rule_a, rule_b]),
+            fallthrough=True,
+            auto_assignment=True,
+        )
+        data = {"event_id": "a" * 32, "stacktrace": {"frames": [{"filename": "src/foo.py"}]}}
+
+        with mock.patch(
+            "sentry.models.projectownership.match_rules", side_effect=match_rules
+        ) as match_rules_mock:
+            self.assert_ownership_equals(
+                ProjectOwnership.get_owners(self.project.id, data),
+                ([Actor(self.team.id, Team), Actor(self.user.id, User)], [rule_a, rule_b]),
+            )
+            # The longer pattern of rule_b wins
+            assert ProjectOwnership.get_autoassign_owner(self.project.id, data) == self.user
+            assert match_rules_mock.call_count == 1
+
+            # Other events are evaluated on their own.
+            data = {"event_id": "b" * 32, "stacktrace": {"frames": [{"filename": "foo.py"}]}}
+            self.assert_ownership_equals(
+                ProjectOwnership.get_owners(self.project.id, data),
+                ([Actor(self.team.id, Team)], [rule_a]),
+            )
+            assert match_rules_mock.call_count == 2
+
 
 class ResolveActorsTestCase(TestCase):
     def test_no_actors(self):
@@ -2,10 +2,14 @@ from __future__ import absolute_import
 
 import pytest
 
+from sentry.nodestore import codecs
 from sentry.nodestore.bigtable.backend import BigtableNodeStorage
 from sentry.testutils import TestCase
+from sentry.utils import json
 from sentry.utils.compat import mock
 
+from tests.sentry.nodestore.test_codecs import _make_event
+
 
 @pytest.mark.skip(reason="Bigtable is not available in CI")
 class BigtableNodeStorageTest(TestCase):
@@ -106,3 +110,55 @@ class BigtableNodeStorageTest(TestCase):
             self.ns.get("node_4")
             self.ns.get("node_4")
             assert mock_read_row.call_count == 2
+
+
+class BigtableNodeStorageCodecTest(TestCase):
+    def write(self, ns, data):
+        connection = mock.Mock()
+        with mock.patch("sentry.nodestore.bigtable.backend.get_connection") as get_connection:
+            get_connection.return_value = connection
+            ns.encode_row("node_id", data)
+
+        columns = {}
+        for call in connection.row.return_value.set_cell.call_args_list:
+            family, column, value = call[0]
+            cell = mock.Mock(value=value, timestamp=call[1]["timestamp"])
+            columns.setdefault(family, {})[column] = [cell]
+        return mock.Mock(cells=columns)
+
+    def test_codec_roundtrip(self):
+        data = {"platform": "python", "message": "foo" * 100}
+        for codec in ("zlib", "zstd", "zstd-dictionary"):
+            ns = BigtableNodeStorage(codec=codec)
+            row = self.write(ns, data)
+            flags = row.cells[ns.column_family][ns.flags_column][0].value
+            assert flags == b"\x02"
+            assert codecs.is_encoded(row.cells[ns.column_family][ns.data_column][0].value)
+            assert ns.decode_row(row) == data
+
+    def test_read_rows_written_without_codec(self):
+        data = {"message": "foo" * 100}
+        raw = self.write(BigtableNodeStorage(), data)
+        compressed = self.write(BigtableNodeStorage(compression=True), data)
+
+        ns = BigtableNodeStorage(codec="zstd")
+        assert ns.decode_row(raw) == data
+        assert ns.decode_row(compressed) == data
+
+    def test_read_rows_written_with_other_codec(self):
+        samples = [_make_event(i, "python") for i in range(1000)]
+        dictionaries = codecs.train_dictionaries({"python": samples}, dict_size=16 * 1024)
+        data = json.loads(_make_event(1001, "python"))
+        row = self.write(
+            BigtableNodeStorage(
+                codec="zstd-dictionary", codec_options={"dictionaries": dictionaries}
+            ),
+            data,
+        )
+
+        # The dictionary is needed to read the row after switching codecs
+        with pytest.raises(ValueError):
+            BigtableNodeStorage(codec="zstd").decode_row(row)
+
+        ns = BigtableNodeStorage(codec="zstd", decode_dictionaries=dictionaries.values())
+        assert ns.decode_row(row) == data
@@ -124,10 +124,29 @@ class DjangoNodeStorageTest(TestCase):
             assert self.ns.get(node_1[0]) == new_value
             assert mock_get.call_count == 0
 
-        # Missing rows are never cached
+        # Missing rows are cached as such until they are set
         assert self.ns.get("node_4") is None
         with mock.patch.object(Node.objects, "get") as mock_get:
-            mock_get.side_effect = Node.DoesNotExist
-            self.ns.get("node_4")
-            self.ns.get("node_4")
-            assert mock_get.call_count == 2
+            assert self.ns.get("node_4") is None
+            assert self.ns.get_multi(["node_4"]) == {}
+            assert mock_get.call_count == 0
+
+        self.ns.set("node_4", {"foo": "d"})
+        assert self.ns.get("node_4") == {"foo": "d"}
+
+    def test_local_cache(self):
+        node = Node.objects.create(id="a" * 32, data={"foo": "a"})
+        assert self.ns.get(node.id) == node.data
+
+        # The process local cache answers without the shared cache
+        self.ns.cache.clear()
+        with mock.patch.object(Node.objects, "get") as mock_get:
+            assert self.ns.get(node.id) == node.data
+            assert mock_get.call_count == 0
+
+        # Local copies are not shared with callers
+        self.ns.get(node.id)["foo"] = "b"
+        assert self.ns.get(node.id) == {"foo": "a"}
+
+        self.ns.delete(node.id)
+        assert self.ns.get(node.id) is None
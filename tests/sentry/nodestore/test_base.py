@@ -2,8 +2,11 @@
 
 from __future__ import absolute_import
 
+import threading
+
 from sentry.nodestore.base import NodeStorage
 from sentry.testutils import TestCase
+from sentry.utils.compat import mock
 
 
 class NodeStorageTest(TestCase):
@@ -13,3 +16,56 @@ class NodeStorageTest(TestCase):
     def test_generate_id(self):
         result = self.ns.generate_id()
         assert result
+
+    def test_get_multi_cached(self):
+        fetch = mock.Mock(return_value={"a" * 32: {"foo": "a"}})
+
+        assert self.ns._get_multi_cached(["a" * 32, "b" * 32], fetch) == {
+            "a" * 32: {"foo": "a"},
+            "b" * 32: None,
+        }
+        assert self.ns._get_multi_cached(["a" * 32, "b" * 32], fetch) == {
+            "a" * 32: {"foo": "a"},
+            "b" * 32: None,
+        }
+        assert fetch.call_count == 1
+
+        self.ns._delete_cache_item("a" * 32)
+        self.ns._get_multi_cached(["a" * 32, "b" * 32], fetch)
+        assert fetch.call_count == 2
+        assert fetch.call_args[0][0] == ["a" * 32]
+
+    def test_get_multi_cached_single_flight(self):
+        node_id = "a" * 32
+        fetch_started = threading.Event()
+        waiting = threading.Event()
+        fetched_ids = []
+
+        def fetch(id_list):
+            fetched_ids.extend(id_list)
+            fetch_started.set()
+            assert waiting.wait(5)
+            return {node_id: {"foo": "a"}}
+
+        def incr(key, **kwargs):
+            if key == "nodestore.inflight.wait":
+                waiting.set()
+
+        results = []
+
+        def get():
+            results.append(self.ns._get_multi_cached([node_id], fetch))
+
+        with mock.patch("sentry.nodestore.base.metrics.incr", side_effect=incr):
+            thread = threading.Thread(target=get)
+            thread.start()
+            assert fetch_started.wait(5)
+
+            # This read waits for the fetch of the first thread
+            waiter = threading.Thread(target=get)
+            waiter.start()
+            thread.join()
+            waiter.join()
+
+        assert fetched_ids == [node_id]
+        assert results == [{node_id: {"foo": "a"}}] * 2
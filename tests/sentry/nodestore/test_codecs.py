@@ -0,0 +1,110 @@
+from __future__ import absolute_import
+
+import pytest
+
+from sentry.nodestore import codecs
+from sentry.utils import json
+
+
+def _make_event(i, platform):
+    return json.dumps(
+        {
+            "event_id": "%032x" % i,
+            "platform": platform,
+            "message": "Something went wrong in request %d" % i,
+            "tags": [["environment", "production"], ["server_name", "web-%d" % (i % 7)]],
+            "exception": {
+                "values": [
+                    {
+                        "type": "ValueError",
+                        "value": "invalid literal for int() with base 10: '%d'" % i,
+                        "stacktrace": {
+                            "frames": [
+                                {
+                                    "filename": "app/views.py",
+                                    "function": "handler_%d" % (i % 13),
+                                    "lineno": i % 211,
+                                    "in_app": True,
+                                }
+                            ]
+                        },
+                    }
+                ]
+            },
+        }
+    ).encode("utf-8")
+
+
+@pytest.mark.parametrize("name", ["zlib", "zstd", "zstd-dictionary"])
+def test_roundtrip(name):
+    codec = codecs.get_codec(name)
+    data = _make_event(1, "python")
+    encoded = codecs.encode(codec, data, platform="python")
+    assert codecs.is_encoded(encoded)
+    assert codecs.decode(encoded, codec) == data
+    # Decoding works without knowing the codec that was used
+    assert codecs.decode(encoded) == data
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        codecs.get_codec("lzma")
+
+
+def test_decode_plain_data():
+    assert not codecs.is_encoded(b'{"foo":"bar"}')
+    with pytest.raises(ValueError):
+        codecs.decode(b'{"foo":"bar"}')
+
+
+def test_decode_with_other_codec():
+    data = _make_event(1, "python")
+    encoded = codecs.encode(codecs.get_codec("zlib"), data)
+    assert codecs.decode(encoded, codecs.get_codec("zstd")) == data
+
+
+def test_dictionary_codec():
+    samples = [_make_event(i, "python") for i in range(1000)]
+    dictionaries = codecs.train_dictionaries({"python": samples}, dict_size=16 * 1024)
+
+    codec = codecs.get_codec("zstd-dictionary", dictionaries=dictionaries)
+    data = _make_event(1001, "python")
+
+    encoded = codecs.encode(codec, data, platform="python")
+    assert codecs.decode(encoded, codec) == data
+    assert len(encoded) < len(codecs.encode(codecs.get_codec("zstd"), data))
+
+    # Platforms without a dictionary are compressed without one
+    other = _make_event(1001, "javascript")
+    assert codecs.decode(codecs.encode(codec, other, platform="javascript"), codec) == other
+
+    # Data compressed with a dictionary can't be read without it
+    with pytest.raises(ValueError):
+        codecs.decode(encoded, codecs.get_codec("zstd-dictionary"))
+
+
+def test_decode_dictionaries():
+    samples = [_make_event(i, "python") for i in range(1000)]
+    dictionaries = codecs.train_dictionaries({"python": samples}, dict_size=16 * 1024)
+
+    data = _make_event(1001, "python")
+    codec = codecs.get_codec("zstd-dictionary", dictionaries=dictionaries)
+    encoded = codecs.encode(codec, data, platform="python")
+
+    # Dictionaries stay available for decoding after switching codecs
+    decoders = codecs.get_decoders(codecs.get_codec("zstd"), dictionaries=dictionaries.values())
+    assert codecs.decode(encoded, decoders=decoders) == data
+
+    decode_only = codecs.get_codec("zstd-dictionary", decode_dictionaries=dictionaries.values())
+    assert codecs.decode(encoded, decode_only) == data
+    assert not decode_only.dictionaries_by_platform
+
+
+def test_reuses_compressors():
+    codec = codecs.get_codec("zstd")
+    assert codec._get_compressor() is codec._get_compressor()
+    assert codec._get_decompressor() is codec._get_decompressor()
+
+    data = _make_event(1, "python")
+    for _ in range(3):
+        assert codecs.decode(codecs.encode(codec, data), codec) == data
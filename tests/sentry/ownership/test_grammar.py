@@ -1,6 +1,14 @@
 from __future__ import absolute_import
 
-from sentry.ownership.grammar import Rule, Matcher, Owner, parse_rules, dump_schema, load_schema
+from sentry.ownership.grammar import (
+    Rule,
+    Matcher,
+    Owner,
+    parse_rules,
+    dump_schema,
+    load_schema,
+    match_rules,
+)
 
 fixture_data = """
 # cool stuff comment
@@ -117,3 +125,20 @@ def test_matcher_test_tags():
     assert Matcher("tags.foo", "foo_value").test(data)
     assert Matcher("tags.bar", "barval").test(data)
     assert not Matcher("tags.barz", "barval").test(data)
+
+
+def test_match_rules():
+    rule_a = Rule(Matcher("path", "*.py"), [Owner("team", "backend")])
+    rule_b = Rule(Matcher("path", "src/*"), [Owner("user", "src@example.com")])
+    rule_c = Rule(Matcher("url", "http://example.com/*"), [Owner("team", "web")])
+    rule_d = Rule(Matcher("path", "*.py"), [Owner("user", "python@example.com")])
+    rules = [rule_a, rule_b, rule_c, rule_d]
+
+    data = {
+        "request": {"url": "http://example.com/foo"},
+        "stacktrace": {"frames": [{"filename": "foo/file.py"}, {"filename": "foo/file.py"}]},
+        "exception": {"values": [{"stacktrace": {"frames": [{"abs_path": "src/other/app.js"}]}}]},
+    }
+    assert match_rules(rules, data) == [rule_a, rule_b, rule_c, rule_d]
+    assert match_rules(rules, {"stacktrace": {"frames": [{"filename": "app.js"}]}}) == []
+    assert match_rules(rules, {}) == []
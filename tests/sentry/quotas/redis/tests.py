@@ -10,7 +10,7 @@ from exam import fixture, patcher
 
 from sentry.constants import DataCategory
 from sentry.quotas.base import QuotaConfig, QuotaScope
-from sentry.quotas.redis import is_rate_limited, RedisQuota
+from sentry.quotas.redis import is_rate_limited, lease_quota, RedisQuota
 from sentry.testutils import TestCase
 from sentry.utils.redis import clusters
 from six.moves import xrange
@@ -70,6 +70,39 @@ def test_is_rate_limited_script():
     assert map(bool, is_rate_limited(client, ("orange", "apple"), (1, now + 60))) == [False]
 
 
+def test_lease_quota_script():
+    now = int(time.time())
+
+    cluster = clusters.get("default")
+    client = cluster.get_local_client(six.next(iter(cluster.hosts)))
+
+    # Both quotas grant the full lease.
+    assert map(
+        int,
+        lease_quota(client, ("foo", "r:foo", "bar", "r:bar"), (5, now + 60, 3, -1, now + 120, 3)),
+    ) == [3, 3]
+
+    # The first quota only has room for two more items, the second one is
+    # unlimited.
+    assert map(
+        int,
+        lease_quota(client, ("foo", "r:foo", "bar", "r:bar"), (5, now + 60, 3, -1, now + 120, 3)),
+    ) == [2, 3]
+
+    # The first quota is exhausted now.
+    assert map(int, lease_quota(client, ("foo", "r:foo"), (5, now + 60, 3))) == [0]
+
+    assert client.get("foo") == "5"
+    assert 59 <= client.ttl("foo") <= 60
+
+    assert client.get("bar") == "6"
+    assert 119 <= client.ttl("bar") <= 120
+
+    # Refunded items can be leased again.
+    client.set("r:foo", 1)
+    assert map(int, lease_quota(client, ("foo", "r:foo"), (5, now + 60, 3))) == [1]
+
+
 class RedisQuotaTest(TestCase):
     quota = fixture(RedisQuota)
 
@@ -261,3 +294,28 @@ class RedisQuotaTest(TestCase):
         # count for these quotas and None for the others.
         # The ``- 1`` is because we refunded once.
         assert usage == [n - 1 if q.id else None for q in quotas] + [0, 0]
+
+    def test_is_rate_limited_leased(self):
+        quota = RedisQuota(lease_size=4)
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (10, 60)
+        self.get_organization_quota.return_value = (100, 60)
+
+        with mock.patch("sentry.quotas.redis.lease_quota", wraps=lease_quota) as mock_lease:
+            results = [
+                quota.is_rate_limited(self.project, timestamp=timestamp).is_limited
+                for _ in xrange(15)
+            ]
+
+        assert results == [False] * 10 + [True] * 5
+
+        # Three leases for accepted items, and one that finds the project
+        # quota exhausted. Afterwards, items are rejected locally.
+        assert mock_lease.call_count == 4
+
+        # Leased items count as usage even if they have not been used yet.
+        usage = quota.get_usage(
+            self.project.organization_id, quota.get_quotas(self.project), timestamp=timestamp
+        )
+        assert usage == [None, 10, 12]
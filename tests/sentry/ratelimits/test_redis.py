@@ -3,6 +3,7 @@
 from __future__ import absolute_import
 
 from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.utils.compat.mock import patch
 from sentry.testutils import TestCase
 
 
@@ -17,3 +18,27 @@ class RedisRateLimiterTest(TestCase):
     def test_simple_key(self):
         assert not self.backend.is_limited("foo", 1)
         assert self.backend.is_limited("foo", 1)
+
+    def test_is_limited_many(self):
+        assert self.backend.is_limited_many([("foo", 1), ("bar", 2)]) == [False, False]
+        assert self.backend.is_limited_many([("foo", 1), ("bar", 2)]) == [True, False]
+        assert self.backend.is_limited_many([("foo", 1), ("bar", 2)]) == [True, True]
+
+    def test_sliding_window(self):
+        with patch("sentry.ratelimits.redis.time", return_value=1000.0):
+            assert self.backend.is_limited_many([("foo", 2)] * 3, window=60) == [
+                False,
+                False,
+                True,
+            ]
+
+        # Capacity comes back gradually instead of at the edge of a window.
+        with patch("sentry.ratelimits.redis.time", return_value=1030.0):
+            assert self.backend.is_limited_many([("foo", 2)] * 2, window=60) == [False, True]
+
+        with patch("sentry.ratelimits.redis.time", return_value=1090.0):
+            assert not self.backend.is_limited("foo", 2, window=60)
+
+    def test_burst_with_epoch_timestamps(self):
+        with patch("sentry.ratelimits.redis.time", return_value=1600000000.123456):
+            assert self.backend.is_limited_many([("foo", 7)] * 8, window=60) == [False] * 7 + [True]
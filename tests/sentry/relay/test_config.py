@@ -3,7 +3,7 @@ from __future__ import absolute_import
 import pytest
 
 from sentry.models import ProjectKey
-from sentry.relay.config import get_project_config
+from sentry.relay.config import get_project_config, get_project_configs
 
 PII_CONFIG = """
 {
@@ -49,3 +49,24 @@ def test_get_project_config(default_project, insta_snapshot, full):
     assert cfg.pop("organizationId") == default_project.organization.id
 
     insta_snapshot(cfg)
+
+
+@pytest.mark.django_db
+def test_get_project_configs(default_project, factories):
+    other_project = factories.create_project(organization=default_project.organization)
+    default_project.update_option("sentry:relay_pii_config", PII_CONFIG)
+    other_project.update_option("sentry:scrub_data", False)
+
+    configs = get_project_configs([default_project, other_project])
+    assert set(configs) == {default_project.id, other_project.id}
+
+    for project in (default_project, other_project):
+        keys = ProjectKey.objects.filter(project=project)
+        expected = get_project_config(project, project_keys=keys).to_dict()
+        cfg = configs[project.id].to_dict()
+
+        for key in ("lastChange", "lastFetch", "rev"):
+            cfg.pop(key)
+            expected.pop(key)
+
+        assert cfg == expected
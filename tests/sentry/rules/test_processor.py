@@ -82,3 +82,93 @@ class RuleProcessorTest(TestCase):
         )
         results = list(rp.apply())
         assert len(results) == 0
+
+    def test_skips_rules_failing_state_conditions(self):
+        Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [
+                    {"id": "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition"}
+                ],
+                "actions": [],
+            },
+        )
+        rp = RuleProcessor(
+            self.event,
+            is_new=False,
+            is_regression=False,
+            is_new_group_environment=False,
+            has_reappeared=False,
+        )
+        results = list(rp.apply())
+        assert len(results) == 1
+
+        # Only the status of the rule that could pass was created
+        assert list(
+            GroupRuleStatus.objects.filter(group=self.event.group).values_list("rule_id", flat=True)
+        ) == [self.rule.id]
+
+    def test_rule_statuses_are_loaded_in_bulk(self):
+        rules = [self.rule] + [
+            Rule.objects.create(project=self.event.project, data=self.rule.data) for _ in range(3)
+        ]
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        statuses = rp.get_rule_statuses(rules)
+        assert sorted(statuses) == sorted(rule.id for rule in rules)
+        assert GroupRuleStatus.objects.filter(group=self.event.group).count() == 4
+
+        # Cached statuses don't hit the database
+        with self.assertNumQueries(0):
+            assert rp.get_rule_statuses(rules) == statuses
+
+    def test_compiled_rules(self):
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        compiled_rules = rp.get_compiled_rules()
+        assert [c.rule for c in compiled_rules] == [self.rule]
+        assert rp.get_compiled_rules() is compiled_rules
+
+        # Changing a rule recompiles the rules of the project
+        self.rule.data["action_match"] = "any"
+        self.rule.save()
+        compiled_rules = rp.get_compiled_rules()
+        assert [c.match for c in compiled_rules] == ["any"]
+
+    def test_compile_rule_orders_state_conditions_first(self):
+        rule = Rule(
+            id=1,
+            project=self.event.project,
+            data={
+                "conditions": [
+                    {"id": "sentry.rules.conditions.level.LevelCondition"},
+                    {"id": "sentry.rules.conditions.regression_event.RegressionEventCondition"},
+                    {"id": "sentry.rules.conditions.unknown.UnknownCondition"},
+                ]
+            },
+        )
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        compiled_rule = rp.compile_rule(rule)
+        assert compiled_rule.num_state_conditions == 1
+        assert [c["id"] for _, c in compiled_rule.conditions] == [
+            "sentry.rules.conditions.regression_event.RegressionEventCondition",
+            "sentry.rules.conditions.level.LevelCondition",
+            "sentry.rules.conditions.unknown.UnknownCondition",
+        ]
+        assert compiled_rule.conditions[2][0] is None
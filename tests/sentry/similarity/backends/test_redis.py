@@ -49,3 +49,20 @@ class RedisScriptMinHashIndexBackendTestCase(MinHashIndexBackendTestMixin, TestC
 
         result = self.index.export("example", [("index", 2)], timestamp=timestamp)
         assert len(result) == 1
+
+    def test_record_many(self):
+        timestamp = int(time.time())
+        self.index.record_many(
+            [
+                ("example", "1", [("index", "hello world")], timestamp),
+                ("example", "2", [("index", "hello world"), ("index", "jello world")], timestamp),
+                ("example", "3", [], timestamp),
+            ]
+        )
+        self.index.record("example", "4", [("index", "hello world")], timestamp=timestamp)
+
+        results = self.index.compare("example", "4", [("index", 0)])
+        assert len(results) == 3
+        assert results[0] == ("1", [1.0])
+        assert results[1] == ("4", [1.0])
+        assert results[2][0] == "2"
@@ -0,0 +1,51 @@
+from __future__ import absolute_import
+
+from datetime import datetime
+
+import pytz
+
+from sentry.similarity.encoder import Encoder
+from sentry.similarity.features import FeatureSet
+from sentry.utils.compat import mock
+
+
+class TokensFeature(object):
+    def extract(self, event):
+        return event.tokens
+
+
+def make_event(project_id, group_id, tokens, minute):
+    return mock.Mock(
+        project=mock.Mock(id=project_id),
+        group=mock.Mock(id=group_id),
+        group_id=group_id,
+        tokens=tokens,
+        datetime=datetime(2020, 1, 1, 0, minute, tzinfo=pytz.utc),
+    )
+
+
+def test_record_groups_events():
+    index = mock.Mock()
+    features = FeatureSet(index, Encoder(), {"tokens": "t"}, {"tokens": TokensFeature()}, (), ())
+
+    features.record(
+        [
+            make_event(1, 10, ["a", "b"], 1),
+            make_event(2, 20, ["c"], 2),
+            make_event(1, 10, ["b", "c"], 3),
+            make_event(1, 11, [], 4),
+            make_event(2, 20, ["d"], 0),
+            make_event(1, None, ["e"], 5),
+        ]
+    )
+
+    # One request per group, recorded at the time of its latest event
+    minute = 60
+    timestamp = 1577836800
+    index.record_many.assert_called_once_with(
+        [
+            ("1", "10", [("t", [b"a", b"b"]), ("t", [b"b", b"c"])], timestamp + 3 * minute),
+            ("2", "20", [("t", [b"c"]), ("t", [b"d"])], timestamp + 2 * minute),
+            ("1", "11", [], timestamp + 4 * minute),
+        ]
+    )
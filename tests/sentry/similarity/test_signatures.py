@@ -3,6 +3,8 @@ from __future__ import absolute_import
 from collections import Counter
 from unittest import TestCase
 
+import mmh3
+
 from sentry.similarity.signatures import MinHashSignatureBuilder
 from sentry.utils.compat import map
 from sentry.utils.compat import zip
@@ -32,3 +34,24 @@ class MinHashSignatureBuilderTestCase(TestCase):
         self.assertAlmostEqual(
             similarity, estimation, delta=0.1  # totally made up constant, seems reasonable
         )
+
+    def test_build_many(self):
+        get_signature = MinHashSignatureBuilder(32, 0xFFFF)
+
+        feature_sets = [
+            set(["foo", "bar", "baz"]),
+            set(["foo", "bar"]),
+            set(["qux"]),
+        ]
+
+        # Signatures must match the ones built with one hash per feature and
+        # column, as those are already stored in the index.
+        expected = [
+            [
+                min(mmh3.hash(feature, column) % 0xFFFF for feature in features)
+                for column in range(32)
+            ]
+            for features in feature_sets
+        ]
+        assert get_signature.build_many(feature_sets) == expected
+        assert get_signature(feature_sets[0]) == expected[0]
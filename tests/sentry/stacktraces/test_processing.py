@@ -0,0 +1,48 @@
+from __future__ import absolute_import
+
+from sentry.stacktraces.processing import StacktraceProcessor, process_stacktraces
+from sentry.testutils import TestCase
+from sentry.utils.cache import cache
+from sentry.utils.compat import mock
+
+
+class UppercaseProcessor(StacktraceProcessor):
+    processed = []
+
+    def handles_frame(self, frame, stacktrace_info):
+        return True
+
+    def preprocess_frame(self, processable_frame):
+        processable_frame.set_cache_key_from_values(["upper", processable_frame["function"]])
+
+    def process_frame(self, processable_frame, processing_task):
+        function = processable_frame.cache_value
+        if function is None:
+            self.processed.append(processable_frame["function"])
+            function = processable_frame["function"].upper()
+            processable_frame.set_cache_value(function)
+        return [dict(processable_frame.frame, function=function)], None, None
+
+
+class FrameCacheTest(TestCase):
+    def process(self, functions):
+        data = {"stacktrace": {"frames": [{"function": f} for f in functions]}}
+        process_stacktraces(
+            data,
+            make_processors=lambda data, infos: [UppercaseProcessor(data, infos, self.project)],
+        )
+        return [frame["function"] for frame in data["stacktrace"]["frames"]]
+
+    def test_frame_cache(self):
+        UppercaseProcessor.processed = []
+
+        with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            assert self.process(["foo", "bar", "foo"]) == ["FOO", "BAR", "FOO"]
+            assert set_many.call_count == 1
+        assert sorted(UppercaseProcessor.processed) == ["bar", "foo", "foo"]
+
+        UppercaseProcessor.processed = []
+        with mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            assert self.process(["foo", "bar", "baz"]) == ["FOO", "BAR", "BAZ"]
+            assert get_many.call_count == 1
+        assert UppercaseProcessor.processed == ["baz"]
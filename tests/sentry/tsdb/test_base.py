@@ -7,7 +7,7 @@ import pytz
 from datetime import datetime, timedelta
 
 from unittest import TestCase
-from sentry.tsdb.base import BaseTSDB, ONE_MINUTE, ONE_HOUR, ONE_DAY
+from sentry.tsdb.base import BaseTSDB, TimeSeries, ONE_MINUTE, ONE_HOUR, ONE_DAY
 from sentry.utils.dates import to_timestamp
 from six.moves import xrange
 
@@ -43,11 +43,43 @@ class BaseTSDBTest(TestCase):
         assert len(post_results) == 1
         assert post_results[1] == [[1368889200, 15], [1368892800, 7]]
 
+    def test_rollup_arrays(self):
+        pre_results = {
+            1: TimeSeries.from_points(
+                [(1368889980, 5), (1368890040, 10), (1368893640, 7)], 1368889980, 60, 62
+            )
+        }
+        post_results = self.tsdb.rollup(pre_results, 3600)
+        assert post_results[1] == TimeSeries(1368889200, 3600, [15, 7])
+        assert post_results[1].to_points() == [(1368889200, 15), (1368892800, 7)]
+
+    def test_get_range_arrays(self):
+        start = datetime(2013, 5, 18, 15, 0, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=2)
+        points = [(1368889200, 1), (1368892800, 2), (1368896400, 3)]
+
+        with mock.patch.object(self.tsdb, "get_range", return_value={1: points}):
+            result = self.tsdb.get_range_arrays(None, [1], start, end, rollup=ONE_HOUR)
+            assert result == {1: TimeSeries(1368889200, ONE_HOUR, [1, 2, 3])}
+            assert result[1].to_points() == points
+            assert self.tsdb.get_sums(None, [1], start, end, rollup=ONE_HOUR) == {1: 6}
+
     def test_calculate_expiry(self):
         timestamp = datetime(2013, 5, 18, 15, 13, 58, 132928, tzinfo=pytz.UTC)
         result = self.tsdb.calculate_expiry(10, 30, timestamp)
         assert result == 1368890330
 
+    def test_time_series(self):
+        series = TimeSeries.from_points([(20, 3), (40, 1), (1000, 5)], 10, 10, 4)
+        assert list(series.timestamps()) == [10, 20, 30, 40]
+        assert series.to_points() == [(10, 0), (20, 3), (30, 0), (40, 1)]
+        assert series.sum() == 4
+        assert (series + series).to_points() == [(10, 0), (20, 6), (30, 0), (40, 2)]
+        assert series.rollup_to(20) == TimeSeries(0, 20, [0, 3, 1])
+
+        with self.assertRaises(ValueError):
+            series + TimeSeries.zeros(20, 10, 4)
+
     @mock.patch("django.utils.timezone.now")
     def test_get_optimal_rollup_series_aligned_intervals(self, now):
         now.return_value = datetime(2016, 8, 1, tzinfo=pytz.utc)
@@ -7,7 +7,7 @@ from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 from sentry.testutils import TestCase
-from sentry.tsdb.base import TSDBModel, ONE_MINUTE, ONE_HOUR, ONE_DAY
+from sentry.tsdb.base import TimeSeries, TSDBModel, ONE_MINUTE, ONE_HOUR, ONE_DAY
 from sentry.tsdb.redis import RedisTSDB, CountMinScript, SuppressionWrapper
 from sentry.utils.dates import to_datetime, to_timestamp
 
@@ -812,3 +812,79 @@ class RedisTSDBTest(TestCase):
             ["eta", "7"],
             ["bar", "7"],
         ]
+
+    def test_write_buffer(self):
+        db = RedisTSDB(
+            rollups=((ONE_HOUR, 24),),
+            vnodes=64,
+            enable_frequency_sketches=True,
+            write_buffer_window=60,
+            write_buffer_max_keys=100,
+            hosts={i - 6: {"db": i} for i in range(6, 9)},
+        )
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+
+        for _ in range(3):
+            db.incr(TSDBModel.group, 1, now)
+            db.record(TSDBModel.users_affected_by_group, 1, ("foo", "bar"), now)
+            db.record_frequency_multi(
+                ((TSDBModel.frequent_environments_by_group, {1: {"production": 1}}),), now
+            )
+        db.record(TSDBModel.users_affected_by_group, 1, ("baz",), now)
+
+        # Nothing is written until the buffer is flushed
+        assert db.get_sums(TSDBModel.group, [1], now, now) == {1: 0}
+        assert db._count_pending_keys(db._pending_writes.writes[(db.cluster, True)]) == 3
+
+        db.flush_writes()
+        assert db._pending_writes.writes == {}
+
+        assert db.get_sums(TSDBModel.group, [1], now, now) == {1: 3}
+        assert db.get_distinct_counts_totals(TSDBModel.users_affected_by_group, [1], now, now) == {
+            1: 3
+        }
+        assert db.get_most_frequent(TSDBModel.frequent_environments_by_group, [1], now) == {
+            1: [("production", 3.0)]
+        }
+
+    def test_write_buffer_max_keys(self):
+        db = RedisTSDB(
+            rollups=((ONE_HOUR, 24),),
+            vnodes=64,
+            write_buffer_window=60,
+            write_buffer_max_keys=2,
+            hosts={i - 6: {"db": i} for i in range(6, 9)},
+        )
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+
+        db.incr(TSDBModel.group, 1, now)
+        assert db.get_sums(TSDBModel.group, [1], now, now) == {1: 0}
+
+        db.incr(TSDBModel.group, 2, now)
+        assert db._pending_writes.writes == {}
+        assert db.get_sums(TSDBModel.group, [1, 2], now, now) == {1: 1, 2: 1}
+
+    def test_get_range_arrays(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=2)
+        dts = [now + timedelta(hours=i) for i in range(3)]
+        model = TSDBModel.group
+
+        self.db.incr(model, 1, dts[0], count=2)
+        self.db.incr(model, 1, dts[2], count=3, environment_id=1)
+        self.db.incr(model, 1, dts[2], count=4, environment_id=2)
+        self.db.incr(model, "foo", dts[1])
+
+        epoch = self.db.normalize_to_epoch(dts[0], ONE_HOUR)
+        results = self.db.get_range_arrays(model, [1, "foo"], dts[0], dts[-1], rollup=ONE_HOUR)
+        assert results == {
+            1: TimeSeries(epoch, ONE_HOUR, [2, 0, 7]),
+            "foo": TimeSeries(epoch, ONE_HOUR, [0, 1, 0]),
+        }
+        assert self.db.get_range(model, [1], dts[0], dts[-1], rollup=ONE_HOUR) == {
+            1: results[1].to_points()
+        }
+
+        # Counts of multiple environments are added up
+        assert self.db.get_range_arrays(
+            model, [1], dts[0], dts[-1], rollup=ONE_HOUR, environment_ids=[1, 2]
+        ) == {1: TimeSeries(epoch, ONE_HOUR, [0, 0, 7])}
@@ -0,0 +1,50 @@
+from __future__ import absolute_import
+
+import time
+
+from sentry.utils.coalescing import CoalescingBuffer
+from sentry.utils.compat import mock
+
+
+def test_flush():
+    callback = mock.Mock()
+    buffer = CoalescingBuffer(callback, 60, 10)
+
+    for key in ("a", "b", "a"):
+        with buffer.pending() as pending:
+            pending[key] = pending.get(key, 0) + 1
+    assert callback.call_count == 0
+
+    buffer.flush()
+    callback.assert_called_once_with({"a": 2, "b": 1})
+
+    # Nothing is passed to the callback without pending writes
+    buffer.flush()
+    assert callback.call_count == 1
+
+
+def test_flush_at_max_keys():
+    callback = mock.Mock()
+    buffer = CoalescingBuffer(callback, 60, 2)
+
+    with buffer.pending() as pending:
+        pending["a"] = 1
+    assert callback.call_count == 0
+
+    with buffer.pending() as pending:
+        pending["b"] = 1
+    callback.assert_called_once_with({"a": 1, "b": 1})
+    assert buffer.writes == {}
+
+
+def test_flush_after_window():
+    callback = mock.Mock()
+    buffer = CoalescingBuffer(callback, 0.01, 10)
+
+    with buffer.pending() as pending:
+        pending["a"] = 1
+
+    deadline = time.time() + 5
+    while not callback.called and time.time() < deadline:
+        time.sleep(0.01)
+    callback.assert_called_once_with({"a": 1})
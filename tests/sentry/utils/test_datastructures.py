@@ -2,7 +2,8 @@ from __future__ import absolute_import
 
 import pytest
 
-from sentry.utils.datastructures import BidirectionalMapping
+from sentry.utils.compat import mock
+from sentry.utils.datastructures import BidirectionalMapping, LRUCache
 
 
 def test_bidirectional_mapping():
@@ -32,3 +33,71 @@ def test_bidirectional_mapping():
     del value["c"]
 
     assert len(value) == len(value.inverse()) == 2
+
+
+def test_lru_cache():
+    value = LRUCache(max_entries=2)
+
+    value.set("a", 1)
+    value.set("b", 2)
+    assert value.get("a") == 1
+
+    # "b" is the least recently used entry now
+    value.set("c", 3)
+    assert "b" not in value
+    assert value.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert len(value) == 2
+
+    value.delete("a")
+    assert value.get("a", "default") == "default"
+
+    value.clear()
+    assert len(value) == 0
+
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=0)
+
+
+def test_lru_cache_ttl():
+    value = LRUCache(max_entries=10, ttl=60)
+
+    with mock.patch("sentry.utils.datastructures.time", return_value=1000):
+        value.set("a", 1)
+
+    with mock.patch("sentry.utils.datastructures.time", return_value=1059):
+        assert value.get("a") == 1
+
+    with mock.patch("sentry.utils.datastructures.time", return_value=1060):
+        assert value.get("a") is None
+
+
+def test_lru_cache_max_size():
+    value = LRUCache(max_entries=10, max_size=10)
+
+    value.set("a", b"aaaa")
+    value.set("b", b"bbbb")
+    assert value.size == 8
+
+    # "a" is evicted to make room for "c"
+    value.set("c", b"cccc")
+    assert "a" not in value
+    assert value.get_many(["b", "c"]) == {"b": b"bbbb", "c": b"cccc"}
+    assert value.size == 8
+
+    # Values exceeding the maximum size are never stored
+    value.set("d", b"d" * 11)
+    assert "d" not in value
+    assert value.size == 8
+
+    value.delete_many(["b", "c"])
+    assert value.size == 0
+
+
+def test_lru_cache_ttl_override():
+    value = LRUCache(max_entries=10, ttl=60)
+
+    with mock.patch("sentry.utils.datastructures.time", return_value=1000):
+        value.set("a", 1, ttl=10)
+
+    with mock.patch("sentry.utils.datastructures.time", return_value=1010):
+        assert value.get("a") is None
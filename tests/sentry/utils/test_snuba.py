@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 from datetime import datetime, timedelta
+from django.test import override_settings
 from django.utils import timezone
 
 import pytest
@@ -8,8 +9,12 @@ import pytz
 
 from sentry.models import GroupRelease, Release
 from sentry.testutils import TestCase
+from sentry.utils import json
+from sentry.utils.compat import mock
 from sentry.utils.snuba import (
     _prepare_query_params,
+    _quantize_query_params,
+    bulk_raw_query,
     get_snuba_translators,
     get_json_type,
     get_snuba_column_name,
@@ -17,6 +22,7 @@ from sentry.utils.snuba import (
     SnubaQueryParams,
     UnqualifiedQueryError,
     quantize_time,
+    SnubaError,
 )
 
 
@@ -280,3 +286,67 @@ class QuantizeTimeTest(TestCase):
                 break
 
         assert i != j
+
+
+@override_settings(SENTRY_SNUBA_CACHE_DURATION=60)
+class BulkRawQueryCacheTest(TestCase):
+    def setUp(self):
+        self.now = datetime(2020, 1, 1, 12, 30, 10)
+
+    def get_params(self, end=None, duration=timedelta(hours=1)):
+        end = end or self.now
+        return SnubaQueryParams(
+            dataset=Dataset.Events,
+            start=end - duration,
+            end=end,
+            filter_keys={"project_id": [self.project.id]},
+            aggregations=[["count()", "", "count"]],
+        )
+
+    def test_quantize_query_params(self):
+        first, _, _ = _prepare_query_params(self.get_params())
+        second, _, _ = _prepare_query_params(self.get_params(self.now + timedelta(microseconds=5)))
+        assert first != second
+
+        first = _quantize_query_params(first, 60)
+        second = _quantize_query_params(second, 60)
+        assert first == second
+        assert first["to_date"] <= self.now.isoformat()
+
+    def test_quantize_query_params_short_range(self):
+        query_params, _, _ = _prepare_query_params(self.get_params(duration=timedelta(0)))
+        assert _quantize_query_params(query_params, 60) is None
+
+    @mock.patch("sentry.utils.snuba._snuba_pool")
+    def test_use_cache(self, pool):
+        pool.urlopen.return_value = mock.Mock(status=200, data=b'{"data": [{"count": 1}]}')
+
+        for _ in range(2):
+            result = bulk_raw_query([self.get_params()], referrer="test", use_cache=True)
+            assert result == [{"data": [{"count": 1}]}]
+        assert pool.urlopen.call_count == 1
+
+        bulk_raw_query([self.get_params()], referrer="test")
+        assert pool.urlopen.call_count == 2
+
+    @mock.patch("sentry.utils.snuba._snuba_pool")
+    def test_use_cache_short_range(self, pool):
+        pool.urlopen.return_value = mock.Mock(status=200, data=b'{"data": []}')
+        params = self.get_params(duration=timedelta(0))
+
+        for _ in range(2):
+            bulk_raw_query([params], referrer="test", use_cache=True)
+        assert pool.urlopen.call_count == 2
+        body = json.loads(pool.urlopen.call_args[1]["body"])
+        assert body["from_date"] == body["to_date"] == self.now.isoformat()
+
+    @mock.patch("sentry.utils.snuba._snuba_pool")
+    def test_use_cache_error(self, pool):
+        pool.urlopen.return_value = mock.Mock(
+            status=500, data=b'{"error": {"type": "x", "message": "y"}}'
+        )
+
+        for _ in range(2):
+            with pytest.raises(SnubaError):
+                bulk_raw_query([self.get_params()], referrer="test", use_cache=True)
+        assert pool.urlopen.call_count == 2